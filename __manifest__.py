@@ -20,6 +20,9 @@
         'security/ir.model.access.csv',
         'views/syscom_config_views.xml',
         'views/syscom_log_views.xml',
+        'views/syscom_checkpoint_views.xml',
+        'views/syscom_importacion_views.xml',
+        'views/syscom_vista_previa_views.xml',
         'views/product_template_views.xml',
         'views/menu_views.xml',
         'data/ir_cron_data.xml',
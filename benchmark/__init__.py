@@ -0,0 +1,4 @@
+# ===========================
+# benchmark/__init__.py
+# ===========================
+from . import generador_feed
@@ -0,0 +1,118 @@
+"""
+Generador de feeds sintéticos de Syscom para medir el importador.
+
+Uso desde línea de comandos:
+
+    python benchmark/generador_feed.py salida.csv 50000 [--semilla 0] [--variacion 0.05]
+"""
+import argparse
+import csv
+import io
+import random
+
+ENCABEZADOS = [
+    'Modelo', 'Título', 'Su Precio', 'Tipo de Cambio', 'Menu Nvl 1', 'Menu Nvl 2',
+    'Menu Nvl 3', 'Marca', 'Código Fiscal', 'Link SYSCOM',
+]
+
+_nivel1 = ['Videovigilancia', 'Redes', 'Radiocomunicación', 'Energía', 'Control de Acceso',
+           'Detección de Fuego', 'Automatización', 'Cableado Estructurado', 'Audio y Video', 'Herramientas']
+_nivel2 = ['Cámaras', 'Grabadores', 'Accesorios', 'Switches', 'Antenas', 'Baterías', 'Paneles',
+           'Sensores', 'Gabinetes', 'Conectores', 'Fuentes', 'Lectoras']
+_nivel3 = ['', '', 'IP', 'Análogas', 'PoE', 'Exterior', 'Interior', 'Industrial', 'Montaje', 'Kit']
+_marcas = ['HIKVISION', 'EPCOM', 'DAHUA', 'UBIQUITI', 'CAMBIUM', 'LINKSYS', 'PANDUIT', 'TP-LINK',
+           'ZKTECO', 'SYSCOM', 'ACCESSPRO', 'MOTOROLA', 'KENWOOD', 'APC', 'TRUPER', '']
+_palabras = ['Cámara', 'Bala', 'Domo', 'Turret', 'Señal', 'Niño', 'Año', 'Protección', 'Visión',
+             'Nocturna', 'Exterior', 'Batería', 'Inalámbrico', 'Óptico', 'Puerto', 'Gigabit',
+             'Fuente', 'Regulada', 'Antena', 'Sectorial', 'Conector', 'RJ45', 'Gabinete', 'Metálico']
+_codigos_fiscales = ['46171610', '43222610', '39121004', '26111701', '43201404', '45111900']
+
+
+def _fila(i, aleatorio, tipo_cambio, prefijo='SYS'):
+    nvl1 = _nivel1[i % len(_nivel1)]
+    precio = round(aleatorio.uniform(1, 2500), 2)
+    return [
+        f'{prefijo}-{i:07d}',
+        ' '.join(aleatorio.sample(_palabras, 5)),
+        f'{precio:,.2f}',
+        f'{tipo_cambio:.4f}',
+        nvl1,
+        _nivel2[(i // 7) % len(_nivel2)],
+        _nivel3[(i // 13) % len(_nivel3)],
+        _marcas[(i // 3) % len(_marcas)],
+        _codigos_fiscales[i % len(_codigos_fiscales)],
+        f'https://www.syscom.mx/producto/{prefijo}-{i:07d}.html',
+    ]
+
+
+def _fila_invalida(i, aleatorio, prefijo='SYS'):
+    """Filas con los defectos que aparecen en los feeds reales."""
+    fila = _fila(i, aleatorio, 18.5, prefijo)
+    defecto = i % 4
+    if defecto == 0:
+        fila[2] = 'N/D'          # precio no numérico
+    elif defecto == 1:
+        fila[0] = ''             # sin modelo
+    elif defecto == 2:
+        fila[1] = ''             # sin título
+    else:
+        fila = fila[:4]          # fila truncada
+    return fila
+
+
+def generar_feed(ruta, filas, semilla=0, tipo_cambio=18.5, proporcion_latin1=0.02,
+                 proporcion_invalidas=0.01, variacion=0.0, prefijo='SYS'):
+    """
+    Escribe un CSV con los encabezados reales de Syscom.
+
+    Args:
+        ruta: Archivo de salida
+        filas: Cantidad de filas de datos
+        semilla: Semilla del generador aleatorio; la misma semilla produce los mismos productos
+        tipo_cambio: Valor de la columna 'Tipo de Cambio'
+        proporcion_latin1: Fracción de filas escritas en cp1252 en lugar de UTF-8
+        proporcion_invalidas: Fracción de filas con defectos (precio inválido, sin modelo, etc.)
+        variacion: Fracción de productos cuyo precio cambia respecto a la misma semilla
+        prefijo: Prefijo de los códigos 'Modelo'; otro prefijo produce productos distintos
+
+    Returns:
+        Cantidad de filas válidas escritas
+    """
+    aleatorio = random.Random(semilla)
+    aleatorio_variacion = random.Random(semilla + 1)
+    validas = 0
+    with open(ruta, 'wb') as archivo:
+        archivo.write(b'\xef\xbb\xbf')
+        archivo.write(_codificar_fila(ENCABEZADOS, 'utf-8'))
+        for i in range(filas):
+            if aleatorio.random() < proporcion_invalidas:
+                fila = _fila_invalida(i, aleatorio, prefijo)
+            else:
+                # Los precios base dependen solo de la semilla; la variación usa su propio generador
+                fila = _fila(i, aleatorio, tipo_cambio, prefijo)
+                if variacion and aleatorio_variacion.random() < variacion:
+                    precio = float(fila[2].replace(',', ''))
+                    fila[2] = f'{precio * aleatorio_variacion.uniform(0.9, 1.1):,.2f}'
+                validas += 1
+            codificacion = 'cp1252' if aleatorio.random() < proporcion_latin1 else 'utf-8'
+            archivo.write(_codificar_fila(fila, codificacion))
+            if i and i % 10000 == 0:
+                archivo.write(b'\r\n')  # fila vacía ocasional
+    return validas
+
+
+def _codificar_fila(fila, codificacion):
+    salida = io.StringIO()
+    csv.writer(salida).writerow(fila)
+    return salida.getvalue().encode(codificacion, errors='replace')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Genera un feed sintético de Syscom')
+    parser.add_argument('ruta')
+    parser.add_argument('filas', type=int)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--variacion', type=float, default=0.0)
+    argumentos = parser.parse_args()
+    total = generar_feed(argumentos.ruta, argumentos.filas, argumentos.semilla, variacion=argumentos.variacion)
+    print(f'{total} filas válidas escritas en {argumentos.ruta}')
@@ -3,4 +3,8 @@
 # ===========================
 from . import syscom_config
 from . import syscom_log
+from . import syscom_checkpoint
+from . import syscom_importacion
+from . import syscom_vista_previa
+from . import syscom_price_rule
 from . import product_template
\ No newline at end of file
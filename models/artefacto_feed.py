@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+from array import array
+
+_logger = logging.getLogger(__name__)
+
+# Formato: cabecera _magia, luego bloques (grupos de filas) consecutivos.
+# Cada bloque: uint32 con la longitud de su cabecera JSON, la cabecera y los
+# datos de cada columna contiguos (alineados a 8 bytes).
+_magia = b"SYSFEED1"
+_separador = "\x1f"  # separador de valores dentro de una columna de texto
+_filas_por_bloque = 5000
+_extension_artefacto = ".feed"
+
+# Columnas del artefacto: nombre -> tipo ('texto', 'numero' o 'fila')
+COLUMNAS = {
+    "fila": "fila",
+    "modelo": "texto",
+    "titulo": "texto",
+    "su_precio": "numero",
+    "tipo_cambio": "numero",
+    "nvl1": "texto",
+    "nvl2": "texto",
+    "nvl3": "texto",
+    "marca": "texto",
+    "codigo_fiscal": "texto",
+    "link": "texto",
+}
+
+
+def clave_artefacto(hash_csv, categorias_filtro):
+    """Clave del artefacto: hash del CSV más el filtro de categorías activo."""
+    filtro = json.dumps(sorted(categorias_filtro or []), ensure_ascii=False)
+    return hashlib.sha256(f"{hash_csv}|{filtro}".encode("utf-8")).hexdigest()
+
+
+def ruta_artefacto(ruta_csv, clave):
+    return f"{ruta_csv}.{clave[:16]}{_extension_artefacto}"
+
+
+def _codifica_columna(tipo, valores):
+    if tipo == "texto":
+        return _separador.join(v.replace(_separador, " ") for v in valores).encode("utf-8")
+    if tipo == "fila":
+        return array("q", valores).tobytes()
+    return array("d", (math.nan if v is None else v for v in valores)).tobytes()
+
+
+def _decodifica_columna(tipo, datos, filas):
+    if tipo == "texto":
+        return bytes(datos).decode("utf-8").split(_separador) if filas else []
+    if tipo == "fila":
+        return datos.cast("q").tolist()
+    return [None if math.isnan(v) else v for v in datos.cast("d")]
+
+
+class EscritorArtefacto:
+    """
+    Escribe el artefacto por grupos de filas, sin retener el feed completo en
+    memoria. Se escribe en ``.part`` y solo se publica con cerrar().
+    """
+
+    def __init__(self, ruta, filas_por_bloque=_filas_por_bloque):
+        self.ruta = ruta
+        self.ruta_parcial = ruta + ".part"
+        self.filas_por_bloque = filas_por_bloque
+        self.filas = 0
+        self._pendientes = []
+        self._archivo = open(self.ruta_parcial, "wb")
+        self._archivo.write(_magia)
+
+    def agregar(self, fila, registro):
+        self._pendientes.append((fila, registro))
+        if len(self._pendientes) >= self.filas_por_bloque:
+            self._escribir_bloque()
+
+    def _escribir_bloque(self):
+        if not self._pendientes:
+            return
+        columnas = []
+        datos = []
+        offset = 0
+        for nombre, tipo in COLUMNAS.items():
+            if nombre == "fila":
+                valores = [fila for fila, _registro in self._pendientes]
+            else:
+                valores = [registro[nombre] for _fila, registro in self._pendientes]
+            bloque = _codifica_columna(tipo, valores)
+            relleno = -len(bloque) % 8
+            columnas.append([nombre, offset, len(bloque)])
+            datos.append(bloque + b"\0" * relleno)
+            offset += len(bloque) + relleno
+        cabecera = json.dumps({
+            "filas": len(self._pendientes),
+            "fila_max": self._pendientes[-1][0],
+            "columnas": columnas,
+        }).encode("utf-8")
+        cabecera += b" " * (-(len(cabecera) + 4 + self._archivo.tell()) % 8)
+        self._archivo.write(struct.pack("<I", len(cabecera)))
+        self._archivo.write(cabecera)
+        for bloque in datos:
+            self._archivo.write(bloque)
+        self.filas += len(self._pendientes)
+        self._pendientes = []
+
+    def cerrar(self):
+        self._escribir_bloque()
+        self._archivo.close()
+        os.replace(self.ruta_parcial, self.ruta)
+        _logger.info(f"Artefacto del feed guardado: {self.ruta} ({self.filas} filas)")
+
+    def descartar(self):
+        self._archivo.close()
+        try:
+            os.remove(self.ruta_parcial)
+        except OSError:
+            pass
+
+
+def leer_artefacto(ruta):
+    """
+    Recorre el artefacto mapeado en memoria y produce (fila, registro) con las
+    mismas claves de COLUMNAS, decodificando un bloque a la vez.
+    """
+    with open(ruta, "rb") as archivo, \
+         mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        vista = memoryview(mapa)
+        try:
+            if bytes(vista[:len(_magia)]) != _magia:
+                raise ValueError(f"Artefacto inválido: {ruta}")
+            posicion = len(_magia)
+            while posicion < len(mapa):
+                (largo,) = struct.unpack_from("<I", mapa, posicion)
+                posicion += 4
+                cabecera = json.loads(bytes(vista[posicion:posicion + largo]))
+                posicion += largo
+                inicio_datos = posicion
+                posicion += sum(l + (-l % 8) for _n, _o, l in cabecera["columnas"])
+                filas = cabecera["filas"]
+                columnas = {
+                    nombre: _decodifica_columna(COLUMNAS[nombre], vista[inicio_datos + o:inicio_datos + o + l], filas)
+                    for nombre, o, l in cabecera["columnas"]
+                }
+                for i in range(filas):
+                    yield columnas["fila"][i], {nombre: columnas[nombre][i] for nombre in COLUMNAS if nombre != "fila"}
+                del columnas
+        finally:
+            vista.release()
@@ -0,0 +1,105 @@
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+
+_logger = logging.getLogger(__name__)
+
+_entradas_por_escritura = 5000  # entradas acumuladas antes de escribir al archivo
+_tamano_maximo_bytes = 50 * 1024 * 1024  # tamaño a partir del cual se rota el archivo
+_rotaciones_conservadas = 30  # archivos .jsonl.gz rotados que se conservan
+# Varias instancias (una por partición en la importación en paralelo) comparten el archivo
+_candado_archivo = threading.Lock()
+
+
+class BitacoraPrecios:
+    """
+    Bitácora de precios en JSON Lines con escritura por bloques.
+
+    Acumula las entradas en memoria y las escribe en una sola operación cada
+    ``entradas_por_escritura`` entradas o al cerrar. Al abrir y al escribir
+    rota el archivo si cambió el día o si superó ``tamano_maximo_bytes``; los
+    archivos rotados se comprimen con gzip.
+
+    Cada línea es un objeto con: fecha, ejecucion, accion, codigo,
+    precio_anterior, precio_nuevo y tipo_cambio.
+    """
+
+    def __init__(self, ruta_archivo, id_ejecucion, tipo_cambio=None,
+                 entradas_por_escritura=_entradas_por_escritura,
+                 tamano_maximo_bytes=_tamano_maximo_bytes,
+                 rotaciones_conservadas=_rotaciones_conservadas):
+        self.ruta_archivo = ruta_archivo
+        self.id_ejecucion = id_ejecucion
+        self.tipo_cambio = tipo_cambio
+        self.entradas_por_escritura = entradas_por_escritura
+        self.tamano_maximo_bytes = tamano_maximo_bytes
+        self.rotaciones_conservadas = rotaciones_conservadas
+        self.entradas_escritas = 0
+        self._pendientes = []
+        os.makedirs(os.path.dirname(ruta_archivo) or ".", exist_ok=True)
+
+    def registrar(self, accion, codigo, precio_nuevo, precio_anterior=None):
+        self._pendientes.append(json.dumps({
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "ejecucion": self.id_ejecucion,
+            "accion": accion,
+            "codigo": codigo,
+            "precio_anterior": precio_anterior,
+            "precio_nuevo": precio_nuevo,
+            "tipo_cambio": self.tipo_cambio,
+        }, ensure_ascii=False))
+        if len(self._pendientes) >= self.entradas_por_escritura:
+            self.escribir()
+
+    def escribir(self):
+        """Escribe las entradas pendientes en una sola operación."""
+        if not self._pendientes:
+            return
+        try:
+            with _candado_archivo:
+                self._rotar_si_corresponde()
+                with open(self.ruta_archivo, "a", encoding="utf-8") as archivo:
+                    archivo.write("\n".join(self._pendientes) + "\n")
+            self.entradas_escritas += len(self._pendientes)
+        except Exception as e:
+            _logger.error(f"Error al escribir la bitácora de precios: {e}")
+        self._pendientes = []
+
+    def cerrar(self):
+        self.escribir()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_excepcion):
+        self.cerrar()
+
+    def _rotar_si_corresponde(self):
+        if not os.path.exists(self.ruta_archivo):
+            return
+        estado = os.stat(self.ruta_archivo)
+        otro_dia = datetime.fromtimestamp(estado.st_mtime).date() != datetime.now().date()
+        if not otro_dia and estado.st_size < self.tamano_maximo_bytes:
+            return
+        base, extension = os.path.splitext(self.ruta_archivo)
+        sello = datetime.fromtimestamp(estado.st_mtime).strftime("%Y%m%d_%H%M%S")
+        ruta_rotada = f"{base}_{sello}{extension}.gz"
+        consecutivo = 1
+        while os.path.exists(ruta_rotada):
+            ruta_rotada = f"{base}_{sello}_{consecutivo}{extension}.gz"
+            consecutivo += 1
+        with open(self.ruta_archivo, "rb") as origen, gzip.open(ruta_rotada, "wb") as destino:
+            shutil.copyfileobj(origen, destino, 1024 * 1024)
+        os.remove(self.ruta_archivo)
+        _logger.info(f"Bitácora de precios rotada en {ruta_rotada}")
+        rotados = sorted(glob.glob(f"{glob.escape(base)}_*{extension}.gz"))
+        for ruta in rotados[:-self.rotaciones_conservadas or None]:
+            try:
+                os.remove(ruta)
+            except OSError as e:
+                _logger.warning(f"No se pudo eliminar bitácora rotada {ruta}: {e}")
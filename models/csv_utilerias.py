@@ -1,8 +1,15 @@
+import hashlib
+import io
+import os
+from contextlib import contextmanager
 from pathlib import Path
 import logging
 
 _logger = logging.getLogger(__name__)
 
+_tamano_bloque_lectura = 4 * 1024 * 1024  # bytes decodificados por bloque en la lectura del CSV
+_sufijo_marca_limpio = ".utf8"  # archivo junto al CSV que indica que ya se validó como UTF-8
+
 
 def decodifica_linea(linea_de_texto: bytes) -> str:
     """
@@ -29,30 +36,138 @@ def decodifica_linea(linea_de_texto: bytes) -> str:
     return linea_de_texto.decode("utf-8", errors="replace")
 
 
-def normaliza_csv(ruta_de_entrada: str, ruta_de_salida: str) -> None:
-    archivo_entrada = Path(ruta_de_entrada)
-    archivo_salida = Path(ruta_de_salida)
+class DecodificadorCsv:
+    """
+    Decodifica un CSV por bloques grandes y entrega líneas de texto listas
+    para csv.reader/csv.DictReader, sin archivos temporales.
 
-    lineas_corregidas = 0
-    lineas_reemplazadas = 0
+    Cada bloque (cortado en el último salto de línea) se decodifica primero
+    como UTF-8; solo los bloques que fallan se procesan línea por línea con
+    decodifica_linea.
+    """
 
-    with archivo_entrada.open("rb") as file_in, \
-         archivo_salida.open("w", encoding="utf-8", newline="") as file_out:
+    def __init__(self, ruta_de_entrada: str, tamano_bloque: int = _tamano_bloque_lectura):
+        self.ruta = ruta_de_entrada
+        self.tamano_bloque = tamano_bloque
+        self.lineas_corregidas = 0
+        self.lineas_reemplazadas = 0
+        self.bloques_corregidos = 0
+        self.terminado = False
 
-        for i, raw_line in enumerate(file_in, 1):
-            # Detectar qué camino tomó la decodificación
+    def _decodifica_bloque(self, bloque: bytes) -> str:
+        try:
+            return bloque.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        self.bloques_corregidos += 1
+        partes = []
+        for linea in bloque.splitlines(keepends=True):
             try:
-                line = raw_line.decode("utf-8")
+                partes.append(linea.decode("utf-8"))
+                continue
             except UnicodeDecodeError:
-                line = decodifica_linea(raw_line)
-                if "\\ufffd" in line or "\ufffd" in line:
-                    _logger.warning(f"  [WARN] Línea {i}: caracteres irrecuperables → sustituidos con U+FFFD")
-                    lineas_reemplazadas += 1
-                else:
-                    lineas_corregidas += 1
+                texto = decodifica_linea(linea)
+            if "\ufffd" in texto:
+                self.lineas_reemplazadas += 1
+            else:
+                self.lineas_corregidas += 1
+            partes.append(texto)
+        return "".join(partes)
+
+    def __iter__(self):
+        pendiente = b""
+        primero = True
+        with open(self.ruta, "rb") as archivo:
+            while True:
+                bloque = archivo.read(self.tamano_bloque)
+                if not bloque:
+                    break
+                bloque = pendiente + bloque
+                corte = bloque.rfind(b"\n") + 1
+                if not corte:
+                    pendiente = bloque
+                    continue
+                pendiente = bloque[corte:]
+                texto = self._decodifica_bloque(bloque[:corte])
+                if primero:
+                    texto = texto.lstrip("\ufeff")
+                    primero = False
+                yield from io.StringIO(texto, newline="")
+            if pendiente:
+                texto = self._decodifica_bloque(pendiente)
+                yield from io.StringIO(texto.lstrip("\ufeff") if primero else texto, newline="")
+        self.terminado = True
+        if self.lineas_corregidas or self.lineas_reemplazadas:
+            _logger.info(f"Líneas re-codificadas desde Latin-1 : {self.lineas_corregidas}")
+            _logger.info(f"Líneas con sustitución U+FFFD       : {self.lineas_reemplazadas}")
+
+
+def _ruta_marca_limpio(ruta_archivo: str) -> str:
+    return ruta_archivo + _sufijo_marca_limpio
+
+
+def archivo_limpio(ruta_archivo: str) -> bool:
+    """True si el archivo ya se leyó completo como UTF-8 válido y no cambió desde entonces."""
+    try:
+        with open(_ruta_marca_limpio(ruta_archivo), "r", encoding="utf-8") as marca:
+            return marca.read().strip() == _firma_archivo(ruta_archivo)
+    except OSError:
+        return False
+
+
+def _firma_archivo(ruta_archivo: str) -> str:
+    estado = os.stat(ruta_archivo)
+    return f"{estado.st_size}:{estado.st_mtime_ns}"
 
+
+@contextmanager
+def abrir_csv_normalizado(ruta_archivo: str, tamano_bloque: int = _tamano_bloque_lectura):
+    """
+    Abre un CSV para csv.reader/csv.DictReader normalizándolo al vuelo.
+
+    Si el archivo ya se sabe limpio se abre directo como UTF-8; si no, se usa
+    DecodificadorCsv y, al terminar de leerlo sin correcciones, se marca como
+    limpio para las lecturas siguientes.
+    """
+    if archivo_limpio(ruta_archivo):
+        with open(ruta_archivo, "r", encoding="utf-8-sig", newline="") as archivo:
+            yield archivo
+        return
+    decodificador = DecodificadorCsv(ruta_archivo, tamano_bloque)
+    yield decodificador
+    if decodificador.terminado and not decodificador.bloques_corregidos:
+        try:
+            with open(_ruta_marca_limpio(ruta_archivo), "w", encoding="utf-8") as marca:
+                marca.write(_firma_archivo(ruta_archivo))
+        except OSError as e:
+            _logger.warning(f"No se pudo marcar el archivo como limpio {ruta_archivo}: {e}")
+
+
+def normaliza_csv(ruta_de_entrada: str, ruta_de_salida: str) -> None:
+    decodificador = DecodificadorCsv(ruta_de_entrada)
+    with Path(ruta_de_salida).open("w", encoding="utf-8", newline="") as file_out:
+        for line in decodificador:
             file_out.write(line)
 
     _logger.info(f"\nArchivo normalizado: {ruta_de_salida}")
-    _logger.info(f"Líneas re-codificadas desde Latin-1 : {lineas_corregidas}")
-    _logger.info(f"Líneas con sustitución U+FFFD       : {lineas_reemplazadas}")
+    _logger.info(f"Líneas re-codificadas desde Latin-1 : {decodificador.lineas_corregidas}")
+    _logger.info(f"Líneas con sustitución U+FFFD       : {decodificador.lineas_reemplazadas}")
+
+
+def parsear_numero(texto: str):
+    """Convierte un número del CSV ('1,234.50') a float; None si está vacío o no es válido."""
+    if not texto:
+        return None
+    try:
+        return float(texto.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def hash_archivo(ruta_archivo: str, tamano_bloque: int = 1024 * 1024) -> str:
+    """SHA-256 del archivo leído por bloques, sin cargarlo completo en memoria."""
+    digest = hashlib.sha256()
+    with open(ruta_archivo, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import os
+import time
+
+import requests
+
+_logger = logging.getLogger(__name__)
+
+# Estados posibles devueltos por descargar_archivo
+DESCARGADO = "descargado"
+NO_MODIFICADO = "no_modificado"
+RESPUESTA_HTML = "html"
+
+# Errores transitorios que justifican reintentar (y reanudar con Range)
+_errores_reintentables = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class DescargaIncompleta(requests.ConnectionError):
+    """El servidor cerró la conexión antes de enviar todo el contenido."""
+
+
+def descargar_archivo(url, ruta_destino, headers=None, etag=None, last_modified=None,
+                      tamano_bloque=1024 * 1024, reintentos=3, espera_inicial=2.0,
+                      timeout=300, progreso=None):
+    """
+    Descarga condicional y reanudable de un archivo HTTP.
+
+    - Envía If-None-Match / If-Modified-Since con los validadores previos;
+      un 304 evita la descarga por completo.
+    - Acepta gzip como Content-Encoding; requests lo descomprime al vuelo.
+    - Si la conexión se corta, reintenta con espera exponencial y pide solo
+      el resto con Range/If-Range (en identity, para que el offset coincida).
+    - Escribe en ``ruta_destino + ".part"`` y lo renombra al terminar.
+
+    Regresa un diccionario con: estado, ruta, bytes, etag, last_modified,
+    content_type y total (tamaño anunciado por el servidor, o 0).
+    """
+    ruta_parcial = ruta_destino + ".part"
+    if os.path.exists(ruta_parcial):
+        os.remove(ruta_parcial)
+
+    resultado = {
+        "estado": DESCARGADO,
+        "ruta": ruta_destino,
+        "bytes": 0,
+        "etag": None,
+        "last_modified": None,
+        "content_type": "",
+        "total": 0,
+    }
+    descargado = 0
+    intento = 0
+
+    with requests.Session() as sesion:
+        while True:
+            encabezados = dict(headers or {})
+            if descargado:
+                encabezados["Range"] = f"bytes={descargado}-"
+                encabezados["Accept-Encoding"] = "identity"
+                validador = resultado["etag"] or resultado["last_modified"]
+                if validador:
+                    encabezados["If-Range"] = validador
+            else:
+                encabezados["Accept-Encoding"] = "gzip"
+                if etag:
+                    encabezados["If-None-Match"] = etag
+                if last_modified:
+                    encabezados["If-Modified-Since"] = last_modified
+            try:
+                with sesion.get(url, headers=encabezados, stream=True,
+                                timeout=timeout, allow_redirects=True) as respuesta:
+                    if respuesta.status_code == 304:
+                        resultado["estado"] = NO_MODIFICADO
+                        resultado["etag"] = respuesta.headers.get("ETag", etag)
+                        resultado["last_modified"] = respuesta.headers.get("Last-Modified", last_modified)
+                        return resultado
+                    if respuesta.status_code >= 500:
+                        # Los errores del servidor se tratan como transitorios
+                        raise requests.ConnectionError(f"HTTP {respuesta.status_code}")
+                    respuesta.raise_for_status()
+
+                    resultado["content_type"] = respuesta.headers.get("Content-Type", "")
+                    if "text/html" in resultado["content_type"]:
+                        resultado["estado"] = RESPUESTA_HTML
+                        return resultado
+
+                    reanudando = descargado and respuesta.status_code == 206
+                    if not reanudando:
+                        # Respuesta completa (primera o el servidor ignoró Range): empezar de cero
+                        descargado = 0
+                        resultado["total"] = 0
+                        resultado["etag"] = respuesta.headers.get("ETag")
+                        resultado["last_modified"] = respuesta.headers.get("Last-Modified")
+                    comprimido = bool(respuesta.headers.get("Content-Encoding"))
+                    longitud = int(respuesta.headers.get("Content-Length", 0) or 0)
+                    if not comprimido and longitud:
+                        resultado["total"] = descargado + longitud
+
+                    with open(ruta_parcial, "ab" if reanudando else "wb") as archivo:
+                        for bloque in respuesta.iter_content(chunk_size=tamano_bloque):
+                            if bloque:
+                                archivo.write(bloque)
+                                descargado += len(bloque)
+                                if progreso:
+                                    progreso(descargado, resultado["total"])
+
+                if resultado["total"] and descargado < resultado["total"]:
+                    raise DescargaIncompleta(f"Se recibieron {descargado} de {resultado['total']} bytes")
+            except _errores_reintentables as e:
+                intento += 1
+                if intento > reintentos:
+                    raise
+                espera = espera_inicial * (2 ** (intento - 1))
+                _logger.warning(f"Descarga interrumpida ({e}); reintento {intento}/{reintentos} "
+                                f"en {espera:.0f}s desde el byte {descargado}")
+                time.sleep(espera)
+                continue
+
+            os.replace(ruta_parcial, ruta_destino)
+            resultado["bytes"] = descargado
+            return resultado
+
+
+def sondear_archivo(url, headers=None, etag=None, last_modified=None, huella=None,
+                    timeout=60, tamano_bloque=1024 * 1024):
+    """
+    Sondeo barato de si un archivo HTTP cambió, sin guardarlo en disco.
+
+    - Primero un HEAD condicional con los validadores previos: un 304, o un
+      ETag / Last-Modified igual al anterior, significa que no cambió.
+    - Si el servidor no acepta HEAD o no envía validadores comparables, el
+      contenido se recorre en streaming sin escribirlo y se compara su
+      SHA-256 con ``huella`` (el de la última descarga, ver hash_archivo).
+    - Sin validadores ni huella previos no hay con qué comparar y se
+      reporta como cambiado.
+
+    Regresa un diccionario con: cambio (bool), metodo ('head' o 'hash'),
+    etag y last_modified devueltos por el servidor.
+    """
+    encabezados = dict(headers or {})
+    # Mismo Accept-Encoding que la descarga, para que el ETag sea comparable
+    encabezados["Accept-Encoding"] = "gzip"
+    if etag:
+        encabezados["If-None-Match"] = etag
+    if last_modified:
+        encabezados["If-Modified-Since"] = last_modified
+    resultado = {"cambio": True, "metodo": "head", "etag": None, "last_modified": None}
+
+    with requests.Session() as sesion:
+        respuesta = sesion.head(url, headers=encabezados, timeout=timeout, allow_redirects=True)
+        if respuesta.status_code == 304:
+            resultado["cambio"] = False
+            resultado["etag"] = respuesta.headers.get("ETag", etag)
+            resultado["last_modified"] = respuesta.headers.get("Last-Modified", last_modified)
+            return resultado
+        if respuesta.ok:
+            resultado["etag"] = respuesta.headers.get("ETag")
+            resultado["last_modified"] = respuesta.headers.get("Last-Modified")
+            if resultado["etag"] and etag:
+                resultado["cambio"] = resultado["etag"] != etag
+                return resultado
+            if resultado["last_modified"] and last_modified:
+                resultado["cambio"] = resultado["last_modified"] != last_modified
+                return resultado
+        elif respuesta.status_code >= 500:
+            raise requests.ConnectionError(f"HTTP {respuesta.status_code} en el sondeo")
+        # HEAD no soportado (405/501...) o sin validadores comparables: comparar el contenido
+        if not huella:
+            return resultado
+        resultado["metodo"] = "hash"
+        digest = hashlib.sha256()
+        with sesion.get(url, headers=dict(headers or {}, **{"Accept-Encoding": "gzip"}),
+                        stream=True, timeout=timeout, allow_redirects=True) as respuesta:
+            respuesta.raise_for_status()
+            if "text/html" in respuesta.headers.get("Content-Type", ""):
+                raise requests.RequestException("El servidor devolvió HTML en lugar del CSV")
+            resultado["etag"] = respuesta.headers.get("ETag")
+            resultado["last_modified"] = respuesta.headers.get("Last-Modified")
+            for bloque in respuesta.iter_content(chunk_size=tamano_bloque):
+                digest.update(bloque)
+        resultado["cambio"] = digest.hexdigest() != huella
+        return resultado
@@ -0,0 +1,65 @@
+class FilaFeed:
+    """
+    Fila del feed ya con precios calculados, en una representación compacta.
+
+    Con ``__slots__`` cada fila ocupa una fracción de lo que ocupa un
+    diccionario con las mismas claves; los valores constantes de creación
+    (tipo, unidad de medida, objeto de impuesto, etc.) no se guardan por fila
+    sino que se agregan una sola vez al armar los valores de create().
+    """
+
+    __slots__ = (
+        'default_code', 'name', 'standard_price', 'list_price', 'categoria_path',
+        'clave_producto', 'syscom_url', 'marca', 'product_brand_id', 'categ_id',
+    )
+
+    def __init__(self, default_code, name, standard_price, list_price, categoria_path,
+                 clave_producto, syscom_url, marca):
+        self.default_code = default_code
+        self.name = name
+        self.standard_price = standard_price
+        self.list_price = list_price
+        self.categoria_path = categoria_path
+        self.clave_producto = clave_producto
+        self.syscom_url = syscom_url
+        self.marca = marca
+        self.product_brand_id = False
+        self.categ_id = False
+
+    def valores_actualizacion(self):
+        """Valores comparables contra un producto existente (ver _campos_comparables)."""
+        return {
+            'default_code': self.default_code,
+            'name': self.name,
+            'standard_price': self.standard_price,
+            'list_price': self.list_price,
+            'syscom_url': self.syscom_url,
+            # El feed no trae imagen; se conserva la limpieza del campo que hacía el importador
+            'syscom_url_image': None,
+            'product_brand_id': self.product_brand_id,
+            'categ_id': self.categ_id,
+            # Reactiva solo lo que archivó la importación (ver _detectar_cambios), no lo archivado a mano
+            'syscom_descontinuado': False,
+            'syscom_modelo': self.default_code,
+        }
+
+    def valores_creacion(self, valores_fijos):
+        """Valores para product.template.create(), partiendo de los valores fijos de toda la importación."""
+        valores = dict(valores_fijos)
+        valores.update({
+            'name': self.name,
+            'default_code': self.default_code,
+            'syscom_modelo': self.default_code,
+            'description_sale': self.name,
+            'standard_price': self.standard_price,
+            'list_price': self.list_price,
+            'categ_id': self.categ_id,
+            'clave_producto': self.clave_producto,
+            'syscom_url': self.syscom_url,
+            'syscom_url_image': None,
+            'product_brand_id': self.product_brand_id,
+        })
+        return valores
+
+    def __repr__(self):
+        return f'FilaFeed({self.default_code!r})'
@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows no incluye el módulo resource
+    resource = None
+
+_logger = logging.getLogger(__name__)
+
+# Fases del importador, en el orden en que ocurren
+FASES = ('descarga', 'leer', 'clasificar', 'crear', 'actualizar', 'info_proveedor', 'descontinuados')
+
+
+class MedidorFases:
+    """
+    Acumula por fase: segundos, consultas SQL, filas y llamadas.
+
+    Las consultas se toman de ``cr.sql_log_count`` del cursor indicado. Con
+    ``medir_memoria`` se registra además el pico de memoria Python de cada
+    fase usando tracemalloc (costoso; pensado para benchmarks).
+    """
+
+    def __init__(self, medir_memoria=False):
+        self.medir_memoria = medir_memoria
+        self.fases = {}
+        self.inicio = time.perf_counter()
+        self._candado = threading.Lock()
+
+    def _fase(self, nombre):
+        return self.fases.setdefault(nombre, {
+            'segundos': 0.0,
+            'consultas': 0,
+            'filas': 0,
+            'llamadas': 0,
+            'memoria_pico_bytes': 0,
+        })
+
+    @contextmanager
+    def medir(self, nombre, cr=None, filas=0):
+        consultas_inicio = getattr(cr, 'sql_log_count', 0)
+        if self.medir_memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            consultas = getattr(cr, 'sql_log_count', 0) - consultas_inicio
+            pico = tracemalloc.get_traced_memory()[1] if self.medir_memoria else 0
+            with self._candado:
+                fase = self._fase(nombre)
+                fase['segundos'] += segundos
+                fase['consultas'] += consultas
+                fase['filas'] += filas
+                fase['llamadas'] += 1
+                fase['memoria_pico_bytes'] = max(fase['memoria_pico_bytes'], pico)
+
+    def iterar(self, nombre, iterable, cr=None, filas=len):
+        """Recorre ``iterable`` cargando a la fase el tiempo de producir cada elemento."""
+        iterador = iter(iterable)
+        while True:
+            with self.medir(nombre, cr):
+                try:
+                    elemento = next(iterador)
+                except StopIteration:
+                    return
+            with self._candado:
+                self._fase(nombre)['filas'] += filas(elemento) if filas else 0
+            yield elemento
+
+    def agregar(self, nombre, **valores):
+        """Sumar contadores adicionales a una fase, p. ej. agregar('descarga', bytes=...)"""
+        with self._candado:
+            fase = self._fase(nombre)
+            for clave, valor in valores.items():
+                fase[clave] = fase.get(clave, 0) + valor
+
+    def transcurrido(self):
+        """Segundos de reloj desde que se creó el medidor; en paralelo las fases se traslapan"""
+        return time.perf_counter() - self.inicio
+
+    def como_dict(self):
+        with self._candado:
+            return {nombre: dict(valores) for nombre, valores in self.fases.items()}
+
+    def resumen(self):
+        return ', '.join(
+            f"{nombre}: {valores['segundos']:.2f}s/{valores['consultas']} SQL/{valores['filas']} filas"
+            for nombre, valores in self.como_dict().items()
+        )
+
+
+def rss_pico_bytes():
+    """Pico de memoria residente del proceso en bytes, o 0 si la plataforma no lo reporta"""
+    if resource is None:
+        return 0
+    # En Linux ru_maxrss viene en KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -0,0 +1,225 @@
+import logging
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+
+try:
+    import numpy
+except ImportError:  # numpy es opcional; sin él se usa el cálculo en Python puro
+    numpy = None
+
+_logger = logging.getLogger(__name__)
+
+# Dígitos extra con los que se descarta el ruido binario antes de redondear (16.054999999999996 -> 16.055)
+_digitos_guarda = 6
+
+
+def redondear(valor, digitos=2):
+    """
+    Redondea con los medios hacia arriba (ROUND_HALF_UP) sobre el valor decimal.
+
+    Es la única regla de redondeo de precios: round() y numpy.round redondean
+    los medios al par y sobre la representación binaria, así que 16.055 daba
+    16.05 en una ruta y 16.06 en otra.
+    """
+    decimal = Decimal(repr(valor)).quantize(Decimal(1).scaleb(-(digitos + _digitos_guarda)), rounding=ROUND_HALF_EVEN)
+    return float(decimal.quantize(Decimal(1).scaleb(-digitos), rounding=ROUND_HALF_UP))
+
+
+def redondear_multiplo(valor, multiplo, digitos=2):
+    """Redondea al múltiplo más cercano de ``multiplo``, con los medios hacia arriba"""
+    multiplo = Decimal(repr(multiplo))
+    cociente = (Decimal(repr(valor)) / multiplo).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return redondear(float(cociente * multiplo), digitos)
+
+
+def redondear_arreglo(valores, digitos=2):
+    """
+    Versión vectorial de redondear() para un numpy.ndarray de float64.
+
+    Mismos dos pasos: primero se descarta el ruido binario redondeando a
+    digitos + _digitos_guarda, y luego se redondea con los medios hacia
+    arriba (lejos de cero). Tras el primer paso el valor escalado tiene a lo
+    más _digitos_guarda decimales, así que un margen de una décima de esa
+    unidad basta para absorber el error de la multiplicación sin tocar
+    valores que no son medios exactos. Los NaN se conservan.
+    """
+    escala = 10.0 ** digitos
+    limpio = numpy.round(valores, digitos + _digitos_guarda)
+    margen = 10.0 ** -(_digitos_guarda + 1)
+    return numpy.copysign(numpy.floor(numpy.abs(limpio) * escala + 0.5 + margen), limpio) / escala
+
+
+def redondear_multiplo_arreglo(valores, multiplo, digitos=2):
+    """Versión vectorial de redondear_multiplo()"""
+    return redondear_arreglo(redondear_arreglo(valores / multiplo, 0) * multiplo, digitos)
+
+
+def calcular_precios_lote(precios, tasas, usd_a_mxn, ganancia_porcentaje, digitos=2):
+    """
+    Calcula standard_price y list_price para un lote completo de precios.
+
+    Args:
+        precios: Lista de 'Su Precio' ya convertidos a float (None si no es válido)
+        tasas: Lista con la tasa de cambio aplicable a cada fila
+        usd_a_mxn: Si es True los precios se multiplican por su tasa
+        ganancia_porcentaje: Margen a aplicar sobre el costo
+        digitos: Dígitos de redondeo
+
+    Returns:
+        Tupla (standard_prices, list_prices, invalidos) donde invalidos son
+        los índices de las filas sin precio válido; en esas posiciones los
+        precios calculados son None.
+
+    Con numpy el lote se calcula y redondea con operaciones vectoriales
+    (redondear_arreglo); ambas rutas dan exactamente los mismos precios.
+    """
+    factor_ganancia = 1 + (ganancia_porcentaje / 100)
+    invalidos = [i for i, precio in enumerate(precios) if precio is None]
+    if numpy is not None and precios:
+        base = numpy.array([numpy.nan if p is None else p for p in precios], dtype=numpy.float64)
+        if usd_a_mxn:
+            base = base * numpy.asarray(tasas, dtype=numpy.float64)
+        standard = redondear_arreglo(base, digitos)
+        standard_prices = standard.tolist()
+        list_prices = redondear_arreglo(standard * factor_ganancia, digitos).tolist()
+        for i in invalidos:
+            standard_prices[i] = list_prices[i] = None
+        return standard_prices, list_prices, invalidos
+
+    standard_prices = []
+    list_prices = []
+    for precio, tasa in zip(precios, tasas):
+        if precio is None:
+            standard_prices.append(None)
+            list_prices.append(None)
+            continue
+        standard = redondear(precio * tasa if usd_a_mxn else precio, digitos)
+        standard_prices.append(standard)
+        list_prices.append(redondear(standard * factor_ganancia, digitos))
+    return standard_prices, list_prices, invalidos
+
+
+class ReglaPrecio:
+    """
+    Regla de precio compilada: aplica a las filas cuya ruta de categoría
+    empieza con ``ruta`` (vacía para todas), cuya marca es ``marca`` (None
+    para todas) y cuyo costo cae en [costo_desde, costo_hasta); costo_hasta
+    en None no tiene límite.
+    """
+
+    __slots__ = ('ruta', 'marca', 'costo_desde', 'costo_hasta', 'ganancia_porcentaje', 'redondeo', 'precio_minimo')
+
+    def __init__(self, ruta=(), marca=None, costo_desde=0.0, costo_hasta=None, ganancia_porcentaje=0.0, redondeo=0.0, precio_minimo=0.0):
+        self.ruta = tuple(ruta)
+        self.marca = marca.casefold() if marca else None
+        self.costo_desde = costo_desde or 0.0
+        self.costo_hasta = costo_hasta or None
+        self.ganancia_porcentaje = ganancia_porcentaje
+        self.redondeo = redondeo or 0.0
+        self.precio_minimo = precio_minimo or 0.0
+
+    def aplica(self, ruta, marca):
+        return (not self.ruta or ruta[:len(self.ruta)] == self.ruta) and (not self.marca or self.marca == marca)
+
+    @property
+    def factor(self):
+        return 1 + self.ganancia_porcentaje / 100
+
+    def precio_venta(self, costo, digitos=2):
+        """list_price de un costo que ya cae en la banda de la regla"""
+        return self.ajustar(costo * self.factor, digitos)
+
+    def ajustar(self, bruto, digitos=2):
+        """Redondear un costo ya multiplicado por el factor y aplicar redondeo y precio mínimo"""
+        lista = redondear(bruto, digitos)
+        if self.redondeo:
+            lista = redondear_multiplo(lista, self.redondeo, digitos)
+        return float(max(lista, self.precio_minimo))
+
+
+class TablaReglasPrecio:
+    """
+    Reglas de precio de una ejecución, compiladas una sola vez.
+
+    Las reglas van en orden de prioridad y gana la primera que aplica; las
+    filas sin regla usan la ganancia general de la configuración. Las reglas
+    candidatas de cada combinación (ruta de categoría, marca) se calculan la
+    primera vez que aparece y quedan en memoria, así que el costo por fila no
+    depende de cuántas reglas haya. El precio de venta se evalúa por grupo de
+    filas con las mismas candidatas, con numpy si está disponible.
+    """
+
+    def __init__(self, reglas, ganancia_porcentaje):
+        self.reglas = tuple(reglas)
+        self.por_omision = ReglaPrecio(costo_desde=float('-inf'), ganancia_porcentaje=ganancia_porcentaje)
+        # Si ninguna regla filtra por categoría ni marca, todas las filas comparten candidatas
+        self.requiere_claves = any(regla.ruta or regla.marca for regla in self.reglas)
+        self._candidatas = {}
+
+    def __len__(self):
+        return len(self.reglas)
+
+    @staticmethod
+    def clave(ruta, marca):
+        """Clave de búsqueda de una fila: ruta de categoría normalizada y marca sin distinguir mayúsculas"""
+        return ruta, marca.casefold() if marca else None
+
+    def candidatas(self, clave):
+        """Reglas que aplican a la clave, en orden de prioridad, terminando en la regla general"""
+        candidatas = self._candidatas.get(clave)
+        if candidatas is None:
+            ruta, marca = clave
+            candidatas = tuple(regla for regla in self.reglas if regla.aplica(ruta, marca)) + (self.por_omision,)
+            self._candidatas[clave] = candidatas
+        return candidatas
+
+    def precios_venta(self, standard_prices, claves=None, digitos=2):
+        """
+        Calcula list_price para un lote de costos.
+
+        Args:
+            standard_prices: Costos ya calculados (None en las filas inválidas)
+            claves: Clave de cada fila (ver clave()); None si no se necesitan
+            digitos: Dígitos de redondeo
+
+        Returns:
+            Lista de list_price alineada con standard_prices, con None en las filas inválidas
+        """
+        grupos = {}
+        if claves is None or not self.requiere_claves:
+            grupos[self.candidatas(((), None))] = [i for i, costo in enumerate(standard_prices) if costo is not None]
+        else:
+            for i, (costo, clave) in enumerate(zip(standard_prices, claves)):
+                if costo is not None:
+                    grupos.setdefault(self.candidatas(clave), []).append(i)
+
+        list_prices = [None] * len(standard_prices)
+        for candidatas, indices in grupos.items():
+            if not indices:
+                continue
+            if numpy is not None:
+                costos = numpy.array([standard_prices[i] for i in indices], dtype=numpy.float64)
+                lista = numpy.zeros(len(indices), dtype=numpy.float64)
+                pendientes = numpy.ones(len(indices), dtype=bool)
+                for regla in candidatas:
+                    mascara = pendientes & (costos >= regla.costo_desde)
+                    if regla.costo_hasta is not None:
+                        mascara &= costos < regla.costo_hasta
+                    if not mascara.any():
+                        continue
+                    valores = redondear_arreglo(costos[mascara] * regla.factor, digitos)
+                    if regla.redondeo:
+                        valores = redondear_multiplo_arreglo(valores, regla.redondeo, digitos)
+                    lista[mascara] = numpy.maximum(valores, regla.precio_minimo)
+                    pendientes &= ~mascara
+                    if not pendientes.any():
+                        break
+                for i, valor in zip(indices, lista.tolist()):
+                    list_prices[i] = valor
+                continue
+            for i in indices:
+                costo = standard_prices[i]
+                for regla in candidatas:
+                    if costo >= regla.costo_desde and (regla.costo_hasta is None or costo < regla.costo_hasta):
+                        list_prices[i] = regla.precio_venta(costo, digitos)
+                        break
+        return list_prices
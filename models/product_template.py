@@ -3,6 +3,11 @@
 # ===========================
 from odoo import models
 from odoo import fields
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+_indice_syscom_modelo = 'product_template_syscom_modelo_uniq'
 
 
 class ProductTemplate(models.Model):
@@ -10,8 +15,53 @@ class ProductTemplate(models.Model):
 
     syscom_url = fields.Text(string='URL', help='Enlace SYSCOM del producto importado.')
     syscom_url_image = fields.Text(string='URL Imagen', help='Enlace SYSCOM de la imagen del producto importado.')
+    syscom_modelo = fields.Char(
+        string='Modelo Syscom',
+        copy=False,
+        readonly=True,
+        help="Columna 'Modelo' del feed de Syscom; identifica al producto en las importaciones."
+    )
+    syscom_descontinuado = fields.Boolean(
+        string='Descontinuado por Syscom',
+        copy=False,
+        readonly=True,
+        help='Archivado por la importación al no venir en el feed; solo estos productos se reactivan si el código vuelve.'
+    )
+
+    def init(self):
+        """Llenar syscom_modelo en productos ya importados y crear su índice único parcial
+
+        Se toma default_code de los productos con tarifa del proveedor Syscom;
+        si hay códigos repetidos solo se llena uno (el activo de menor id) para
+        que el índice único pueda crearse.
+        """
+        super().init()
+        self.env.cr.execute(SQL(
+            """
+            UPDATE product_template pt
+               SET syscom_modelo = origen.default_code
+              FROM (
+                    SELECT DISTINCT ON (t.default_code) t.id, t.default_code
+                      FROM product_template t
+                      JOIN product_supplierinfo si ON si.product_tmpl_id = t.id
+                      JOIN res_partner rp ON rp.id = si.partner_id
+                     WHERE t.default_code IS NOT NULL
+                       AND rp.name ILIKE %s AND rp.supplier_rank > 0
+                       AND NOT EXISTS (SELECT 1 FROM product_template o WHERE o.syscom_modelo = t.default_code)
+                  ORDER BY t.default_code, t.active DESC, t.id
+                   ) AS origen
+             WHERE pt.id = origen.id AND pt.syscom_modelo IS NULL
+            """,
+            '%Syscom%',
+        ))
+        if self.env.cr.rowcount:
+            _logger.info(f'Syscom: syscom_modelo llenado en {self.env.cr.rowcount} productos existentes')
+        self.env.cr.execute(SQL(
+            "CREATE UNIQUE INDEX IF NOT EXISTS %s ON product_template (syscom_modelo) WHERE syscom_modelo IS NOT NULL",
+            SQL.identifier(_indice_syscom_modelo),
+        ))
 
     def action_import_from_syscom(self):
         """Acción para importar desde Syscom"""
         config = self.env['syscom.config'].get_config()
-        return config.ejecutar_importacion()
+        return config.action_importar_segundo_plano()
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+
+_logger = logging.getLogger(__name__)
+
+# Formato: _magia, uint32 con la longitud de la cabecera JSON, la cabecera y
+# las secciones alineadas a 8 bytes, en el orden de _secciones. Los códigos
+# van ordenados y concatenados en UTF-8; 'offsets' tiene filas + 1 entradas.
+_magia = b"SYSSNAP1"
+_secciones = (
+    ("hashes", "Q"),
+    ("standard_price", "d"),
+    ("list_price", "d"),
+    ("offsets", "Q"),
+)
+
+
+def hash_contenido(valores):
+    """Hash de 64 bits estable del contenido de una fila (tupla de valores simples)."""
+    texto = "\x1f".join("" if v is None else str(v) for v in valores)
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class EscritorSnapshot:
+    """
+    Acumula (código, hash, precios) de la ejecución y los escribe ordenados al
+    cerrar. Es seguro llamar agregar() desde varios hilos (importación en
+    paralelo). Se escribe en ``.part`` y solo se publica con cerrar().
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._entradas = {}
+        self._candado = threading.Lock()
+
+    def agregar(self, codigo, hash_fila, standard_price, list_price):
+        with self._candado:
+            self._entradas[codigo] = (hash_fila, standard_price, list_price)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def cerrar(self, validado=None):
+        """
+        Publica el snapshot.
+
+        Args:
+            validado: Fecha ISO de la última validación completa contra la base
+                de datos; por omisión, la fecha actual
+        """
+        codigos = sorted(self._entradas)
+        hashes = array("Q")
+        standard = array("d")
+        lista = array("d")
+        offsets = array("Q", [0])
+        textos = bytearray()
+        for codigo in codigos:
+            hash_fila, standard_price, list_price = self._entradas[codigo]
+            hashes.append(hash_fila)
+            standard.append(standard_price)
+            lista.append(list_price)
+            textos += codigo.encode("utf-8")
+            offsets.append(len(textos))
+        secciones = {"hashes": hashes.tobytes(), "standard_price": standard.tobytes(),
+                     "list_price": lista.tobytes(), "offsets": offsets.tobytes()}
+        ahora = datetime.now().isoformat(timespec="seconds")
+        cabecera = {"filas": len(codigos), "creado": ahora, "validado": validado or ahora, "secciones": []}
+        posicion = 0
+        for nombre, _tipo in _secciones:
+            cabecera["secciones"].append([nombre, posicion, len(secciones[nombre])])
+            posicion += len(secciones[nombre])
+        cabecera["secciones"].append(["codigos", posicion, len(textos)])
+        datos_cabecera = json.dumps(cabecera).encode("utf-8")
+        datos_cabecera += b" " * (-(len(_magia) + 4 + len(datos_cabecera)) % 8)
+
+        ruta_parcial = self.ruta + ".part"
+        with open(ruta_parcial, "wb") as archivo:
+            archivo.write(_magia)
+            archivo.write(struct.pack("<I", len(datos_cabecera)))
+            archivo.write(datos_cabecera)
+            for nombre, _tipo in _secciones:
+                archivo.write(secciones[nombre])
+            archivo.write(textos)
+        os.replace(ruta_parcial, self.ruta)
+        self._entradas = {}
+        _logger.info(f"Snapshot del feed guardado: {self.ruta} ({len(codigos)} códigos)")
+
+
+class Snapshot:
+    """
+    Snapshot de la última importación mapeado en memoria. Las búsquedas son
+    binarias sobre los códigos ordenados, sin cargar el archivo completo.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = open(ruta, "rb")
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise ValueError(f"Snapshot vacío: {ruta}")
+        self._vista = memoryview(self._mapa)
+        try:
+            if bytes(self._vista[:len(_magia)]) != _magia:
+                raise ValueError(f"Snapshot inválido: {ruta}")
+            (largo,) = struct.unpack_from("<I", self._mapa, len(_magia))
+            inicio = len(_magia) + 4
+            self.metadatos = json.loads(bytes(self._vista[inicio:inicio + largo]))
+            inicio_datos = inicio + largo
+            tipos = dict(_secciones)
+            self._columnas = {}
+            for nombre, posicion, longitud in self.metadatos["secciones"]:
+                datos = self._vista[inicio_datos + posicion:inicio_datos + posicion + longitud]
+                self._columnas[nombre] = datos.cast(tipos[nombre]) if nombre in tipos else datos
+        except Exception:
+            self.cerrar()
+            raise
+
+    def __len__(self):
+        return self.metadatos["filas"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_excepcion):
+        self.cerrar()
+
+    def codigo(self, indice):
+        offsets = self._columnas["offsets"]
+        return bytes(self._columnas["codigos"][offsets[indice]:offsets[indice + 1]]).decode("utf-8")
+
+    def entrada(self, indice):
+        """Tupla (hash, standard_price, list_price) de la posición indicada."""
+        return (self._columnas["hashes"][indice],
+                self._columnas["standard_price"][indice],
+                self._columnas["list_price"][indice])
+
+    def buscar_lote(self, codigos):
+        """
+        Busca varios códigos recorriendo el snapshot en orden: los códigos se
+        ordenan y cada búsqueda binaria arranca donde terminó la anterior.
+
+        Returns:
+            Diccionario {codigo: (hash, standard_price, list_price)} de los encontrados
+        """
+        encontrados = {}
+        total = len(self)
+        claves = _ClavesSnapshot(self)
+        inicio = 0
+        for codigo in sorted(set(codigos)):
+            inicio = bisect_left(claves, codigo, inicio, total)
+            if inicio < total and self.codigo(inicio) == codigo:
+                encontrados[codigo] = self.entrada(inicio)
+        return encontrados
+
+    def cerrar(self):
+        if getattr(self, "_columnas", None):
+            for columna in self._columnas.values():
+                columna.release()
+            self._columnas = {}
+        if getattr(self, "_vista", None) is not None:
+            self._vista.release()
+            self._vista = None
+        if getattr(self, "_mapa", None) is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+
+
+class _ClavesSnapshot:
+    """Secuencia de solo lectura de los códigos, para usar con bisect."""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __getitem__(self, indice):
+        return self._snapshot.codigo(indice)
+
+
+def abrir_snapshot(ruta):
+    """Abre el snapshot si existe y es válido; None en cualquier otro caso."""
+    if not os.path.exists(ruta):
+        return None
+    try:
+        return Snapshot(ruta)
+    except (OSError, ValueError) as e:
+        _logger.warning(f"No se pudo abrir el snapshot {ruta}: {e}")
+        return None
@@ -0,0 +1,229 @@
+# ===========================
+# models/syscom_checkpoint.py
+# ===========================
+from odoo import models, fields, api, Command
+from .csv_utilerias import hash_archivo
+from datetime import timedelta
+import os
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def _valores_avance(fila_offset, totales):
+    """Valores de escritura del avance de un lote, comunes al punto de control y a sus particiones"""
+    return {
+        'fila_offset': fila_offset,
+        'fecha_actualizacion': fields.Datetime.now(),
+        'productos_procesados': totales['procesados'],
+        'productos_creados': totales['creados'],
+        'productos_actualizados': totales['actualizados'],
+        'productos_sin_cambios': totales['sin_cambios'],
+        'productos_info_proveedor': totales['info_proveedor'],
+    }
+
+
+class SyscomCheckpoint(models.Model):
+    _name = 'syscom.checkpoint'
+    _description = 'Punto de control de importaciones Syscom'
+    _order = 'fecha_actualizacion desc, id desc'
+    _rec_name = 'ruta_archivo'
+
+    config_id = fields.Many2one(
+        'syscom.config',
+        string='Configuración',
+        required=True,
+        ondelete='cascade'
+    )
+    ruta_archivo = fields.Char(
+        string='Ruta del archivo',
+        required=True
+    )
+    hash_archivo = fields.Char(
+        string='Hash del archivo',
+        required=True,
+        help='SHA-256 del CSV normalizado; si el archivo cambia el punto de control se descarta.'
+    )
+    fila_offset = fields.Integer(
+        string='Filas confirmadas',
+        default=0,
+        help='Cantidad de filas de datos del CSV ya confirmadas en base de datos.'
+    )
+    fase = fields.Selection(
+        [('normalizado', 'Normalizado'),
+         ('importando', 'Importando'),
+         ('completado', 'Completado')],
+        string='Fase',
+        required=True,
+        default='normalizado'
+    )
+    fecha_actualizacion = fields.Datetime(
+        string='Última actualización',
+        default=fields.Datetime.now
+    )
+    intentos = fields.Integer(
+        string='Intentos',
+        default=1,
+        help='Ejecuciones que han trabajado sobre este punto de control, contando la inicial.'
+    )
+    productos_procesados = fields.Integer(string='Procesados')
+    productos_creados = fields.Integer(string='Creados')
+    productos_actualizados = fields.Integer(string='Actualizados')
+    productos_sin_cambios = fields.Integer(string='Sin cambios')
+    productos_info_proveedor = fields.Integer(string='Info proveedor')
+    total_particiones = fields.Integer(
+        string='Particiones',
+        help='Cantidad de particiones de la importación en paralelo cuyo avance se registra en particion_ids.'
+    )
+    particion_ids = fields.One2many(
+        'syscom.checkpoint.particion',
+        'checkpoint_id',
+        string='Avance por partición'
+    )
+
+    @api.model
+    def obtener_pendiente(self, config, forzar_descarga=False):
+        """Obtener el último punto de control sin completar que aún se pueda reanudar
+
+        Se descarta (y la ejecución descarga de nuevo) si se pidió forzar la
+        descarga, si ya agotó config.reintentos_checkpoint, si es más antiguo
+        que config.horas_validez_checkpoint, si hay una descarga más reciente
+        que su archivo o si el archivo ya no existe o cambió.
+        """
+        checkpoint = self.search([
+            ('config_id', '=', config.id),
+            ('fase', '!=', 'completado'),
+        ], limit=1)
+        if not checkpoint:
+            return self.browse()
+        if forzar_descarga:
+            return checkpoint._descartar('se forzó una descarga nueva')
+        if config.reintentos_checkpoint and checkpoint.intentos > config.reintentos_checkpoint:
+            config.registrar_log(
+                descripcion=f'Punto de control {checkpoint.id} de {checkpoint.ruta_archivo} descartado tras {checkpoint.intentos} intentos fallidos.',
+                tipo_operacion='Punto de Control Descartado')
+            return checkpoint._descartar(f'falló {checkpoint.intentos} veces')
+        if config.horas_validez_checkpoint and \
+                checkpoint.create_date < fields.Datetime.now() - timedelta(hours=config.horas_validez_checkpoint):
+            return checkpoint._descartar(f'tiene más de {config.horas_validez_checkpoint} horas')
+        if self.env['syscom.log'].search_count([
+            ('tipo_accion', '=', 'Descarga CSV'),
+            ('fecha_descarga', '>', checkpoint.create_date),
+            ('ruta_archivo', '!=', checkpoint.ruta_archivo),
+        ]):
+            return checkpoint._descartar('hay una descarga más reciente')
+        if not os.path.exists(checkpoint.ruta_archivo):
+            return checkpoint._descartar(f'no existe {checkpoint.ruta_archivo}')
+        if hash_archivo(checkpoint.ruta_archivo) != checkpoint.hash_archivo:
+            return checkpoint._descartar('el archivo cambió desde la última ejecución')
+        return checkpoint
+
+    def _descartar(self, motivo):
+        """Cerrar el punto de control sin reanudarlo; devuelve un recordset vacío"""
+        _logger.warning(f'Syscom: Punto de control {self.id} descartado, {motivo}')
+        self.fase = 'completado'
+        return self.browse()
+
+    def registrar_intento(self):
+        """Contar un intento de reanudación antes de empezarlo, para que cuente aunque falle"""
+        self.ensure_one()
+        self.intentos += 1
+
+    @api.model
+    def iniciar(self, config, ruta_archivo):
+        """Registrar un nuevo punto de control para un CSV recién normalizado"""
+        # Un archivo nuevo sustituye a cualquier importación inconclusa anterior
+        self.search([('config_id', '=', config.id), ('fase', '!=', 'completado')]).write({'fase': 'completado'})
+        return self.create({
+            'config_id': config.id,
+            'ruta_archivo': ruta_archivo,
+            'hash_archivo': hash_archivo(ruta_archivo),
+            'fase': 'normalizado',
+        })
+
+    def registrar_avance(self, fila_offset, totales):
+        """Guardar la fila confirmada y los contadores acumulados del lote"""
+        self.ensure_one()
+        self.write(dict(_valores_avance(fila_offset, totales), fase='importando'))
+
+    def tiene_avance(self):
+        """Si ya hay filas confirmadas, en orden de fila o en alguna partición"""
+        self.ensure_one()
+        return bool(self.fila_offset or any(self.particion_ids.mapped('fila_offset')))
+
+    def particiones(self, total):
+        """Avance por partición de una importación en paralelo de ``total`` particiones
+
+        Con otra cantidad de particiones los modelos caen en particiones
+        distintas, así que el avance registrado por partición se descarta; las
+        filas ya confirmadas en orden (fila_offset) valen para todas.
+
+        Returns:
+            Recordset syscom.checkpoint.particion, uno por partición y ordenado por índice
+        """
+        self.ensure_one()
+        if self.total_particiones != total:
+            if self.particion_ids:
+                _logger.warning(f'Syscom: Punto de control {self.id} registrado con {self.total_particiones} particiones; '
+                                f'se reinicia el avance por partición para {total}')
+            self.write({
+                'total_particiones': total,
+                'fase': 'importando',
+                'particion_ids': [Command.clear()] + [
+                    Command.create({'indice': indice, 'fila_offset': self.fila_offset}) for indice in range(total)
+                ],
+            })
+        return self.particion_ids.sorted('indice')
+
+    def totales(self):
+        """Contadores acumulados en el formato que usa _procesar_csv"""
+        self.ensure_one()
+        return {
+            'procesados': self.productos_procesados,
+            'creados': self.productos_creados,
+            'actualizados': self.productos_actualizados,
+            'sin_cambios': self.productos_sin_cambios,
+            'info_proveedor': self.productos_info_proveedor,
+        }
+
+
+class SyscomCheckpointParticion(models.Model):
+    _name = 'syscom.checkpoint.particion'
+    _description = 'Avance de una partición de una importación Syscom en paralelo'
+    _order = 'checkpoint_id, indice'
+
+    checkpoint_id = fields.Many2one(
+        'syscom.checkpoint',
+        string='Punto de control',
+        required=True,
+        ondelete='cascade'
+    )
+    indice = fields.Integer(string='Partición', required=True)
+    fila_offset = fields.Integer(
+        string='Última fila confirmada',
+        default=0,
+        help='Fila de datos del CSV del último lote confirmado de esta partición; '
+             'las filas de la partición hasta ella no se vuelven a procesar.'
+    )
+    fecha_actualizacion = fields.Datetime(string='Última actualización')
+    productos_procesados = fields.Integer(string='Procesados')
+    productos_creados = fields.Integer(string='Creados')
+    productos_actualizados = fields.Integer(string='Actualizados')
+    productos_sin_cambios = fields.Integer(string='Sin cambios')
+    productos_info_proveedor = fields.Integer(string='Info proveedor')
+
+    def registrar_avance(self, fila_offset, totales):
+        """Guardar el último lote confirmado de la partición; solo lo escribe el hilo de esa partición"""
+        self.ensure_one()
+        self.write(_valores_avance(fila_offset, totales))
+
+    def totales(self):
+        """Contadores acumulados de la partición en el formato que usa _procesar_csv"""
+        self.ensure_one()
+        return {
+            'procesados': self.productos_procesados,
+            'creados': self.productos_creados,
+            'actualizados': self.productos_actualizados,
+            'sin_cambios': self.productos_sin_cambios,
+            'info_proveedor': self.productos_info_proveedor,
+        }
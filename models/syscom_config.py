@@ -4,13 +4,29 @@
 # ===========================
 from odoo import models, fields, api
 from odoo.exceptions import UserError
-from datetime import datetime
-from .csv_utilerias import  normaliza_csv
+from odoo.tools import SQL
+from odoo.addons.base.models.res_partner import _tz_get
+from datetime import datetime, timedelta
+from .csv_utilerias import abrir_csv_normalizado, archivo_limpio, hash_archivo, parsear_numero
+from .precio_utilerias import calcular_precios_lote
+from .bitacora_precios import BitacoraPrecios
+from concurrent.futures import ThreadPoolExecutor
+import zlib
+from .artefacto_feed import EscritorArtefacto, clave_artefacto, leer_artefacto, ruta_artefacto
+from .descarga_utilerias import descargar_archivo, sondear_archivo, NO_MODIFICADO, RESPUESTA_HTML
+from .metricas import MedidorFases, rss_pico_bytes
+from .snapshot_feed import EscritorSnapshot, abrir_snapshot, hash_contenido
+from .fila_feed import FilaFeed
 import requests
+import pytz
+import base64
 import csv
+import io
 import os
 import logging
-import shutil
+import random
+import uuid
+from contextlib import nullcontext
 
 _logger = logging.getLogger(__name__)
 _proveedor_nombre = "Syscom"  # Nombre del proveedor para asociar a los productos importados
@@ -18,10 +34,23 @@ _ruta_descarga = "/tmp/syscom_downloads"
 _archivo_prueba = f"{_ruta_descarga}/verifica.txt"
 _archivo_csv_prefijo = "syscom_products_"
 _archivo_csv_extension = ".csv"
-_archivo_bitacora_precios = f"{_ruta_descarga}/syscom_precios_bitacora.txt"
+# Extensiones de los archivos de descarga y sus asociados que se eliminan al limpiar descargas antiguas
+_extensiones_descarga = ('.csv', '.csv_bak', '.csv.utf8', '.csv.part', '.feed', '.feed.part')
+_archivo_no_modificado = "NoModificado"  # Valor devuelto por _descargar_csv cuando el servidor responde 304
+_archivo_bitacora_precios = f"{_ruta_descarga}/syscom_precios_bitacora.jsonl"
+_archivo_snapshot_prefijo = f"{_ruta_descarga}/syscom_snapshot_"  # + id de la configuración + .snap
+_muestra_validacion_snapshot = 200  # Productos del snapshot que se comparan contra la base de datos en cada ejecución
 _usar_bitacora_precios = True  # Variable para controlar el uso de la bitácora de precios
 _elimiar_archivo_previo = True
 _tiempo_espera_descarga = 300  # segundos
+_tiempo_espera_sondeo = 60  # segundos
+_minutos_entre_sondeos_hash = 60  # Sin ETag ni Last-Modified el sondeo descarga el contenido completo; espaciarlo
+_encabezados_descarga = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/csv,application/csv,text/plain,*/*',
+    'Accept-Language': 'es-MX,es;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive',
+}
 _periodo_actualizaciones = 5  # tiempo en segundos para mostrar progreso de descarga
 _id_objetoimp = "02"  # variable global para asignar el id del objeto de impuesto a los productos importados
 _id_cat_unidad_medida = 1  # variable global para asignar la categoría de unidad de medida a los productos importados
@@ -30,16 +59,32 @@ _registros_por_batch = 5000  # cantidad de registros a procesar por batch en la
 _mxn_valor = 1.0  # Valor de respaldo para convertir USD a MXN si no se encuentra en el CSV o en la configuración
 _digitos_redondeo = 2  # Cantidad de dígitos para redondear la tasa de cambio al actualizarla desde el CSV o al calcular precios
 _sin_marca_nombre = "S/M"  # Nombre de marca por defecto para productos sin marca especificada
-
-# Funcion de bitacora a archivo de texto (opcional, se puede usar solo el modelo syscom.log para registrar eventos)
-def registrar_bitacora_precios(mensaje):
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    try:
-        os.makedirs(_ruta_descarga, exist_ok=True)
-        with open(_archivo_bitacora_precios, 'a') as f:
-            f.write(f'[{timestamp}] {mensaje}\n')
-    except Exception as e:
-        _logger.error(f'Error al registrar en bitácora de precios: {str(e)}')
+# Contexto del modo masivo: sin seguimiento ni mensajes de chatter y sin precargar campos no solicitados
+_contexto_importacion_masiva = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_notrack': True,
+    'prefetch_fields': False,
+}
+# Valores iguales para todos los productos creados; se agregan al armar los valores de create(), no por fila
+_valores_fijos_creacion = {
+    'type': 'consu',
+    'purchase_ok': True,
+    'sale_ok': True,
+    'cat_unidad_medida': _id_cat_unidad_medida,
+    'objetoimp': _id_objetoimp,
+}
+# Fases del importador que se guardan como campos numéricos en syscom.log
+_fases_bitacora = ('leer', 'clasificar', 'crear', 'actualizar', 'info_proveedor')
+# Columnas del archivo de diferencias de la vista previa
+_columnas_vista_previa = ('accion', 'modelo', 'nombre', 'categoria', 'campos', 'precio_anterior', 'precio_nuevo', 'delta')
+# Campos de product.template que se comparan para decidir si un producto existente debe actualizarse
+_campos_comparables = ['name', 'standard_price', 'list_price', 'syscom_url', 'syscom_url_image', 'product_brand_id', 'categ_id', 'syscom_descontinuado', 'syscom_modelo']
+
+def indice_particion(modelo, total_particiones):
+    """Partición estable de un código 'Modelo' para la importación en paralelo"""
+    return zlib.crc32(modelo.encode('utf-8')) % total_particiones
 
 
 class SyscomConfig(models.Model):
@@ -62,7 +107,14 @@ class SyscomConfig(models.Model):
         string='Hora de ejecución',
         default=2.0,
         required=True,
-        help='Hora del día para ejecutar la importación automática (formato 24h)'
+        help='Hora del día para ejecutar la importación automática (formato 24h), en la zona horaria de la configuración'
+    )
+    zona_horaria = fields.Selection(
+        _tz_get,
+        string='Zona horaria',
+        required=True,
+        default=lambda self: self.env.company.partner_id.tz or self.env.user.tz or 'UTC',
+        help='Zona horaria de la hora de ejecución diaria y de la ventana del sondeo de cambios.'
     )
     categorias_importar = fields.Text(
         string='Lista de categorías a importar',
@@ -84,6 +136,146 @@ class SyscomConfig(models.Model):
         default=1.0,
         help='Respaldo: tasa para convertir precios en USD a MXN si no se encuentre en el CSV.'
     )
+    tamano_bloque_descarga_kb = fields.Integer(
+        string='Bloque de descarga (KB)',
+        default=1024,
+        help='Tamaño de cada bloque leído y escrito durante la descarga del CSV.'
+    )
+    modo_paralelo = fields.Boolean(
+        string='Importación en paralelo',
+        default=False,
+        help='Procesar el feed en particiones simultáneas, cada una con su propio cursor de base de datos.'
+    )
+    hilos_importacion = fields.Integer(
+        string='Particiones en paralelo',
+        default=4,
+        help='Cantidad de particiones (y de hilos) usadas en la importación en paralelo. Una importación '
+             'interrumpida se reanuda por partición solo con la misma cantidad de particiones.'
+    )
+    modo_importacion = fields.Selection(
+        [('completa', 'Completa'), ('precios', 'Solo precios')],
+        string='Modo de importación',
+        default='completa',
+        required=True,
+        help='Solo precios actualiza costo, precio de venta y tarifa del proveedor de los productos '
+             'existentes, sin crear productos ni categorías. Cada cron puede indicar su propio modo.'
+    )
+    accion_descontinuados = fields.Selection(
+        [('ninguna', 'No hacer nada'),
+         ('archivar', 'Archivar productos'),
+         ('tarifa_cero', 'Poner en cero la tarifa del proveedor')],
+        string='Productos fuera del feed',
+        default='archivar',
+        required=True,
+        help='Qué hacer con los productos del proveedor Syscom que ya no aparecen en el feed.'
+    )
+    umbral_descontinuados = fields.Float(
+        string='Umbral de descontinuados (%)',
+        default=10.0,
+        help='Si el porcentaje de productos del proveedor ausentes del feed supera este valor no se '
+             'archiva nada (p.ej. por una descarga truncada) y se registra en la bitácora.'
+    )
+    regla_precio_ids = fields.One2many(
+        'syscom.price.rule',
+        'config_id',
+        string='Reglas de precio',
+        help='Ganancia, redondeo y precio mínimo por categoría, marca o rango de costo; '
+             'los productos sin regla usan la ganancia general.'
+    )
+    modo_masivo = fields.Boolean(
+        string='Modo masivo',
+        default=True,
+        help='Crear y escribir productos sin seguimiento de cambios ni mensajes de chatter, y recalcular '
+             'los campos dependientes una sola vez al confirmar cada lote.'
+    )
+    usar_snapshot = fields.Boolean(
+        string='Diferencias contra snapshot',
+        default=True,
+        help='Guardar en disco un índice de la última importación para omitir sin consultar la base de datos '
+             'los productos cuyo contenido no cambió.'
+    )
+    dias_validacion_snapshot = fields.Integer(
+        string='Revalidar snapshot (días)',
+        default=7,
+        help='Cada cuántos días se ignora el snapshot y se compara todo contra la base de datos para evitar '
+             'que se desfase. 0 para no revalidar por antigüedad.'
+    )
+    sondear_cambios = fields.Boolean(
+        string='Importar al detectar cambios',
+        default=False,
+        help='Sondear el feed en intervalos cortos (cron "Syscom: Sondeo de Cambios") con un HEAD o, si el '
+             'servidor no lo permite, con el hash del contenido, e importar solo cuando cambió. También '
+             'omite las ejecuciones de los crons de importación si el feed no cambió.'
+    )
+    ventana_inicio = fields.Float(
+        string='Ventana desde',
+        default=0.0,
+        help='Hora a partir de la cual el sondeo puede iniciar importaciones (formato 24h), en la zona horaria de la configuración.'
+    )
+    ventana_fin = fields.Float(
+        string='Ventana hasta',
+        default=0.0,
+        help='Hora hasta la cual el sondeo puede iniciar importaciones. Igual a "Ventana desde" '
+             'para todo el día; si es menor, la ventana cruza la medianoche.'
+    )
+    fecha_ultimo_sondeo = fields.Datetime(string='Último sondeo', readonly=True)
+    resultado_ultimo_sondeo = fields.Char(string='Resultado del último sondeo', readonly=True)
+    metodo_ultimo_sondeo = fields.Selection(
+        [('head', 'Encabezados HTTP'), ('hash', 'Hash del contenido')],
+        string='Método del último sondeo',
+        readonly=True,
+        help=f'Con "Hash del contenido" el servidor no envía ETag ni Last-Modified y el sondeo de intervalo '
+             f'corto se espacia a cada {_minutos_entre_sondeos_hash} minutos.'
+    )
+    reintentos_checkpoint = fields.Integer(
+        string='Reanudaciones máximas',
+        default=3,
+        help='Veces que se reanuda una importación interrumpida antes de descartarla y descargar de nuevo. 0 sin límite.'
+    )
+    horas_validez_checkpoint = fields.Integer(
+        string='Validez del punto de control (horas)',
+        default=24,
+        help='Una importación interrumpida más antigua que esto ya no se reanuda. 0 sin límite.'
+    )
+    reintentos_descarga = fields.Integer(
+        string='Reintentos de descarga',
+        default=3,
+        help='Reintentos con espera exponencial si la conexión se corta; la descarga se reanuda con HTTP Range.'
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        configs = super().create(vals_list)
+        configs[:1]._programar_cron_diario()
+        return configs
+
+    def write(self, vals):
+        resultado = super().write(vals)
+        if 'hora_ejecucion' in vals or 'zona_horaria' in vals:
+            self.get_config()._programar_cron_diario()
+        return resultado
+
+    def _programar_cron_diario(self):
+        """Mover la siguiente ejecución del cron diario a hora_ejecucion en zona_horaria
+
+        El cron avanza de un día en un día a partir de su siguiente ejecución,
+        así que basta con alinearla una vez cada que cambia la hora.
+        """
+        cron = self.env.ref(f'{self._module}.ir_cron_syscom_import', raise_if_not_found=False)
+        if not self or not cron:
+            return
+        zona = self._zona_horaria()
+        ahora = datetime.now(pytz.utc).astimezone(zona)
+        horas, minutos = divmod(round(self.hora_ejecucion * 60) % (24 * 60), 60)
+        siguiente = zona.localize(datetime.combine(ahora.date(), datetime.min.time().replace(hour=horas, minute=minutos)))
+        if siguiente <= ahora:
+            siguiente = zona.localize(datetime.combine(ahora.date() + timedelta(days=1), siguiente.time()))
+        cron.sudo().nextcall = siguiente.astimezone(pytz.utc).replace(tzinfo=None)
+        _logger.info(f'Syscom: Importación diaria programada para {siguiente.isoformat()}')
+
+    def _zona_horaria(self):
+        """Zona horaria de la configuración, la misma para el cron diario y la ventana del sondeo"""
+        return pytz.timezone(self.zona_horaria or 'UTC')
 
     @api.model
     def get_config(self):
@@ -93,11 +285,45 @@ class SyscomConfig(models.Model):
             raise UserError('No hay configuración de Syscom definida.')
         return config
 
+    def action_importar_segundo_plano(self):
+        """Encolar la importación para el cron de segundo plano y mostrar su avance"""
+        self.ensure_one()
+        trabajo = self.env['syscom.importacion'].encolar(self, self.env.context.get('syscom_modo_importacion'))
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Importación Syscom',
+            'res_model': 'syscom.importacion',
+            'res_id': trabajo.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+    def action_vista_previa_segundo_plano(self):
+        """Encolar una vista previa de la importación (sin escribir productos) y mostrar su avance"""
+        return self.with_context(syscom_modo_importacion='vista_previa').action_importar_segundo_plano()
+
     def ejecutar_importacion(self):
-        """Ejecutar el proceso de importación manualmente"""
+        """Ejecutar el proceso de importación en el proceso actual (cron o trabajo en segundo plano)"""
         self.ensure_one()
+        if not self._medidor():
+            # Toda ejecución se mide para dejar sus métricas por fase en la bitácora
+            return self.with_context(syscom_medidor=MedidorFases()).ejecutar_importacion()
         try:
             _logger.info('Iniciando importación manual desde Syscom')
+            modo = self._modo_importacion()
+            solo_precios = modo == 'precios'
+
+            # 1. Reanudar una importación interrumpida si su archivo sigue intacto
+            checkpoint = modo == 'completa' and self.env['syscom.checkpoint'].obtener_pendiente(
+                self, forzar_descarga=self.env.context.get('syscom_forzar_descarga'))
+            if checkpoint:
+                checkpoint.registrar_intento()
+                self.env.cr.commit()
+                _logger.info("Syscom: Reanudando importación de %s desde la fila %s", checkpoint.ruta_archivo, checkpoint.fila_offset)
+                self._procesar_csv(checkpoint.ruta_archivo, checkpoint=checkpoint)
+                self._limpiar_archivos_antiguos(checkpoint.ruta_archivo)
+                return self._notificacion_importacion_exitosa()
+
             periodo_segundos = self.get_config().periodo_segundos
             diferencia = 3600  # Valor inicial alto
             path_archivo_previo = ""
@@ -124,7 +350,10 @@ class SyscomConfig(models.Model):
 
             _logger.info("Syscom: Última descarga fue hace %ss", int(diferencia))
 
-            if diferencia < periodo_segundos:
+            if self.env.context.get('syscom_forzar_descarga'):
+                # El sondeo detectó un feed nuevo; no reutilizar el archivo anterior aunque sea reciente
+                _logger.info("Syscom: Cambio detectado por el sondeo; se descarga el archivo aunque el anterior sea reciente.")
+            elif diferencia < periodo_segundos:
                 if os.path.exists(last_log.ruta_archivo):
                     _logger.info("Syscom: El tiempo transcurrido (%ss) es menor al periodo (%ss). Reutilizando archivo anterior.", int(diferencia), periodo_segundos)
                     reutilizar_archivo = True
@@ -146,47 +375,112 @@ class SyscomConfig(models.Model):
             else:
                 # Proceder con la descarga normal
                 _logger.info("Syscom: Iniciando nueva descarga del archivo CSV...")
-                archivo_path = self._descargar_csv()
+                with self._fase('descarga'):
+                    archivo_path = self._descargar_csv()
                 _elimiar_archivo_previo = True  # Si descargamos un nuevo archivo, sí eliminaremos el previo después de procesar
                 _logger.info("Syscom: Archivo descargado en: %s", archivo_path)
 
+            if archivo_path == _archivo_no_modificado and last_log and os.path.exists(last_log.ruta_archivo or '') \
+                    and (modo == 'vista_previa' or self._configuracion_precios_cambio()):
+                # Con el mismo feed, una vista previa o un cambio de márgenes o reglas sí producen precios distintos
+                _logger.info("Syscom: El CSV no cambió en el servidor; se reprocesa la última descarga: %s", last_log.ruta_archivo)
+                archivo_path = last_log.ruta_archivo
+
+            if archivo_path == _archivo_no_modificado:
+                _logger.info("Syscom: El CSV no cambió en el servidor; se omite el procesamiento.")
+                return {
+                    'type': 'ir.actions.client',
+                    'tag': 'display_notification',
+                    'params': {
+                        'title': 'Sin cambios',
+                        'message': 'El archivo de Syscom no cambió desde la última importación',
+                        'type': 'info',
+                        'sticky': False,
+                        }
+                    }
+
             if archivo_path == "NoCSV":
                 _logger.error("Syscom: El archivo descargado no es un CSV válido. Verifique la URL y el acceso al recurso.")
                 _elimiar_archivo_previo = False  # No eliminaremos el archivo previo si el nuevo no es válido
                 raise ValueError("No se descargo el csv correctamente.")
 
+            # La decodificación a UTF-8 ocurre durante la lectura y su tiempo cuenta en la fase 'leer'
             archivo_path, no_usado = self.csv_limpiar(archivo_path, mantener_respaldo=True)
 
+            if modo == 'vista_previa':
+                _logger.info("Syscom: Generando vista previa de cambios desde: %s", archivo_path)
+                vista_previa = self._generar_vista_previa(archivo_path)
+                return {
+                    'type': 'ir.actions.act_window',
+                    'name': 'Vista previa Syscom',
+                    'res_model': 'syscom.vista.previa',
+                    'res_id': vista_previa.id,
+                    'view_mode': 'form',
+                    'target': 'current',
+                }
+
+            if solo_precios:
+                _logger.info("Syscom: Actualizando solo precios desde: %s", archivo_path)
+                self._actualizar_solo_precios(archivo_path)
+                self._limpiar_archivos_antiguos(archivo_path)
+                return self._notificacion_importacion_exitosa()
+
+            # Registrar el punto de control antes de empezar a escribir productos
+            checkpoint = self.env['syscom.checkpoint'].iniciar(self, archivo_path)
+            self.env.cr.commit()
+
             _logger.info("Syscom: Procesando el archivo CSV: %s", archivo_path)
 
-            self._procesar_csv(archivo_path)
+            self._procesar_csv(archivo_path, checkpoint=checkpoint)
 
             # Si procesamos sin errores, limpiar archivos antiguos descargados
             self._limpiar_archivos_antiguos(archivo_path)
 
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'Importación Exitosa',
-                    'message': 'Los productos han sido importados correctamente',
-                    'type': 'success',
-                    'sticky': False,
-                    }
-                }
+            return self._notificacion_importacion_exitosa()
         except Exception as e:
             _logger.error(f'Error en importación: {str(e)}')
             raise UserError(f'Error al importar productos: {str(e)}')
 
+    def _modo_importacion(self):
+        """Modo de la ejecución actual; el cron puede sobreescribirlo con el contexto 'syscom_modo_importacion'"""
+        return self.env.context.get('syscom_modo_importacion') or self.modo_importacion
+
+    def _huella_precios(self):
+        """Huella de la configuración que interviene en el cálculo de precios: conversión, ganancia y reglas activas
+
+        No incluye tasa_cambio: solo es el respaldo si el CSV no trae 'Tipo de Cambio'
+        y se reescribe con cada descarga.
+        """
+        valores = [self.usd_a_mxn, self.ganancia_porcentaje]
+        for regla in self.regla_precio_ids.filtered('active').sorted(lambda r: (r.sequence, r.id)):
+            valores.extend((regla.categ_id.id, regla.marca, regla.costo_desde, regla.costo_hasta,
+                            regla.ganancia_porcentaje, regla.redondeo, regla.precio_minimo))
+        return format(hash_contenido(valores), '016x')
+
+    def _configuracion_precios_cambio(self):
+        """Si la configuración de precios cambió desde la última importación procesada
+
+        Las bitácoras anteriores a la huella de precios no se consideran cambio.
+        """
+        ultimo = self.env['syscom.log'].search([('tipo_accion', '=', 'Procesar CSV')], limit=1, order='fecha_descarga desc')
+        return bool(ultimo.huella_precios) and ultimo.huella_precios != self._huella_precios()
+
+    def _notificacion_importacion_exitosa(self):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Importación Exitosa',
+                'message': 'Los productos han sido importados correctamente',
+                'type': 'success',
+                'sticky': False,
+                }
+            }
+
     def _descargar_csv(self):
         """Descargar el archivo CSV desde la URL configurada"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'text/csv,application/csv,text/plain,*/*',
-                'Accept-Language': 'es-MX,es;q=0.9,en;q=0.8',
-                'Connection': 'keep-alive',
-            }
+            headers = dict(_encabezados_descarga)
             # Configurar sesión y URL (tu código actual)
             # ...
 
@@ -249,27 +543,38 @@ class SyscomConfig(models.Model):
                     last_print_time = current_time
                     last_print_size = current_size
 
-            # Descargar con stream
-            response = requests.get(
-                self.syscom_url,
-                headers=headers,
-                timeout=300,  # 5 minutos máximo
-                stream=True,
-                allow_redirects=True
-            )
+            # Crear directorio
+            download_dir = _ruta_descarga
+            os.makedirs(download_dir, exist_ok=True)
 
-            response.raise_for_status()
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f'{_archivo_csv_prefijo}{timestamp}{_archivo_csv_extension}'
+            file_path = os.path.join(download_dir, filename)
 
-            # obtener el tipo de contenido
-            content_type = response.headers.get('Content-Type', '')
+            # Solo enviar validadores si el archivo previo sigue disponible para reutilizarse
+            etag_previo = previous_log.etag if previous_file else None
+            last_modified_previo = previous_log.last_modified if previous_file else None
 
-            # Obtener tamaño total si está disponible
-            total_size = int(response.headers.get('content-length', 0))
+            _logger.info("🚀 Iniciando descarga...")
 
-            if total_size:
-                _logger.info(f"Tamaño total del archivo: {total_size / (1024*1024):.2f} MB")
+            resultado_descarga = descargar_archivo(
+                self.syscom_url,
+                file_path,
+                headers=headers,
+                etag=etag_previo,
+                last_modified=last_modified_previo,
+                tamano_bloque=max(self.tamano_bloque_descarga_kb, 8) * 1024,
+                reintentos=self.reintentos_descarga,
+                timeout=_tiempo_espera_descarga,
+                progreso=print_progress,
+            )
+
+            if resultado_descarga['estado'] == NO_MODIFICADO:
+                _logger.info("Syscom: El servidor respondió 304, el CSV no cambió desde la última descarga.")
+                self.registrar_log(descripcion=f'El archivo {previous_file} no cambió en el servidor (HTTP 304).', tipo_operacion='Descarga sin cambios')
+                return _archivo_no_modificado
 
-            if 'text/html' in content_type:
+            if resultado_descarga['estado'] == RESPUESTA_HTML:
                 _logger.error(
                     "Syscom Error: El servidor devolvió HTML (posible bloqueo o página de login).")
                 if previous_file:
@@ -277,27 +582,12 @@ class SyscomConfig(models.Model):
                     return previous_file
                 return "NoCSV"
 
-            # Crear directorio
-            download_dir = _ruta_descarga
-            os.makedirs(download_dir, exist_ok=True)
-
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'{_archivo_csv_prefijo}{timestamp}{_archivo_csv_extension}'
-            file_path = os.path.join(download_dir, filename)
-
-            # Descargar por chunks con progreso
-            downloaded = 0
-            chunk_size = 8192  # 8KB chunks
-
-            _logger.info("🚀 Iniciando descarga...")
-
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        # Mostrar progreso
-                        print_progress(downloaded, total_size)
+            downloaded = resultado_descarga['bytes']
+            if self._medidor():
+                self._medidor().agregar('descarga', bytes=downloaded)
+            total_size = resultado_descarga['total']
+            if total_size:
+                _logger.info(f"Tamaño total del archivo: {total_size / (1024*1024):.2f} MB")
 
             # Mensaje final
             end_time = datetime.now()
@@ -325,6 +615,9 @@ class SyscomConfig(models.Model):
                 'categorias_importadas': lista_categorias_importadas,
                 'tipo_accion': 'Descarga CSV',
                 'tasa_cambio': "0.0",  # Se actualizará con la tasa real al procesar el CSV, si se encuentra en él
+                'etag': resultado_descarga['etag'],
+                'last_modified': resultado_descarga['last_modified'],
+                'hash_contenido': hash_archivo(file_path),
             })
 
             _logger.info(f"Syscom: Registro creado en bitácora con ID {resultado.id} para la descarga realizada.")
@@ -359,12 +652,12 @@ class SyscomConfig(models.Model):
             for nombre_archivo in os.listdir(download_dir):
                 ruta_archivo = os.path.join(download_dir, nombre_archivo)
                 ruta_bak = ruta_archivo + "_bak"
-                if ruta_archivo == archivo_actual or \
+                # Conservar el archivo actual y sus archivos asociados (marca .utf8, etc.)
+                if ruta_archivo.startswith(archivo_actual) or \
                    ruta_bak == archivo_actual:
                     continue
                 # Solo eliminar archivos que coincidan con el patrón de descargas de syscom
-                if nombre_archivo.startswith('syscom_products_') and nombre_archivo.endswith('.csv') or \
-                   nombre_archivo.startswith('syscom_products_') and nombre_archivo.endswith('.csv_bak'):
+                if nombre_archivo.startswith(_archivo_csv_prefijo) and nombre_archivo.endswith(_extensiones_descarga):
                     try:
                         os.remove(ruta_archivo)
                         _logger.info(f'Removido archivo de descarga antiguo: {ruta_archivo}')
@@ -374,32 +667,32 @@ class SyscomConfig(models.Model):
             _logger.exception('Error al limpiar archivos antiguos en el directorio de descargas')
 
     def csv_limpiar(self, ruta_csv_inicial='', mantener_respaldo=False):
-        ruta_csv_inicial = ruta_csv_inicial or self._ruta_archivo_csv
-        ruta_csv_salida = ruta_csv_inicial + ".tmp"
-        ruta_csv_respaldo = ruta_csv_inicial + "_bak"
+        """Preparar el CSV para su lectura sin reescribirlo en disco
 
-        _logger.info(f"Limpiando archivo Syscom: {ruta_csv_inicial}")
+        La normalización a UTF-8 ocurre al vuelo en abrir_csv_normalizado, por lo
+        que ya no se generan archivos .tmp ni _bak. Se conserva la firma para los
+        llamadores existentes; el segundo valor devuelto siempre es None.
+        """
+        ruta_csv_inicial = ruta_csv_inicial or self._ruta_archivo_csv
 
-        # Paso 1: Normalizar el archivo CSV utilizando la función normaliza_csv
         try:
-            normaliza_csv(ruta_csv_inicial, ruta_csv_salida)
-            # Paso 2: Swapping de archivos
-            shutil.copy(ruta_csv_inicial, ruta_csv_respaldo)
-            shutil.move(ruta_csv_salida, ruta_csv_inicial)
+            if archivo_limpio(ruta_csv_inicial):
+                _logger.info(f"Archivo Syscom ya validado como UTF-8, se omite la normalización: {ruta_csv_inicial}")
+                return ruta_csv_inicial, None
 
-            # Paso 3: Log en Odoo
+            _logger.info(f"Archivo Syscom se normalizará a UTF-8 durante la lectura: {ruta_csv_inicial}")
             file_size = os.path.getsize(ruta_csv_inicial)
             self.env['syscom.log'].create({
                 'fecha_descarga': fields.Datetime.now(),
                 'tamano_descarga': f'{file_size / (1024 * 1024):.2f} MB',
                 'ruta_archivo': ruta_csv_inicial,
                 'url_origen': ruta_csv_inicial,
-                'tipo_accion': 'Limpieza Exitosa normalizando el archivo a utf8',
+                'tipo_accion': 'Normalización a utf8 en línea durante la lectura',
                 'categorias_importadas': '----',
                 'tasa_cambio': "0.0",
             })
 
-            return ruta_csv_inicial, ruta_csv_respaldo
+            return ruta_csv_inicial, None
 
         except Exception as e:
             raise UserError(f'Error fatal al limpiar CSV, funcion csv_limpiar_pd: {str(e)}')
@@ -408,49 +701,37 @@ class SyscomConfig(models.Model):
         """
         Crea categorías anidadas a partir de un CSV con columnas:
         'Menu Nvl 1', 'Menu Nvl 2', 'Menu Nvl 3'.
+        Usa el mismo motor de resolución por lotes que la importación.
         """
-        import csv
-        categorias_creadas = 0
-        # categorias_map = {}  # {(nvl1, nvl2, nvl3): id}
-        with open(csv_path, 'r', encoding='utf-8-sig') as csvfile:
+        rutas = set()
+        with abrir_csv_normalizado(csv_path) as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
-                nvl1 = row.get('Menu Nvl 1', '').strip()
-                nvl2 = row.get('Menu Nvl 2', '').strip()
-                nvl3 = row.get('Menu Nvl 3', '').strip()
-                parent_id = False
-                # Nivel 1
-                if nvl1:
-                    cat1 = self.env['product.category'].search([
-                        ('name', '=', nvl1), ('parent_id', '=', False)
-                        ], limit=1)
-                    if not cat1:
-                        cat1 = self.env['product.category'].create({'name': nvl1, 'parent_id': False})
-                        categorias_creadas += 1
-                    parent_id = cat1.id
-                # Nivel 2
-                if nvl2:
-                    cat2 = self.env['p_get_or_create_categoryroduct.category'].search([
-                        ('name', '=', nvl2), ('parent_id', '=', parent_id)
-                        ], limit=1)
-                    if not cat2:
-                        cat2 = self.env['product.category'].create({'name': nvl2, 'parent_id': parent_id})
-                        categorias_creadas += 1
-                    parent_id = cat2.id
-                # Nivel 3
-                if nvl3:
-                    cat3 = self.env['product.category'].search([
-                        ('name', '=', nvl3), ('parent_id', '=', parent_id)
-                        ], limit=1)
-                    if not cat3:
-                        cat3 = self.env['product.category'].create({'name': nvl3, 'parent_id': parent_id})
-                        categorias_creadas += 1
-        _logger.info(f"Categorías creadas o existentes: {categorias_creadas}")
+                ruta = self._normalizar_ruta_categoria([
+                    row.get('Menu Nvl 1', ''),
+                    row.get('Menu Nvl 2', ''),
+                    row.get('Menu Nvl 3', ''),
+                ])
+                if ruta:
+                    rutas.add(ruta)
+        total_antes = self.env['product.category'].search_count([])
+        self._resolver_categorias(rutas)
+        categorias_creadas = self.env['product.category'].search_count([]) - total_antes
+        _logger.info(f"Categorías creadas: {categorias_creadas} de {len(rutas)} rutas distintas")
         return categorias_creadas
 
+    def _procesar_csv(self, ruta_archivo, checkpoint=None):
+        """Procesar el archivo CSV e importar productos
+
+        Args:
+            ruta_archivo: Ruta del CSV normalizado
+            checkpoint: Opcional, registro syscom.checkpoint; si trae avance
+                se omiten las filas ya confirmadas y se continúa desde ahí
 
-    def _procesar_csv(self, ruta_archivo):
-        """Procesar el archivo CSV e importar productos"""
+        Returns:
+            Diccionario con los contadores: procesados, creados, actualizados,
+            sin_cambios e info_proveedor
+        """
         self.ensure_one()
         categorias_filtro = []
         if self.categorias_importar:
@@ -475,193 +756,1310 @@ class SyscomConfig(models.Model):
             self.registrar_log(descripcion=f"Proveedor '{_proveedor_nombre}' encontrado con ID {datos_proveedor.id} para importación Syscom.", tipo_operacion='Proveedor Existente')
 
         _logger.info(f'Iniciar procesado de CSV desde archivo: {ruta_archivo}')
+        # Una reanudación no vuelve a ver las filas ya confirmadas, así que no puede generar un snapshot completo
+        reanudando = bool(checkpoint and checkpoint.tiene_avance())
+        snapshot_anterior, snapshot_nuevo, validado = self._preparar_snapshot(generar_nuevo=not reanudando)
+        # Códigos vistos en el feed; al reanudar faltan los de las filas ya confirmadas y no se archiva nada
+        codigos_feed = None if reanudando else set()
+        self = self._con_contexto_importacion().with_context(syscom_snapshot=(snapshot_anterior, snapshot_nuevo), syscom_codigos_feed=codigos_feed)
         try:
-            filas_de_datos, tipo_cambio_csv, codigos_procesar = self._leer_csv(ruta_archivo, categorias_filtro)
-            d_productos_actualizar, l_productos_crear_vals, productos_procesados = self._clasificar_productos(filas_de_datos, codigos_procesar)
-            productos_actualizados = self._procesar_batch_actualizacion(d_productos_actualizar)
-            productos_creados = self._procesar_batch_creacion(l_productos_crear_vals)
-            productos_registrados = self._procesar_info_proveedor(l_productos_crear_vals, d_productos_actualizar, datos_proveedor)
-            self._registrar_log_importacion(ruta_archivo, tipo_cambio_csv, productos_procesados, productos_creados, productos_actualizados)
+            bitacora = BitacoraPrecios(_archivo_bitacora_precios, uuid.uuid4().hex[:12]) if _usar_bitacora_precios else None
+            if self.modo_paralelo and self.hilos_importacion > 1:
+                # Las particiones no avanzan en orden de fila; cada una registra su propio avance en el punto de control
+                totales = dict.fromkeys(('procesados', 'creados', 'actualizados', 'sin_cambios', 'info_proveedor'), 0)
+                tipo_cambio_csv = self._procesar_csv_paralelo(ruta_archivo, categorias_filtro, datos_proveedor, totales, bitacora, checkpoint)
+                if checkpoint:
+                    checkpoint.registrar_avance(checkpoint.fila_offset, totales)
+            else:
+                totales = checkpoint.totales() if checkpoint else dict.fromkeys(('procesados', 'creados', 'actualizados', 'sin_cambios', 'info_proveedor'), 0)
+                tipo_cambio_csv = self._procesar_csv_secuencial(ruta_archivo, categorias_filtro, datos_proveedor, totales, bitacora, checkpoint)
+            self.registrar_log(descripcion=f'Detección de cambios: {totales["actualizados"]} productos con cambios, {totales["sin_cambios"]} sin cambios omitidos.', tipo_operacion='Detección de Cambios')
+            self.registrar_log(descripcion=f'Información de proveedor procesada para {totales["info_proveedor"]} productos.', tipo_operacion='Info Proveedor')
+            if codigos_feed is not None:
+                with self._fase('descontinuados'):
+                    self._procesar_descontinuados(codigos_feed, datos_proveedor, categorias_filtro)
+            self._registrar_log_importacion(ruta_archivo, tipo_cambio_csv, totales['procesados'], totales['creados'], totales['actualizados'])
+            if checkpoint:
+                checkpoint.fase = 'completado'
+            if snapshot_nuevo is not None:
+                snapshot_nuevo.cerrar(validado)
+            return totales
         except Exception as e:
             _logger.error(f'Error procesando CSV: {str(e)}')
             raise UserError(f'Error al procesar el archivo CSV: {str(e)}')
+        finally:
+            if snapshot_anterior is not None:
+                snapshot_anterior.cerrar()
 
-    def _leer_csv(self, ruta_archivo, categorias_filtro):
-        filas_de_datos = []
+    def _generar_vista_previa(self, ruta_archivo):
+        """Calcular, sin escribir productos, lo que haría una importación completa con este feed
+
+        Recorre el feed por lotes igual que _procesar_csv_secuencial, pero no crea
+        marcas, categorías, productos ni tarifas ni confirma nada a mitad de
+        camino: las filas se clasifican y se comparan contra la base de datos
+        (y contra el snapshot vigente, sin reescribirlo). El resultado queda en
+        un registro syscom.vista.previa con el resumen por categoría y el
+        archivo de diferencias.
+
+        Returns:
+            Registro syscom.vista.previa
+        """
+        self.ensure_one()
+        self = self._con_contexto_importacion()
+        categorias_filtro = []
+        if self.categorias_importar:
+            categorias_filtro = [
+                cat.strip().strip('"').strip("'")
+                for cat in self.categorias_importar.split(',')
+            ]
+        proveedor = self.env['res.partner'].search([
+            ('name', 'ilike', _proveedor_nombre),
+            ('supplier_rank', '>', 0)
+        ], limit=1)
+        mapa_categorias = self._resolver_categorias([])
+        mapa_marcas = self._resolver_marcas([])
+        con_marcas = 'product.brand' in self.env.registry
+        snapshot_anterior, _snapshot_nuevo, _validado = self._preparar_snapshot(generar_nuevo=False)
+
+        totales = dict.fromkeys(('crear', 'actualizar', 'sin_cambios'), 0)
+        # {categoría: [crear, actualizar, con cambio de precio, suma delta, suma delta %, con delta %]}
+        por_categoria = {}
+        codigos_feed = set()
+        categorias_nuevas = set()
+        marcas_nuevas = set()
+        salida = io.StringIO()
+        diferencias = csv.writer(salida)
+        diferencias.writerow(_columnas_vista_previa)
+        try:
+            lotes = self._iterar_fase('leer', self.with_context(syscom_codigos_feed=codigos_feed)._leer_csv_por_lotes(
+                ruta_archivo, categorias_filtro, mapa_marcas=mapa_marcas, solo_lectura=True))
+            for filas_de_datos, _tipo_cambio_csv, _codigos_procesar, _fila_offset in lotes:
+                filas_lote = len(filas_de_datos)
+                for fila in filas_de_datos:
+                    ruta = self._normalizar_ruta_categoria(fila.categoria_path)
+                    categorias_nuevas.update(ruta[:nivel] for nivel in range(1, len(ruta) + 1) if ruta[:nivel] not in mapa_categorias)
+                    if con_marcas and fila.marca not in mapa_marcas:
+                        marcas_nuevas.add(fila.marca)
+                if snapshot_anterior is not None:
+                    with self._fase('clasificar'):
+                        filas_de_datos, sin_cambios_snapshot, _hashes = self._filtrar_con_snapshot(filas_de_datos, snapshot_anterior)
+                    totales['sin_cambios'] += sin_cambios_snapshot
+                with self._fase('clasificar', len(filas_de_datos)):
+                    actuales = {}
+                    d_productos_actualizar, l_productos_crear, _procesados = self._clasificar_productos(
+                        filas_de_datos, [fila.default_code for fila in filas_de_datos], mapa_categorias, actuales, solo_lectura=True)
+                with self._fase('actualizar', len(d_productos_actualizar)):
+                    d_productos_con_cambios = self._detectar_cambios(d_productos_actualizar, None, actuales)
+                totales['crear'] += len(l_productos_crear)
+                totales['actualizar'] += len(d_productos_con_cambios)
+                totales['sin_cambios'] += len(d_productos_actualizar) - len(d_productos_con_cambios)
+
+                for fila in l_productos_crear:
+                    categoria = _categoria_separador.join(self._normalizar_ruta_categoria(fila.categoria_path))
+                    por_categoria.setdefault(categoria, [0, 0, 0, 0.0, 0.0, 0])[0] += 1
+                    diferencias.writerow(('crear', fila.default_code, fila.name, categoria, '', '', fila.list_price, ''))
+                for producto_id, cambios in d_productos_con_cambios.items():
+                    fila = d_productos_actualizar[producto_id]
+                    categoria = _categoria_separador.join(self._normalizar_ruta_categoria(fila.categoria_path))
+                    acumulado = por_categoria.setdefault(categoria, [0, 0, 0, 0.0, 0.0, 0])
+                    acumulado[1] += 1
+                    precio_anterior = actuales[producto_id]['list_price']
+                    delta = ''
+                    if 'list_price' in cambios:
+                        delta = round(fila.list_price - precio_anterior, _digitos_redondeo)
+                        acumulado[2] += 1
+                        acumulado[3] += delta
+                        if precio_anterior:
+                            acumulado[4] += delta * 100.0 / precio_anterior
+                            acumulado[5] += 1
+                    diferencias.writerow(('actualizar', fila.default_code, fila.name, categoria, ' '.join(sorted(cambios)),
+                                          precio_anterior, fila.list_price, delta))
+                if self._progreso():
+                    self._progreso().avanzar(filas=filas_lote)
+        finally:
+            if snapshot_anterior is not None:
+                snapshot_anterior.cerrar()
+
+        productos_archivar = 0
+        archivado_cancelado = False
+        if self.accion_descontinuados != 'ninguna':
+            with self._fase('descontinuados'):
+                tarifas_por_producto, total_proveedor = self._buscar_descontinuados(codigos_feed, proveedor, categorias_filtro)
+                productos_archivar = len(tarifas_por_producto)
+                archivado_cancelado = bool(productos_archivar) and productos_archivar * 100.0 / total_proveedor > self.umbral_descontinuados
+                ids = list(tarifas_por_producto)
+                for i in range(0, len(ids), _registros_por_batch):
+                    for producto in self.env['product.template'].browse(ids[i:i + _registros_por_batch]).read(['name', 'categ_id', 'list_price']):
+                        diferencias.writerow((self.accion_descontinuados, tarifas_por_producto[producto['id']][0], producto['name'],
+                                              producto['categ_id'][1] if producto['categ_id'] else '', 'active', producto['list_price'], '', ''))
+
+        resumen = (f'Productos por crear: {totales["crear"]}. Productos por actualizar: {totales["actualizar"]}. '
+                   f'Sin cambios: {totales["sin_cambios"]}. Fuera del feed: {productos_archivar}'
+                   f'{" (se cancelaría por superar el umbral de descontinuados)" if archivado_cancelado else ""}. '
+                   f'Categorías nuevas: {len(categorias_nuevas)}. Marcas nuevas: {len(marcas_nuevas)}.')
+        _logger.info(f'Syscom: Vista previa generada. {resumen}')
+        medidor = self._medidor()
+        return self.env['syscom.vista.previa'].create({
+            'config_id': self.id,
+            'ruta_archivo': ruta_archivo,
+            'ganancia_porcentaje': self.ganancia_porcentaje,
+            'productos_crear': totales['crear'],
+            'productos_actualizar': totales['actualizar'],
+            'productos_sin_cambios': totales['sin_cambios'],
+            'productos_archivar': productos_archivar,
+            'archivado_cancelado': archivado_cancelado,
+            'categorias_nuevas': len(categorias_nuevas),
+            'marcas_nuevas': len(marcas_nuevas),
+            'segundos': medidor.transcurrido() if medidor else 0.0,
+            'resumen': resumen,
+            'archivo_diferencias': base64.b64encode(salida.getvalue().encode('utf-8')),
+            'nombre_archivo': f'syscom_vista_previa_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            'linea_ids': [(0, 0, {
+                'categoria': categoria or 'Sin categoría',
+                'productos_crear': crear,
+                'productos_actualizar': actualizar,
+                'productos_cambio_precio': con_precio,
+                'delta_promedio': round(suma_delta / con_precio, _digitos_redondeo) if con_precio else 0.0,
+                'delta_porcentaje_promedio': round(suma_porcentaje / con_porcentaje, 2) if con_porcentaje else 0.0,
+            }) for categoria, (crear, actualizar, con_precio, suma_delta, suma_porcentaje, con_porcentaje) in sorted(por_categoria.items())],
+        })
+
+    def _procesar_descontinuados(self, codigos_feed, proveedor, categorias_filtro=None):
+        """Archivar (o dejar en cero la tarifa de) los productos del proveedor que ya no están en el feed
+
+        Returns:
+            Cantidad de productos archivados o con tarifa en cero
+        """
+        if self.accion_descontinuados == 'ninguna':
+            return 0
+        tarifas_por_producto, total_productos = self._buscar_descontinuados(codigos_feed, proveedor, categorias_filtro)
+        if not tarifas_por_producto:
+            return 0
+
+        porcentaje = len(tarifas_por_producto) * 100.0 / total_productos
+        if porcentaje > self.umbral_descontinuados:
+            _logger.warning(f'Syscom: {len(tarifas_por_producto)} de {total_productos} productos ({porcentaje:.1f}%) '
+                            f'no están en el feed; supera el umbral de {self.umbral_descontinuados}% y no se archiva nada')
+            self.registrar_log(
+                descripcion=f'Archivado cancelado: {len(tarifas_por_producto)} de {total_productos} productos ({porcentaje:.1f}%) '
+                            f'ausentes del feed superan el umbral de {self.umbral_descontinuados}%. Verifique que la descarga esté completa.',
+                tipo_operacion='Descontinuados Cancelado')
+            return 0
+
+        ids = list(tarifas_por_producto)
+        if self.accion_descontinuados == 'archivar':
+            for i in range(0, len(ids), _registros_por_batch):
+                self.env['product.template'].browse(ids[i:i + _registros_por_batch]).write({'active': False, 'syscom_descontinuado': True})
+        else:
+            self._actualizar_campo_sql('product.supplierinfo', 'price', {
+                info_id: 0.0 for _codigo, info_ids in tarifas_por_producto.values() for info_id in info_ids
+            })
+        accion = 'archivados' if self.accion_descontinuados == 'archivar' else 'con tarifa de proveedor en cero'
+        self.registrar_log(descripcion=f'{len(ids)} productos fuera del feed {accion} ({porcentaje:.1f}% del proveedor).',
+                           tipo_operacion='Productos Descontinuados')
+        return len(ids)
+
+    def _buscar_descontinuados(self, codigos_feed, proveedor, categorias_filtro=None):
+        """Buscar los productos activos con tarifa del proveedor que ya no están en el feed
+
+        Compara por conjuntos los códigos vistos en el feed contra los productos
+        activos con tarifa del proveedor. Con filtro de categorías solo se
+        consideran los productos bajo las categorías raíz importadas.
+
+        Returns:
+            Tupla ({product_tmpl_id: (codigo, [ids de supplierinfo])}, total de productos del proveedor)
+        """
+        if not codigos_feed or not proveedor:
+            return {}, 0
+        condicion_categoria = SQL()
+        if categorias_filtro:
+            raices = self.env['product.category'].search([('name', 'in', categorias_filtro), ('parent_id', '=', False)])
+            categorias = self.env['product.category'].search([('id', 'child_of', raices.ids)]) if raices else raices
+            if not categorias:
+                return {}, 0
+            condicion_categoria = SQL("AND pt.categ_id IN %s", tuple(categorias.ids))
+
+        self.env['product.supplierinfo'].flush_model(['partner_id', 'product_tmpl_id', 'price'])
+        self.env['product.template'].flush_model(['syscom_modelo', 'default_code', 'active', 'categ_id'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT si.id, pt.id, COALESCE(pt.syscom_modelo, pt.default_code)
+              FROM product_supplierinfo si
+              JOIN product_template pt ON pt.id = si.product_tmpl_id
+             WHERE si.partner_id = %s
+               AND pt.active
+               %s
+            """,
+            proveedor.id,
+            condicion_categoria,
+        ))
+        tarifas_por_producto = {}
+        total_productos = set()
+        for info_id, producto_id, codigo in self.env.cr.fetchall():
+            total_productos.add(producto_id)
+            if codigo not in codigos_feed:
+                tarifas_por_producto.setdefault(producto_id, (codigo, []))[1].append(info_id)
+        return tarifas_por_producto, len(total_productos)
+
+    def _ruta_snapshot(self):
+        return f'{_archivo_snapshot_prefijo}{self.id}.snap'
+
+    def _descartar_snapshot(self):
+        """Eliminar el snapshot; la siguiente importación compara todo contra la base de datos"""
+        try:
+            os.remove(self._ruta_snapshot())
+            _logger.info(f'Syscom: Snapshot descartado: {self._ruta_snapshot()}')
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            _logger.warning(f'No se pudo eliminar el snapshot {self._ruta_snapshot()}: {e}')
+
+    def _preparar_snapshot(self, generar_nuevo=True):
+        """Abrir el snapshot de la importación anterior y preparar el de esta
+
+        El snapshot anterior solo se usa si no está vencido según
+        dias_validacion_snapshot y si una muestra de sus productos coincide
+        con la base de datos; si no, esta ejecución compara todo contra la base
+        y el snapshot que genere cuenta como recién validado.
+
+        Args:
+            generar_nuevo: False si la ejecución no puede generar un snapshot
+                completo (reanudación) o no debe escribirlo (vista previa)
+
+        Returns:
+            Tupla (snapshot_anterior o None, EscritorSnapshot o None, fecha ISO de validación o None)
+        """
+        if not self.usar_snapshot:
+            self._descartar_snapshot()
+            return None, None, None
+        ruta = self._ruta_snapshot()
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        anterior = abrir_snapshot(ruta)
+        validado = None
+        if anterior is not None:
+            validado = anterior.metadatos.get('validado')
+            antiguedad = (datetime.now() - datetime.fromisoformat(validado)).days if validado else None
+            if self.dias_validacion_snapshot and (antiguedad is None or antiguedad >= self.dias_validacion_snapshot):
+                _logger.info(f'Syscom: Snapshot validado hace {antiguedad} días; se revalida contra la base de datos')
+                anterior.cerrar()
+                anterior, validado = None, None
+            elif not self._validar_muestra_snapshot(anterior):
+                anterior.cerrar()
+                anterior, validado = None, None
+        nuevo = EscritorSnapshot(ruta) if generar_nuevo else None
+        return anterior, nuevo, validado
+
+    def _validar_muestra_snapshot(self, snapshot):
+        """Comparar los precios de una muestra del snapshot contra la base de datos"""
+        total = len(snapshot)
+        if not total:
+            return False
+        indices = random.sample(range(total), min(_muestra_validacion_snapshot, total))
+        esperados = {snapshot.codigo(i): snapshot.entrada(i) for i in indices}
+        campos = self.env['product.template']._fields
+        encontrados = self._buscar_productos_por_modelo(list(esperados), ['standard_price', 'list_price'])
+        for codigo, (_hash_fila, standard_price, list_price) in esperados.items():
+            producto = encontrados.get(codigo)
+            if (not producto
+                    or not self._valores_iguales(campos['standard_price'], producto['standard_price'], standard_price)
+                    or not self._valores_iguales(campos['list_price'], producto['list_price'], list_price)):
+                _logger.warning(f'Syscom: El snapshot difiere de la base de datos en {codigo}; se compara todo contra la base')
+                return False
+        return True
+
+    def _procesar_csv_secuencial(self, ruta_archivo, categorias_filtro, datos_proveedor, totales, bitacora=None, checkpoint=None):
+        """Procesar el feed lote por lote en el cursor actual, confirmando cada lote
+
+        Args:
+            totales: Diccionario de contadores que se acumula en sitio
+            bitacora: Opcional, BitacoraPrecios de la ejecución
+            checkpoint: Opcional, syscom.checkpoint desde cuyo offset se reanuda
+
+        Returns:
+            Tipo de cambio detectado en el CSV
+        """
+        # Datos de referencia compartidos por todos los lotes
+        mapa_categorias = self._resolver_categorias([])
+        mapa_marcas = self._resolver_marcas([])
+        fila_inicio = checkpoint.fila_offset if checkpoint else 0
         tipo_cambio_csv = None
-        codigos_procesar = []
-        with open(ruta_archivo, 'r', encoding='utf-8-sig') as archivo_csv:
-            lector_csv = csv.DictReader(archivo_csv)
-            for fila_datos_csv in lector_csv:
-                if categorias_filtro:
-                    menu_nvl1 = fila_datos_csv.get('Menu Nvl 1', '').strip()
-                    if menu_nvl1 not in categorias_filtro:
+        lotes = self._iterar_fase('leer', self._leer_csv_por_lotes(ruta_archivo, categorias_filtro, mapa_marcas=mapa_marcas, fila_inicio=fila_inicio))
+        for numero_lote, (filas_de_datos, tipo_cambio_csv, codigos_procesar, fila_offset) in enumerate(lotes, 1):
+            if bitacora:
+                bitacora.tipo_cambio = tipo_cambio_csv
+            resultado_lote = self._procesar_lote(filas_de_datos, codigos_procesar, datos_proveedor, mapa_categorias, bitacora)
+            for clave, valor in resultado_lote.items():
+                totales[clave] += valor
+            if checkpoint:
+                checkpoint.registrar_avance(fila_offset, totales)
+            # Confirmar cada lote por separado para mantener cortos los bloqueos y liberar la caché del ORM
+            self._confirmar_lote()
+            # La bitácora solo recibe lo que ya quedó confirmado
+            if bitacora:
+                bitacora.escribir()
+            _logger.info(f'Syscom: Lote {numero_lote} confirmado, {totales["procesados"]} productos procesados hasta ahora')
+        return tipo_cambio_csv
+
+    def _medidor(self):
+        """MedidorFases de la ejecución actual, si se pasó en el contexto ('syscom_medidor')"""
+        return self.env.context.get('syscom_medidor')
+
+    def _progreso(self):
+        """ProgresoImportacion de la ejecución en segundo plano, si la hay ('syscom_progreso')"""
+        return self.env.context.get('syscom_progreso')
+
+    def _fase(self, nombre, filas=0):
+        """Context manager que mide una fase del importador si hay un medidor activo"""
+        progreso = self._progreso()
+        if progreso:
+            progreso.avanzar(fase=nombre)
+        medidor = self._medidor()
+        if not medidor:
+            return nullcontext()
+        return medidor.medir(nombre, self.env.cr, filas)
+
+    def _iterar_fase(self, nombre, lotes):
+        """Recorrer los lotes del lector cargando su tiempo a la fase indicada"""
+        medidor = self._medidor()
+        if not medidor:
+            return lotes
+        return medidor.iterar(nombre, lotes, self.env.cr, filas=lambda lote: len(lote[0]))
+
+    def _con_contexto_importacion(self):
+        """Registro con el contexto del modo masivo, si está activo en la configuración"""
+        return self.with_context(**_contexto_importacion_masiva) if self.modo_masivo else self
+
+    def _confirmar_lote(self):
+        """Recalcular lo pendiente del lote, confirmar la transacción y liberar la caché del ORM
+
+        Las escrituras del lote solo marcan los campos dependientes; el recálculo
+        ocurre una sola vez aquí, en el flush previo al commit.
+        """
+        self.env.flush_all()
+        self.env.cr.commit()
+        self.env.invalidate_all()
+
+    def _impuesto_venta(self):
+        """IVA 16% de ventas; en la importación en paralelo llega resuelto en el contexto"""
+        impuesto_id = self.env.context.get('syscom_impuesto_id')
+        if impuesto_id:
+            return self.env['account.tax'].browse(impuesto_id)
+        return self.env['account.tax'].search([('amount', '=', 16), ('type_tax_use', '=', 'sale')], limit=1)
+
+    def _procesar_csv_paralelo(self, ruta_archivo, categorias_filtro, datos_proveedor, totales, bitacora=None, checkpoint=None):
+        """Procesar el feed en particiones por hash de 'Modelo', cada una en su propio cursor
+
+        El feed se lee y parsea una sola vez: en esa pasada se juntan categorías,
+        marcas y códigos del feed y cada fila se reparte a su partición, de modo
+        que cada hilo solo recibe sus propias filas. Categorías, marcas,
+        proveedor e impuesto se resuelven y confirman una sola vez antes de
+        repartir el trabajo, para que las particiones no compitan creando los
+        mismos registros.
+
+        Con checkpoint cada partición guarda su último lote confirmado en su
+        propio registro syscom.checkpoint.particion y, al reanudar, omite las
+        filas que ya confirmó; los totales devueltos por partición incluyen los
+        de las ejecuciones anteriores.
+
+        Returns:
+            Tipo de cambio detectado en el CSV
+        """
+        total_particiones = self.hilos_importacion
+        rutas = set()
+        marcas = set()
+        tipo_cambio_csv = None
+        particiones = [[] for _indice in range(total_particiones)]
+        codigos_feed = self.env.context.get('syscom_codigos_feed')
+        for fila_offset, registro in self._iterar_registros_feed(ruta_archivo, categorias_filtro):
+            if registro['tipo_cambio'] is not None and not tipo_cambio_csv:
+                tipo_cambio_csv = round(registro['tipo_cambio'], _digitos_redondeo)
+            if not registro['modelo']:
+                continue
+            if codigos_feed is not None:
+                codigos_feed.add(registro['modelo'])
+            if not registro['titulo']:
+                continue
+            rutas.add(self._normalizar_ruta_categoria([registro['nvl1'], registro['nvl2'], registro['nvl3']]))
+            marcas.add(registro['marca'] or _sin_marca_nombre)
+            particiones[indice_particion(registro['modelo'], total_particiones)].append((fila_offset, registro))
+        mapa_categorias = self._resolver_categorias(rutas)
+        mapa_marcas = self._resolver_marcas(marcas)
+        impuesto = self._impuesto_venta()
+        avances = checkpoint.particiones(total_particiones).ids if checkpoint else [None] * total_particiones
+        self._confirmar_lote()
+
+        _logger.info(f'Syscom: Importación en paralelo con {total_particiones} particiones')
+        with ThreadPoolExecutor(max_workers=total_particiones) as ejecutor:
+            futuros = [
+                ejecutor.submit(
+                    self._procesar_particion, ruta_archivo, (indice, total_particiones), registros, tipo_cambio_csv,
+                    datos_proveedor.id, dict(mapa_categorias), dict(mapa_marcas), impuesto.id, bitacora, avances[indice],
+                )
+                for indice, registros in enumerate(particiones)
+            ]
+            errores = []
+            for futuro in futuros:
+                try:
+                    for clave, valor in futuro.result().items():
+                        totales[clave] += valor
+                except Exception as e:
+                    errores.append(str(e))
+        if errores:
+            raise UserError(f'Fallaron {len(errores)} particiones de la importación en paralelo: {"; ".join(errores)}')
+        return tipo_cambio_csv
+
+    def _procesar_particion(self, ruta_archivo, particion, registros, tipo_cambio_csv, proveedor_id, mapa_categorias, mapa_marcas, impuesto_id,
+                            bitacora=None, avance_id=None):
+        """Procesar las filas de una partición del feed en un cursor propio, confirmando cada lote
+
+        Args:
+            particion: Tupla (indice, total), solo para el registro en el log
+            registros: Lista de (fila_offset, registro) de la partición, ya parseados
+            tipo_cambio_csv: Tipo de cambio detectado en el feed
+            avance_id: Opcional, id del syscom.checkpoint.particion de esta partición
+        """
+        id_ejecucion = bitacora.id_ejecucion if bitacora else None
+        with self.env.registry.cursor() as cr:
+            # Los códigos del feed ya se registraron en la lectura inicial
+            env = api.Environment(cr, self.env.uid, dict(self.env.context, syscom_impuesto_id=impuesto_id, syscom_codigos_feed=None))
+            config = self.with_env(env)
+            proveedor = env['res.partner'].browse(proveedor_id)
+            avance = env['syscom.checkpoint.particion'].browse(avance_id)
+            totales = avance.totales() if avance else dict.fromkeys(('procesados', 'creados', 'actualizados', 'sin_cambios', 'info_proveedor'), 0)
+            # Cada partición escribe su propia bitácora para registrar solo lo que confirmó
+            bitacora_particion = BitacoraPrecios(_archivo_bitacora_precios, id_ejecucion) if bitacora else None
+            lotes = config._iterar_fase('leer', config._leer_csv_por_lotes(
+                ruta_archivo, None, mapa_marcas=mapa_marcas, fila_inicio=avance.fila_offset if avance else 0,
+                registros=registros, tipo_cambio_csv=tipo_cambio_csv))
+            for filas_de_datos, tipo_cambio_csv, codigos_procesar, fila_offset in lotes:
+                if bitacora_particion:
+                    bitacora_particion.tipo_cambio = tipo_cambio_csv
+                resultado_lote = config._procesar_lote(filas_de_datos, codigos_procesar, proveedor, mapa_categorias, bitacora_particion)
+                for clave, valor in resultado_lote.items():
+                    totales[clave] += valor
+                if avance:
+                    avance.registrar_avance(fila_offset, totales)
+                config._confirmar_lote()
+                if bitacora_particion:
+                    bitacora_particion.escribir()
+            _logger.info(f'Syscom: Partición {particion[0] + 1}/{particion[1]} terminada, {totales["procesados"]} productos')
+        return totales
+
+    def _actualizar_solo_precios(self, ruta_archivo):
+        """Refrescar solo precios de productos existentes, sin crear productos ni categorías
+
+        Lee únicamente 'Modelo', 'Su Precio' y 'Tipo de Cambio', resuelve los
+        productos con un índice en memoria {Modelo: producto} cargado una sola
+        vez y actualiza por lotes standard_price, list_price y el precio de la
+        tarifa del proveedor solo donde cambiaron.
+
+        Returns:
+            Diccionario con los contadores: procesados, actualizados, sin_cambios,
+            no_encontrados e info_proveedor
+        """
+        self.ensure_one()
+        self = self._con_contexto_importacion()
+        categorias_filtro = []
+        if self.categorias_importar:
+            categorias_filtro = [
+                cat.strip().strip('"').strip("'")
+                for cat in self.categorias_importar.split(',')
+            ]
+        proveedor = self.env['res.partner'].search([
+            ('name', 'ilike', _proveedor_nombre),
+            ('supplier_rank', '>', 0)
+        ], limit=1)
+
+        with self._fase('clasificar'):
+            indice = {}
+            for producto in self.env['product.template'].with_context(active_test=False).search_read(
+                    ['|', ('syscom_modelo', '!=', False), ('default_code', '!=', False)],
+                    ['syscom_modelo', 'default_code', 'standard_price', 'list_price'], order='id'):
+                if producto['syscom_modelo']:
+                    indice[producto['syscom_modelo']] = producto
+                else:
+                    indice.setdefault(producto['default_code'], producto)
+        _logger.info(f'Syscom: Índice de {len(indice)} productos cargado para actualización de precios')
+
+        totales = dict.fromkeys(('procesados', 'actualizados', 'sin_cambios', 'no_encontrados', 'info_proveedor'), 0)
+        bitacora = BitacoraPrecios(_archivo_bitacora_precios, uuid.uuid4().hex[:12]) if _usar_bitacora_precios else None
+        parametros_precio = self._parametros_precio()
+        campos = self.env['product.template']._fields
+        tipo_cambio_csv = None
+        precios_invalidos = []
+        tabla_reglas = parametros_precio['reglas']
+        lotes = self._iterar_fase('leer', self._leer_precios_por_lotes(
+            ruta_archivo, categorias_filtro, con_claves=bool(tabla_reglas and tabla_reglas.requiere_claves)))
+        for modelos, precios, tipo_cambio_csv, rutas_marcas in lotes:
+            tasas = [tipo_cambio_csv or parametros_precio['tasa_respaldo']] * len(precios)
+            standard_prices, list_prices, invalidos = calcular_precios_lote(
+                precios, tasas, parametros_precio['usd_a_mxn'], parametros_precio['ganancia_porcentaje'], _digitos_redondeo)
+            if tabla_reglas:
+                list_prices = self._precios_venta_con_reglas(tabla_reglas, standard_prices, lambda: rutas_marcas)
+            precios_invalidos.extend(modelos[i] for i in invalidos)
+
+            cambios = {}
+            valores_anteriores = {}
+            with self._fase('clasificar', len(modelos)):
+                for modelo, standard_price, list_price in zip(modelos, standard_prices, list_prices):
+                    if standard_price is None:
                         continue
-                default_code = fila_datos_csv.get('Modelo', '').strip()
-                name = fila_datos_csv.get('Título', '').strip()
-                su_precio = fila_datos_csv.get('Su Precio', '0').strip()
-                tipo_cambio_str = fila_datos_csv.get('Tipo de Cambio', '').strip()
-                marca_cache = {}  # Cache para marcas ya procesadas en este ciclo
-                marca = fila_datos_csv.get('Marca', _sin_marca_nombre).strip()
-                marca_id = self._set_or_create_brand(marca, marca_cache)
-                marca_id = marca_id.id if marca_id else False
-                if tipo_cambio_str and not tipo_cambio_csv:
-                    try:
-                        tipo_cambio_csv = round(float(tipo_cambio_str.replace(',', '')), 2)
-                        _logger.info(f"Tipo de Cambio detectado en CSV: {tipo_cambio_csv}")
-                    except Exception:
-                        _logger.warning(f"No se pudo parsear 'Tipo de Cambio' desde el CSV: {tipo_cambio_str}")
-                menu_nvl1 = fila_datos_csv.get('Menu Nvl 1', '').strip()
-                menu_nvl2 = fila_datos_csv.get('Menu Nvl 2', '').strip()
-                menu_nvl3 = fila_datos_csv.get('Menu Nvl 3', '').strip()
-                clave_producto = fila_datos_csv.get('Código Fiscal', '').strip()
-                link_syscom = fila_datos_csv.get('Link SYSCOM', '').strip()
-                if not default_code or not name:
+                    producto = indice.get(modelo)
+                    if not producto:
+                        totales['no_encontrados'] += 1
+                        continue
+                    totales['procesados'] += 1
+                    valores = {}
+                    if not self._valores_iguales(campos['standard_price'], producto['standard_price'], standard_price):
+                        valores['standard_price'] = standard_price
+                    if not self._valores_iguales(campos['list_price'], producto['list_price'], list_price):
+                        valores['list_price'] = list_price
+                    if not valores:
+                        totales['sin_cambios'] += 1
+                        continue
+                    cambios[producto['id']] = valores
+                    valores_anteriores[producto['id']] = dict(producto)
+                    producto.update(valores)
+
+            if bitacora:
+                bitacora.tipo_cambio = tipo_cambio_csv
+            with self._fase('actualizar', len(cambios)):
+                totales['actualizados'] += self._procesar_batch_actualizacion(cambios, bitacora, valores_anteriores)
+            if proveedor:
+                costos = {producto_id: valores['standard_price'] for producto_id, valores in cambios.items() if 'standard_price' in valores}
+                with self._fase('info_proveedor', len(costos)):
+                    totales['info_proveedor'] += self._actualizar_precio_proveedor(costos, proveedor)
+            self._confirmar_lote()
+            if bitacora:
+                bitacora.escribir()
+            if self._progreso():
+                self._progreso().avanzar(filas=len(modelos))
+
+        if precios_invalidos:
+            self.registrar_log(descripcion=f'{len(precios_invalidos)} productos omitidos por precio inválido: {", ".join(precios_invalidos[:100])}', tipo_operacion='Precios Inválidos')
+        self.registrar_log(
+            descripcion=f'Solo precios: {totales["actualizados"]} productos actualizados, {totales["sin_cambios"]} sin cambios, '
+                        f'{totales["no_encontrados"]} códigos del feed sin producto, {totales["info_proveedor"]} tarifas de proveedor actualizadas.',
+            tipo_operacion='Actualización de Precios')
+        self._registrar_log_importacion(ruta_archivo, tipo_cambio_csv, totales['procesados'], 0, totales['actualizados'])
+        # Los precios escritos aquí ya no coinciden con el snapshot de la última importación completa
+        self._descartar_snapshot()
+        return totales
+
+    def _leer_precios_por_lotes(self, ruta_archivo, categorias_filtro, tamano_lote=_registros_por_batch, con_claves=False):
+        """Leer solo 'Modelo', 'Su Precio' y 'Tipo de Cambio' del CSV en lotes
+
+        'Menu Nvl 1' solo se consulta si hay filtro de categorías. Con
+        con_claves también se leen los tres niveles de menú y 'Marca', que
+        necesitan las reglas de precio por categoría o marca.
+
+        Yields:
+            Tupla (modelos, precios, tipo_cambio_csv, rutas_marcas) por lote, donde
+            rutas_marcas es la lista de (ruta normalizada, marca) o None sin con_claves
+        """
+        filtro = set(categorias_filtro or [])
+        tipo_cambio_csv = None
+        modelos = []
+        precios = []
+        rutas_marcas = [] if con_claves else None
+        with abrir_csv_normalizado(ruta_archivo) as archivo_csv:
+            lector_csv = csv.reader(archivo_csv)
+            encabezado = next(lector_csv, None)
+            if not encabezado:
+                return
+            indices = {nombre: i for i, nombre in enumerate(encabezado)}
+            if 'Modelo' not in indices or 'Su Precio' not in indices:
+                raise UserError("El CSV no contiene las columnas 'Modelo' y 'Su Precio'")
+            i_modelo, i_precio = indices['Modelo'], indices['Su Precio']
+            i_tipo_cambio = indices.get('Tipo de Cambio')
+            i_nvl1 = indices.get('Menu Nvl 1') if filtro else None
+            if con_claves:
+                # Una columna ausente apunta más allá del encabezado y se lee como vacía
+                i_claves = [indices.get(columna, len(encabezado)) for columna in ('Menu Nvl 1', 'Menu Nvl 2', 'Menu Nvl 3', 'Marca')]
+            for fila in lector_csv:
+                if len(fila) <= max(i_modelo, i_precio):
                     continue
-                precios = self._calcular_precios(su_precio, tipo_cambio_csv)
-                if not precios:
-                    _logger.warning(f'Precio inválido para producto {default_code}')
+                if i_nvl1 is not None and (len(fila) <= i_nvl1 or fila[i_nvl1].strip() not in filtro):
                     continue
-                standard_price, list_price = precios
-                list_categoria_path = [menu_nvl1, menu_nvl2, menu_nvl3]
-                filas_de_datos.append({
-                    'default_code': default_code,
-                    'name': name,
-                    'standard_price': standard_price,
-                    'list_price': list_price,
-                    'categoria_path': list_categoria_path,
-                    'objetoimp': _id_objetoimp,
-                    'cat_unidad_medida': _id_cat_unidad_medida,
-                    'clave_producto': clave_producto,
-                    'syscom_url': link_syscom,
-                    'product_brand_id': marca_id,
-                })
-                codigos_procesar.append(default_code)
-        _logger.info(f'CSV parsing completed. Total rows collected for processing: {len(filas_de_datos)}')
+                if tipo_cambio_csv is None and i_tipo_cambio is not None and len(fila) > i_tipo_cambio:
+                    tipo_cambio = parsear_numero(fila[i_tipo_cambio].strip())
+                    if tipo_cambio:
+                        tipo_cambio_csv = round(tipo_cambio, _digitos_redondeo)
+                modelo = fila[i_modelo].strip()
+                if not modelo:
+                    continue
+                modelos.append(modelo)
+                precios.append(parsear_numero(fila[i_precio].strip()))
+                if con_claves:
+                    nvl1, nvl2, nvl3, marca = (fila[i].strip() if i < len(fila) else '' for i in i_claves)
+                    rutas_marcas.append((self._normalizar_ruta_categoria((nvl1, nvl2, nvl3)), marca or _sin_marca_nombre))
+                if len(modelos) >= tamano_lote:
+                    yield modelos, precios, tipo_cambio_csv, rutas_marcas
+                    modelos = []
+                    precios = []
+                    rutas_marcas = [] if con_claves else None
+        if modelos:
+            yield modelos, precios, tipo_cambio_csv, rutas_marcas
+
+    def _actualizar_precio_proveedor(self, costos_por_producto, proveedor):
+        """Actualizar el precio de las tarifas existentes del proveedor, sin crear nuevas
+
+        Args:
+            costos_por_producto: Diccionario {product_tmpl_id: standard_price}
+            proveedor: Registro res.partner del proveedor
+
+        Returns:
+            Cantidad de tarifas actualizadas
+        """
+        if not costos_por_producto:
+            return 0
+        precios_actualizar = {}
+        for info in self.env['product.supplierinfo'].search_read([
+            ('product_tmpl_id', 'in', list(costos_por_producto)),
+            ('partner_id', '=', proveedor.id)
+        ], ['product_tmpl_id', 'price']):
+            precio = round(float(costos_por_producto[info['product_tmpl_id'][0]]), 2)
+            if round(info['price'], 2) != precio:
+                precios_actualizar[info['id']] = precio
+        self._actualizar_campo_sql('product.supplierinfo', 'price', precios_actualizar)
+        return len(precios_actualizar)
+
+    def _procesar_lote(self, filas_de_datos, codigos_procesar, datos_proveedor, mapa_categorias=None, bitacora=None):
+        """Clasificar, escribir y registrar info de proveedor para un lote de filas
+
+        Si se indica una BitacoraPrecios, se le agregan los cambios de precio
+        del lote; escribirla al archivo queda a cargo de quien confirma el lote.
+
+        Returns:
+            Diccionario con los contadores del lote: procesados, creados,
+            actualizados, sin_cambios e info_proveedor
+        """
+        filas_lote = len(filas_de_datos)
+        snapshot_anterior, snapshot_nuevo = self.env.context.get('syscom_snapshot') or (None, None)
+        sin_cambios_snapshot = 0
+        if snapshot_anterior is not None or snapshot_nuevo is not None:
+            with self._fase('clasificar'):
+                filas_de_datos, sin_cambios_snapshot, hashes = self._filtrar_con_snapshot(filas_de_datos, snapshot_anterior, snapshot_nuevo)
+                codigos_procesar = [fila.default_code for fila in filas_de_datos]
+        with self._fase('clasificar', len(filas_de_datos)):
+            actuales = {}
+            d_productos_actualizar, l_productos_crear, productos_procesados = self._clasificar_productos(filas_de_datos, codigos_procesar, mapa_categorias, actuales)
+        with self._fase('actualizar', len(d_productos_actualizar)):
+            valores_anteriores = {}
+            d_productos_con_cambios = self._detectar_cambios(d_productos_actualizar, valores_anteriores, actuales)
+            productos_actualizados = self._procesar_batch_actualizacion(d_productos_con_cambios, bitacora, valores_anteriores)
+        with self._fase('crear', len(l_productos_crear)):
+            ids_creados = {}
+            productos_creados = self._procesar_batch_creacion(l_productos_crear, ids_creados, bitacora)
+        with self._fase('info_proveedor', len(l_productos_crear) + len(d_productos_actualizar)):
+            productos_registrados = self._procesar_info_proveedor(l_productos_crear, d_productos_actualizar, datos_proveedor, ids_creados)
+        if snapshot_nuevo is not None:
+            # Solo entran al snapshot los productos que quedaron escritos; los que fallaron se reintentan
+            escritos = set(ids_creados).union(fila.default_code for fila in d_productos_actualizar.values())
+            for fila in filas_de_datos:
+                if fila.default_code in escritos:
+                    snapshot_nuevo.agregar(fila.default_code, hashes[fila.default_code], fila.standard_price, fila.list_price)
+        if self._progreso():
+            self._progreso().avanzar(filas=filas_lote)
+        return {
+            'procesados': productos_procesados + sin_cambios_snapshot,
+            'creados': productos_creados,
+            'actualizados': productos_actualizados,
+            'sin_cambios': len(d_productos_actualizar) - len(d_productos_con_cambios) + sin_cambios_snapshot,
+            'info_proveedor': productos_registrados,
+        }
+
+    def _hash_fila(self, fila):
+        """Hash del contenido de una fila del feed con los valores que se escriben en el producto"""
+        return hash_contenido((
+            fila.name,
+            fila.standard_price,
+            fila.list_price,
+            fila.syscom_url,
+            fila.product_brand_id,
+            _categoria_separador.join(self._normalizar_ruta_categoria(fila.categoria_path)),
+            fila.clave_producto,
+        ))
+
+    def _filtrar_con_snapshot(self, filas_de_datos, snapshot_anterior=None, snapshot_nuevo=None):
+        """Separar las filas cuyo contenido es idéntico al del snapshot anterior
+
+        Las filas sin cambios no se consultan ni escriben en la base de datos y
+        pasan directo al snapshot nuevo.
+
+        Returns:
+            Tupla (filas con cambios o nuevas, cantidad sin cambios, {default_code: hash})
+        """
+        hashes = {fila.default_code: self._hash_fila(fila) for fila in filas_de_datos}
+        anteriores = snapshot_anterior.buscar_lote(hashes) if snapshot_anterior is not None else {}
+        filas_con_cambios = []
+        sin_cambios = 0
+        for fila in filas_de_datos:
+            codigo = fila.default_code
+            anterior = anteriores.get(codigo)
+            if anterior and anterior[0] == hashes[codigo]:
+                sin_cambios += 1
+                if snapshot_nuevo is not None:
+                    snapshot_nuevo.agregar(codigo, hashes[codigo], fila.standard_price, fila.list_price)
+            else:
+                filas_con_cambios.append(fila)
+        return filas_con_cambios, sin_cambios, hashes
+
+    def _leer_csv(self, ruta_archivo, categorias_filtro):
+        """Leer el CSV completo en memoria; para archivos grandes usar _leer_csv_por_lotes"""
+        filas_de_datos = []
+        tipo_cambio_csv = None
+        codigos_procesar = []
+        for filas_lote, tipo_cambio_csv, codigos_lote, _fila_offset in self._leer_csv_por_lotes(ruta_archivo, categorias_filtro):
+            filas_de_datos.extend(filas_lote)
+            codigos_procesar.extend(codigos_lote)
         return filas_de_datos, tipo_cambio_csv, codigos_procesar
 
-    def _calcular_precios(self, su_precio, tipo_cambio_csv):
+    def _leer_csv_por_lotes(self, ruta_archivo, categorias_filtro, tamano_lote=_registros_por_batch, mapa_marcas=None, fila_inicio=0,
+                            registros=None, tipo_cambio_csv=None, solo_lectura=False):
+        """Leer el CSV como generador de lotes de tamaño fijo
+
+        Args:
+            ruta_archivo: Ruta del CSV normalizado
+            categorias_filtro: Lista de 'Menu Nvl 1' a importar; vacía para todo
+            tamano_lote: Cantidad de filas válidas por lote
+            mapa_marcas: Opcional, mapa {nombre: id} compartido entre lotes
+            fila_inicio: Cantidad de filas de datos a omitir (reanudación desde un punto de control)
+            registros: Opcional, lista de (fila_offset, registro) ya parseados (partición de la
+                importación en paralelo); si se indica no se lee ruta_archivo
+            tipo_cambio_csv: Opcional, tipo de cambio ya detectado en el feed
+            solo_lectura: No crear marcas ni registrar en la bitácora (vista previa)
+
+        Todo 'Modelo' no vacío se agrega al conjunto 'syscom_codigos_feed' del
+        contexto, si lo hay, antes de descartar filas sin título o con precio
+        inválido: siguen en el feed y no deben archivarse como descontinuados.
+
+        Yields:
+            Tupla (filas_de_datos, tipo_cambio_csv, codigos_procesar, fila_offset) por lote,
+            donde fila_offset es la cantidad de filas de datos del CSV consumidas hasta ese lote
+        """
+        if mapa_marcas is None:
+            mapa_marcas = self._resolver_marcas([])
+        parametros_precio = self._parametros_precio()
+        pendientes = []
+        tasas = []
+        total_filas = 0
+        fila_offset = 0
+        precios_invalidos = []
+        codigos_feed = self.env.context.get('syscom_codigos_feed')
+        if registros is None:
+            registros = self._iterar_registros_feed(ruta_archivo, categorias_filtro)
+        for fila_offset, registro in registros:
+            if registro['tipo_cambio'] is not None and not tipo_cambio_csv:
+                tipo_cambio_csv = round(registro['tipo_cambio'], _digitos_redondeo)
+                _logger.info(f"Tipo de Cambio detectado en CSV: {tipo_cambio_csv}")
+            # Las filas ya confirmadas solo sirven para detectar el tipo de cambio
+            if fila_offset <= fila_inicio:
+                continue
+            if not registro['modelo']:
+                continue
+            if codigos_feed is not None:
+                codigos_feed.add(registro['modelo'])
+            if not registro['titulo']:
+                continue
+            pendientes.append(registro)
+            tasas.append(tipo_cambio_csv or parametros_precio['tasa_respaldo'])
+            if len(pendientes) >= tamano_lote:
+                filas_de_datos = self._construir_filas_lote(pendientes, tasas, parametros_precio, precios_invalidos)
+                total_filas += len(filas_de_datos)
+                yield self._asignar_marcas(filas_de_datos, mapa_marcas, not solo_lectura), tipo_cambio_csv, [f.default_code for f in filas_de_datos], fila_offset
+                pendientes = []
+                tasas = []
+        if pendientes or fila_offset > fila_inicio:
+            filas_de_datos = self._construir_filas_lote(pendientes, tasas, parametros_precio, precios_invalidos)
+            total_filas += len(filas_de_datos)
+            yield self._asignar_marcas(filas_de_datos, mapa_marcas, not solo_lectura), tipo_cambio_csv, [f.default_code for f in filas_de_datos], fila_offset
+        if precios_invalidos:
+            _logger.warning(f'Precio inválido en {len(precios_invalidos)} productos; primeros: {", ".join(precios_invalidos[:20])}')
+            if not solo_lectura:
+                self.registrar_log(descripcion=f'{len(precios_invalidos)} productos omitidos por precio inválido: {", ".join(precios_invalidos[:100])}', tipo_operacion='Precios Inválidos')
+        _logger.info(f'CSV parsing completed. Total rows collected for processing: {total_filas}')
+
+    def _parametros_precio(self):
+        """Tomar una sola vez por ejecución los valores de configuración usados al calcular precios
+
+        Las reglas de precio activas se compilan aquí en una TablaReglasPrecio
+        ('reglas', None si no hay) que se reutiliza en todos los lotes.
+        """
+        return {
+            'usd_a_mxn': self.usd_a_mxn,
+            'ganancia_porcentaje': self.ganancia_porcentaje,
+            'tasa_respaldo': getattr(self, 'tasa_cambio', 1.0) or 1.0,
+            'reglas': self.regla_precio_ids.filtered('active')._compilar(self.ganancia_porcentaje),
+        }
+
+    def _precios_venta_con_reglas(self, tabla, standard_prices, rutas_marcas):
+        """Recalcular list_price de un lote con la tabla de reglas compilada
+
+        Args:
+            tabla: TablaReglasPrecio de _parametros_precio
+            standard_prices: Costos del lote (None en las filas inválidas)
+            rutas_marcas: Función que devuelve la lista de (ruta normalizada, marca)
+                del lote; solo se llama si alguna regla filtra por categoría o marca
+        """
+        claves = [tabla.clave(ruta, marca) for ruta, marca in rutas_marcas()] if tabla.requiere_claves else None
+        return tabla.precios_venta(standard_prices, claves, _digitos_redondeo)
+
+    def _construir_filas_lote(self, registros, tasas, parametros_precio, precios_invalidos):
+        """Calcular los precios del lote en un solo paso y armar las filas para clasificar
+
+        Args:
+            registros: Registros del feed (claves de artefacto_feed.COLUMNAS)
+            tasas: Tasa de cambio aplicable a cada registro
+            parametros_precio: Valores de _parametros_precio
+            precios_invalidos: Lista donde se acumulan los códigos con precio inválido
+
+        Returns:
+            Lista de FilaFeed con precios calculados, sin las de precio inválido
+        """
+        standard_prices, list_prices, invalidos = calcular_precios_lote(
+            [r['su_precio'] for r in registros],
+            tasas,
+            parametros_precio['usd_a_mxn'],
+            parametros_precio['ganancia_porcentaje'],
+            _digitos_redondeo,
+        )
+        precios_invalidos.extend(registros[i]['modelo'] for i in invalidos)
+        if parametros_precio.get('reglas'):
+            list_prices = self._precios_venta_con_reglas(parametros_precio['reglas'], standard_prices, lambda: [
+                (self._normalizar_ruta_categoria((r['nvl1'], r['nvl2'], r['nvl3'])), r['marca'] or _sin_marca_nombre)
+                for r in registros
+            ])
+        filas_de_datos = []
+        for registro, standard_price, list_price in zip(registros, standard_prices, list_prices):
+            if standard_price is None:
+                continue
+            filas_de_datos.append(FilaFeed(
+                registro['modelo'],
+                registro['titulo'],
+                standard_price,
+                list_price,
+                (registro['nvl1'], registro['nvl2'], registro['nvl3']),
+                registro['codigo_fiscal'],
+                registro['link'],
+                registro['marca'] or _sin_marca_nombre,
+            ))
+        return filas_de_datos
+
+    def _iterar_registros_feed(self, ruta_archivo, categorias_filtro):
+        """Recorrer las filas del feed que pasan el filtro de categorías
+
+        Si existe el artefacto parseado para este archivo y filtro se lee mapeado
+        en memoria; si no, se parsea el CSV y el artefacto se genera durante
+        esa misma lectura.
+
+        Yields:
+            Tupla (fila_offset, registro) con las claves de artefacto_feed.COLUMNAS
+        """
+        ruta_cache = ruta_artefacto(ruta_archivo, clave_artefacto(hash_archivo(ruta_archivo), categorias_filtro))
+        if os.path.exists(ruta_cache):
+            _logger.info(f'Syscom: Reutilizando artefacto parseado {ruta_cache}')
+            yield from leer_artefacto(ruta_cache)
+            return
+
+        escritor = EscritorArtefacto(ruta_cache)
+        completo = False
         try:
-            price_raw = float(su_precio.replace(',', ''))
-            if self.usd_a_mxn:
-                tasa = tipo_cambio_csv if tipo_cambio_csv else (getattr(self, 'tasa_cambio', 1.0) or 1.0)
-                standard_price = round(price_raw * tasa, 2)
+            for fila_offset, registro in self._registros_desde_csv(ruta_archivo, categorias_filtro):
+                escritor.agregar(fila_offset, registro)
+                yield fila_offset, registro
+            completo = True
+        finally:
+            if completo:
+                escritor.cerrar()
             else:
-                standard_price = round(price_raw, 2)
-            list_price = round(standard_price * (1 + (self.ganancia_porcentaje / 100)), 2)
-            return standard_price, list_price
-        except Exception:
-            return None
+                escritor.descartar()
+
+    def _registros_desde_csv(self, ruta_archivo, categorias_filtro):
+        """Parsear el CSV y producir (fila_offset, registro) para las filas filtradas
+
+        El encabezado se resuelve a índices de columna una sola vez y las filas
+        se leen con csv.reader, sin construir un diccionario por fila.
+        """
+        advertencia_tipo_cambio = False
+        filtro = set(categorias_filtro or [])
+        with abrir_csv_normalizado(ruta_archivo) as archivo_csv:
+            lector_csv = csv.reader(archivo_csv)
+            encabezado = next(lector_csv, None)
+            if not encabezado:
+                return
+            # Igual que csv.DictReader, si un encabezado se repite gana la última columna
+            indices = {nombre: i for i, nombre in enumerate(encabezado)}
+            ancho = len(encabezado)
+
+            def indice(columna):
+                # Columnas ausentes apuntan a una celda vacía agregada al final de cada fila
+                return indices.get(columna, ancho)
+
+            i_modelo, i_titulo, i_precio, i_tipo_cambio = indice('Modelo'), indice('Título'), indice('Su Precio'), indice('Tipo de Cambio')
+            i_nvl1, i_nvl2, i_nvl3 = indice('Menu Nvl 1'), indice('Menu Nvl 2'), indice('Menu Nvl 3')
+            i_marca, i_codigo_fiscal, i_link = indice('Marca'), indice('Código Fiscal'), indice('Link SYSCOM')
+            precio_por_omision = '' if 'Su Precio' in indices else '0'
+            vacias = [''] * (ancho + 1)
+
+            fila_offset = 0
+            for fila in lector_csv:
+                if not fila:
+                    continue  # csv.DictReader también omitía las filas vacías sin contarlas
+                fila_offset += 1
+                if len(fila) <= ancho:
+                    fila = fila + vacias[len(fila):]
+                menu_nvl1 = fila[i_nvl1].strip()
+                if filtro and menu_nvl1 not in filtro:
+                    continue
+                tipo_cambio_str = fila[i_tipo_cambio].strip()
+                tipo_cambio = parsear_numero(tipo_cambio_str)
+                if tipo_cambio_str and tipo_cambio is None and not advertencia_tipo_cambio:
+                    _logger.warning(f"No se pudo parsear 'Tipo de Cambio' desde el CSV: {tipo_cambio_str}")
+                    advertencia_tipo_cambio = True
+                yield fila_offset, {
+                    'modelo': fila[i_modelo].strip(),
+                    'titulo': fila[i_titulo].strip(),
+                    'su_precio': parsear_numero(fila[i_precio].strip() or precio_por_omision),
+                    'tipo_cambio': tipo_cambio,
+                    'nvl1': menu_nvl1,
+                    'nvl2': fila[i_nvl2].strip(),
+                    'nvl3': fila[i_nvl3].strip(),
+                    'marca': fila[i_marca].strip(),
+                    'codigo_fiscal': fila[i_codigo_fiscal].strip(),
+                    'link': fila[i_link].strip(),
+                }
+
+    def _asignar_marcas(self, filas_de_datos, mapa_marcas, crear=True):
+        """Resolver las marcas distintas del lote y asignar product_brand_id a cada fila"""
+        mapa_marcas = self._resolver_marcas((fila.marca for fila in filas_de_datos), mapa_marcas, crear)
+        for fila in filas_de_datos:
+            fila.product_brand_id = mapa_marcas.get(fila.marca, False)
+        return filas_de_datos
 
     # Funcion para agregar la marca de los productos importados, usando el modulo de OCA product_brand, si esta instalado. Si no, se puede omitir o implementar de otra forma.
-    def _set_or_create_brand(self, nombre_marca, marca_cache={}):
-        if "product.brand" in self.env.registry:
-            if nombre_marca in marca_cache:
-                return marca_cache[nombre_marca]
-            marca = self.env['product.brand'].search([('name', '=', nombre_marca)], limit=1)
-            if not marca:
-                marca = self.env['product.brand'].create({
-                    'name': nombre_marca,
-                })
-            marca_cache[nombre_marca] = marca
+    def _resolver_marcas(self, nombres_marca, mapa_marcas=None, crear=True):
+        """Obtener o crear por lotes las marcas indicadas
 
-            return marca
-        else:
-            _logger.warning('El módulo product_brand no está instalado, no se asignará marca a los productos importados.')
-            return False
+        Carga todas las marcas existentes en una consulta y crea las faltantes
+        con un solo create.
+
+        Args:
+            nombres_marca: Iterable con los nombres de marca del feed
+            mapa_marcas: Opcional, mapa {nombre: id} ya cargado que se actualiza en sitio
+            crear: Si es False las faltantes no se crean y quedan fuera del mapa (vista previa)
 
-    def _clasificar_productos(self, filas_de_datos, codigos_procesar):
+        Returns:
+            Diccionario {nombre: id de product.brand}; vacío si product_brand no está instalado
+        """
+        if "product.brand" not in self.env.registry:
+            if mapa_marcas is None:
+                _logger.warning('El módulo product_brand no está instalado, no se asignará marca a los productos importados.')
+            return {} if mapa_marcas is None else mapa_marcas
+        nombres = {n for n in nombres_marca if n}
+        if mapa_marcas is None:
+            mapa_marcas = {}
+            for marca in self.env['product.brand'].search_read([], ['name'], order='id'):
+                mapa_marcas.setdefault(marca['name'], marca['id'])
+        faltantes = sorted(nombres - mapa_marcas.keys())
+        if faltantes and crear:
+            nuevas = self.env['product.brand'].create([{'name': nombre} for nombre in faltantes])
+            mapa_marcas.update(zip(faltantes, nuevas.ids))
+            _logger.info(f'Syscom: {len(nuevas)} marcas creadas en lote')
+        return mapa_marcas
+
+    def _set_or_create_brand(self, nombre_marca, marca_cache=None):
+        """Obtener o crear una sola marca; para lotes usar _resolver_marcas"""
+        if marca_cache is None or nombre_marca not in marca_cache:
+            marca_cache = self._resolver_marcas([nombre_marca], marca_cache)
+        marca_id = marca_cache.get(nombre_marca)
+        return self.env['product.brand'].browse(marca_id) if marca_id else False
+
+    def _clasificar_productos(self, filas_de_datos, codigos_procesar, mapa_categorias=None, actuales=None, solo_lectura=False):
+        """Separar las filas en productos existentes y productos por crear
+
+        Args:
+            actuales: Opcional, diccionario que se llena con {product_id: valores leídos}
+                de los campos comparables, para pasarlo a _detectar_cambios
+            solo_lectura: Si es True las categorías faltantes no se crean y
+                las filas quedan sin categ_id (vista previa)
+
+        Returns:
+            Tupla ({product_id: FilaFeed}, [FilaFeed por crear], cantidad procesada);
+            cada fila queda con su categ_id resuelto
+        """
         d_productos_actualizar = {}
-        l_productos_crear_vals = []
-        productos_procesados = 0
-        productos_existentes = {}
-        if codigos_procesar:
-            existing_products = self.env['product.template'].search([
-                ('default_code', 'in', codigos_procesar)
-            ])
-            productos_existentes = {p.default_code: p for p in existing_products}
-        for fila_con_datos in filas_de_datos:
-            default_code = fila_con_datos['default_code']
-            categoria = self._get_or_create_category_from_parts(fila_con_datos['categoria_path'])
-            if default_code in productos_existentes:
-                product = productos_existentes[default_code]
-                d_productos_actualizar[product.id] = {
-                    'default_code': default_code,
-                    'name': fila_con_datos['name'],
-                    'standard_price': fila_con_datos['standard_price'],
-                    'list_price': fila_con_datos['list_price'],
-                    # Estos deberian de ser campos personalizados en el modelo supplierinfo o en un modelo relacionado, no en product.template directamente, ajustar según corresponda
-                    'syscom_url': fila_con_datos.get('syscom_url'),
-                    'syscom_url_image': fila_con_datos.get('Imagen Principal'),  # Asumiendo que la URL de la imagen es la misma que la del producto, ajustar si es diferente
-                    'product_brand_id': fila_con_datos.get('product_brand_id'),
-                }
+        productos_crear = {}
+        campos_modelo = self.env['product.template']._fields
+        campos = [c for c in _campos_comparables if c in campos_modelo]
+        # Una sola lectura trae el id y los valores que después compara _detectar_cambios
+        productos_existentes = self._buscar_productos_por_modelo(codigos_procesar, campos)
+        if actuales is not None:
+            actuales.update((producto['id'], producto) for producto in productos_existentes.values())
+        # Resolver todas las rutas de categoría distintas de una sola vez
+        mapa_categorias = self._resolver_categorias(
+            () if solo_lectura else (self._normalizar_ruta_categoria(fila.categoria_path) for fila in filas_de_datos),
+            mapa_categorias,
+        )
+        for fila in filas_de_datos:
+            fila.categ_id = mapa_categorias.get(self._normalizar_ruta_categoria(fila.categoria_path), False)
+            producto = productos_existentes.get(fila.default_code)
+            if producto:
+                d_productos_actualizar[producto['id']] = fila
             else:
-                l_productos_crear_vals.append({
-                    'name': fila_con_datos['name'],
-                    'default_code': default_code,
-                    'description_sale': fila_con_datos['name'],
-                    'standard_price': fila_con_datos['standard_price'],
-                    'list_price': fila_con_datos['list_price'],
-                    'categ_id': categoria.id if categoria else False,
-                    'type': 'consu',
-                    'purchase_ok': True,
-                    'sale_ok': True,
-                    'cat_unidad_medida': fila_con_datos['cat_unidad_medida'],
-                    'clave_producto': fila_con_datos['clave_producto'],
-                    'objetoimp': fila_con_datos['objetoimp'],
-                    # Estos deberian de ser campos personalizados en el modelo supplierinfo o en un modelo relacionado, no en product.template directamente, ajustar según corresponda
-                    'syscom_url': fila_con_datos.get('syscom_url'),
-                    'syscom_url_image': fila_con_datos.get('Imagen Principal'),  # Asumiendo que la URL de la imagen es la misma que la del producto, ajustar si es diferente
-                    'product_brand_id': fila_con_datos.get('product_brand_id'),
-                })
-            productos_procesados += 1
-        return d_productos_actualizar, l_productos_crear_vals, productos_procesados
+                # Un código repetido en el lote se crea una sola vez (gana la última fila, como en las actualizaciones)
+                productos_crear[fila.default_code] = fila
+        return d_productos_actualizar, list(productos_crear.values()), len(filas_de_datos)
+
+    def _buscar_productos_por_modelo(self, codigos, campos=()):
+        """Buscar productos por su 'Modelo' de Syscom, incluidos los archivados
+
+        Primero por syscom_modelo (índice único parcial); los códigos que no
+        aparecen se buscan por default_code solo entre productos sin
+        syscom_modelo, p.ej. dados de alta a mano. Las búsquedas van por
+        lotes de _registros_por_batch y leen únicamente los campos pedidos.
+
+        Returns:
+            Diccionario {codigo: valores de search_read con 'id' y campos}
+        """
+        Producto = self.env['product.template'].with_context(active_test=False)
+        campos = list(dict.fromkeys(['syscom_modelo', 'default_code', *campos]))
+        encontrados = {}
+        codigos = list(dict.fromkeys(codigos))
+        for i in range(0, len(codigos), _registros_por_batch):
+            lote = codigos[i:i + _registros_por_batch]
+            for producto in Producto.search_read([('syscom_modelo', 'in', lote)], campos):
+                encontrados[producto['syscom_modelo']] = producto
+            faltantes = [codigo for codigo in lote if codigo not in encontrados]
+            if faltantes:
+                for producto in Producto.search_read(
+                        [('default_code', 'in', faltantes), ('syscom_modelo', '=', False)], campos, order='active desc, id'):
+                    encontrados.setdefault(producto['default_code'], producto)
+        return encontrados
+
+    def _detectar_cambios(self, productos_actualizar, valores_anteriores=None, actuales=None):
+        """Filtrar los productos existentes cuyos datos no cambiaron
+
+        Compara los valores entrantes contra los valores actuales en base de datos,
+        leyendo solo los campos comparables por lotes de _registros_por_batch.
+
+        Args:
+            productos_actualizar: Diccionario {product_id: FilaFeed} de _clasificar_productos
+            valores_anteriores: Opcional, diccionario que se llena con
+                {product_id: {'default_code', 'list_price'}} de los productos con cambios
+            actuales: Opcional, valores ya leídos por _clasificar_productos; si
+                falta algún producto se lee de la base de datos
+
+        Returns:
+            Diccionario {product_id: valores} únicamente con los productos que cambiaron,
+            y en cada uno solo los campos cuyo valor difiere
+        """
+        if not productos_actualizar:
+            return {}
+        campos_modelo = self.env['product.template']._fields
+        campos = [c for c in _campos_comparables if c in campos_modelo]
+        productos_con_cambios = {}
+        actuales = dict(actuales or {})
+        ids = [producto_id for producto_id in productos_actualizar if producto_id not in actuales]
+        for i in range(0, len(ids), _registros_por_batch):
+            lote = ids[i:i + _registros_por_batch]
+            actuales.update((actual['id'], actual) for actual in self.env['product.template'].browse(lote).read(campos))
+        for producto_id in productos_actualizar:
+            actual = actuales[producto_id]
+            valores = productos_actualizar[producto_id].valores_actualizacion()
+            cambios = {
+                c: valores[c] for c in campos
+                if c in valores and not self._valores_iguales(campos_modelo[c], actual[c], valores[c])
+            }
+            if 'syscom_descontinuado' in cambios:
+                # Archivado por la importación y de vuelta en el feed
+                cambios['active'] = True
+            if cambios:
+                productos_con_cambios[producto_id] = cambios
+                if valores_anteriores is not None:
+                    valores_anteriores[producto_id] = {
+                        'default_code': valores.get('default_code'),
+                        'list_price': actual.get('list_price'),
+                    }
+        omitidos = len(productos_actualizar) - len(productos_con_cambios)
+        _logger.info(f'Syscom: {len(productos_con_cambios)} productos con cambios, {omitidos} sin cambios omitidos')
+        return productos_con_cambios
+
+    @staticmethod
+    def _valores_iguales(campo, valor_actual, valor_nuevo):
+        """Comparar un valor leído con read() contra el valor entrante del CSV"""
+        if campo.type == 'many2one':
+            valor_actual = valor_actual[0] if valor_actual else False
+            return (valor_actual or False) == (valor_nuevo or False)
+        if campo.type in ('float', 'monetary'):
+            return round(valor_actual or 0.0, _digitos_redondeo) == round(float(valor_nuevo or 0.0), _digitos_redondeo)
+        return (valor_actual or False) == (valor_nuevo or False)
+
+    def _procesar_batch_actualizacion(self, productos_actualizar, bitacora=None, valores_anteriores=None):
+        """Escribir los cambios agrupando productos con valores idénticos
+
+        El list_price, y el standard_price si stock_account no está instalado, se
+        actualizan con un UPDATE por lote vía SQL; el resto de los campos se
+        agrupa por diccionario de valores idéntico y se escribe con un solo
+        write por grupo.
 
-    def _procesar_batch_actualizacion(self, productos_actualizar):
+        Args:
+            productos_actualizar: Diccionario {product_id: campos con cambios}
+            bitacora: Opcional, BitacoraPrecios donde registrar los cambios de list_price
+            valores_anteriores: Valores previos llenados por _detectar_cambios
+        """
         productos_actualizados = 0
         if productos_actualizar:
-            _logger.info(f'Actualizando {len(productos_actualizar)} productos en batch...')
-            # agregar un contador del porcentaje de actualización cada 100 registros procesados o cada 5 segundos, lo que ocurra primero
             total = len(productos_actualizar)
-            count = 0
+            _logger.info(f'Actualizando {total} productos en batch...')
+            solo_precio_venta = {}
+            costos = {}
+            # Con stock_account el cambio de costo debe pasar por el ORM para generar la valoración
+            costo_por_sql = 'stock.valuation.layer' not in self.env.registry
+            grupos = {}
             for product_id, values in productos_actualizar.items():
-                self.env['product.template'].browse(product_id).write(values)
-                count += 1
-                if count % 100 == 0 or count == total:
-                    porcentaje = (count / total * 100) if total > 0 else 0
-                    _logger.info(f'Progreso de actualización: {porcentaje:.2f}% ({count}/{total})')
-                if (_usar_bitacora_precios is False):
-                    continue
-                try:
-                    product = self.env['product.template'].browse(product_id)
-                    registrar_bitacora_precios(f"Producto actualizado: {product.default_code} - Nuevo precio: {values.get('list_price', 'N/A')}")
-                except Exception as e:
-                    _logger.error(f'Error al registrar bitácora de producto actualizado: {e}')
-            productos_actualizados = len(productos_actualizar)
+                # Los precios van por SQL; el resto se agrupa por valores idénticos
+                if 'list_price' in values:
+                    solo_precio_venta[product_id] = values['list_price']
+                if costo_por_sql and 'standard_price' in values:
+                    costos[product_id] = values['standard_price']
+                values = {k: v for k, v in values.items() if k != 'list_price' and not (costo_por_sql and k == 'standard_price')}
+                if values:
+                    clave = tuple(sorted(values.items()))
+                    grupos.setdefault(clave, []).append(product_id)
+
+            self._actualizar_precio_venta_sql(solo_precio_venta)
+            self._actualizar_costo_sql(costos)
+            _logger.info(f'Precios actualizados vía SQL: {len(solo_precio_venta)} de venta, {len(costos)} de costo')
+
+            count = 0
+            total_grupos = sum(len(ids) for ids in grupos.values())
+            for clave, ids in grupos.items():
+                self.env['product.template'].browse(ids).write(dict(clave))
+                count += len(ids)
+                porcentaje = (count / total_grupos * 100) if total_grupos > 0 else 0
+                _logger.info(f'Progreso de actualización: {porcentaje:.2f}% ({count}/{total_grupos}) en {len(grupos)} grupos')
+
+            if bitacora:
+                valores_anteriores = valores_anteriores or {}
+                for product_id, precio in solo_precio_venta.items():
+                    anterior = valores_anteriores.get(product_id, {})
+                    bitacora.registrar('actualizado', anterior.get('default_code'), precio, anterior.get('list_price'))
+            productos_actualizados = total
         return productos_actualizados
 
-    def _procesar_batch_creacion(self, productos_crear_vals):
+    def _actualizar_precio_venta_sql(self, precios_por_id):
+        """Actualizar list_price de product.template con un UPDATE por lote
+
+        Args:
+            precios_por_id: Diccionario {product_template_id: list_price}
+        """
+        self._actualizar_campo_sql('product.template', 'list_price', precios_por_id)
+
+    def _actualizar_costo_sql(self, costos_por_id):
+        """Actualizar standard_price de las variantes de cada product.template con un UPDATE por lote
+
+        standard_price vive en product.product y depende de la compañía, así que
+        se resuelven las variantes con una sola consulta y se escribe la clave
+        de la compañía actual.
+
+        Args:
+            costos_por_id: Diccionario {product_template_id: standard_price}
+        """
+        if not costos_por_id:
+            return
+        self.env['product.product'].flush_model(['product_tmpl_id'])
+        self.env.cr.execute(SQL(
+            "SELECT id, product_tmpl_id FROM product_product WHERE product_tmpl_id = ANY(%s)",
+            list(costos_por_id),
+        ))
+        costos_por_variante = {variante_id: costos_por_id[tmpl_id] for variante_id, tmpl_id in self.env.cr.fetchall()}
+        self._actualizar_campo_sql('product.product', 'standard_price', costos_por_variante)
+
+    def _actualizar_campo_sql(self, nombre_modelo, campo, valores_por_id):
+        """Actualizar un campo numérico almacenado con un UPDATE ... FROM (VALUES ...) por lote
+
+        Los campos company_dependent (columna jsonb {company_id: valor}) solo
+        reemplazan el valor de la compañía actual.
+
+        Args:
+            nombre_modelo: Modelo cuyo _table se actualiza, p.ej. 'product.template'
+            campo: Nombre del campo/columna a escribir
+            valores_por_id: Diccionario {id: valor}
+        """
+        if not valores_por_id:
+            return
+        Modelo = self.env[nombre_modelo]
+        # Vaciar escrituras pendientes del ORM antes de escribir directo en la tabla
+        Modelo.flush_model([campo])
+        if Modelo._fields[campo].company_dependent:
+            nuevo_valor = SQL(
+                "COALESCE(t.%s, '{}'::jsonb) || jsonb_build_object(%s::text, v.valor)",
+                SQL.identifier(campo), self.env.company.id,
+            )
+        else:
+            nuevo_valor = SQL("v.valor")
+        items = list(valores_por_id.items())
+        for i in range(0, len(items), _registros_por_batch):
+            lote = items[i:i + _registros_por_batch]
+            self.env.cr.execute(SQL(
+                """
+                UPDATE %s AS t
+                   SET %s = %s, write_date = %s, write_uid = %s
+                  FROM (VALUES %s) AS v(id, valor)
+                 WHERE t.id = v.id
+                """,
+                SQL.identifier(Modelo._table),
+                SQL.identifier(campo),
+                nuevo_valor,
+                fields.Datetime.now(),
+                self.env.uid,
+                SQL(", ").join(SQL("(%s::int, %s::numeric)", registro_id, valor) for registro_id, valor in lote),
+            ))
+            registros = Modelo.browse([registro_id for registro_id, _valor in lote])
+            # Invalidar caché y notificar a los campos dependientes del cambio
+            registros.invalidate_recordset([campo, 'write_date', 'write_uid'])
+            # El recálculo de los dependientes queda para el flush de _confirmar_lote
+            registros.modified([campo])
+
+    def _procesar_batch_creacion(self, productos_crear, ids_por_codigo=None, bitacora=None):
+        """Crear productos por lotes
+
+        Los valores de create() se arman por chunk, agregando _valores_fijos_creacion
+        a cada fila solo en ese momento.
+
+        Args:
+            productos_crear: Lista de FilaFeed por crear
+            ids_por_codigo: Opcional, diccionario que se llena con {default_code: id}
+                de los productos creados para reutilizarlo en pasos posteriores
+            bitacora: Opcional, BitacoraPrecios donde registrar los productos creados
+        """
         productos_creados = 0
         created_records = self.env['product.template']
-        if productos_crear_vals:
+        if productos_crear:
             batch_size = _registros_por_batch
-            _logger.info(f'Creando {len(productos_crear_vals)} productos en batches de {batch_size}...')
-            for i in range(0, len(productos_crear_vals), batch_size):
-                chunk = productos_crear_vals[i:i+batch_size]
+            _logger.info(f'Creando {len(productos_crear)} productos en batches de {batch_size}...')
+            for i in range(0, len(productos_crear), batch_size):
+                chunk = productos_crear[i:i+batch_size]
                 try:
-                    created_chunk = self.env['product.template'].create(chunk)
+                    # Con savepoint un chunk que falla (p.ej. syscom_modelo repetido por otra importación
+                    # concurrente) se revierte solo y no deja abortada la transacción para los siguientes
+                    with self.env.cr.savepoint():
+                        created_chunk = self.env['product.template'].create([fila.valores_creacion(_valores_fijos_creacion) for fila in chunk])
                     created_records |= created_chunk
-                    if (_usar_bitacora_precios is False):
-                        continue
-                    for product in created_chunk:
-                        registrar_bitacora_precios(f"Producto creado: {product.default_code} - Precio: {product.list_price}")
+                    if ids_por_codigo is not None:
+                        ids_por_codigo.update((product.default_code, product.id) for product in created_chunk)
+                    if bitacora:
+                        for fila in chunk:
+                            bitacora.registrar('creado', fila.default_code, fila.list_price)
                 except Exception as e:
                     _logger.error(f'Error creando batch de productos (offset {i}): {e}', exc_info=True)
             productos_creados = len(created_records)
             try:
-                tax_iva_16 = self.env['account.tax'].search([('amount', '=', 16), ('type_tax_use', '=', 'sale')], limit=1)
+                tax_iva_16 = self._impuesto_venta()
                 if tax_iva_16 and created_records:
-                    created_records.write({'taxes_id': [(6, 0, [tax_iva_16.id])]})
+                    with self.env.cr.savepoint():
+                        created_records.write({'taxes_id': [(6, 0, [tax_iva_16.id])]})
                     _logger.info(f'Impuesto IVA 16% asignado a {len(created_records)} productos creados')
             except Exception as e:
                 _logger.exception('No se pudo asignar impuestos en batch a los productos creados: %s', e)
@@ -684,57 +2082,89 @@ class SyscomConfig(models.Model):
         except Exception as e:
             _logger.error(f'Error al registrar log: {str(e)}')
 
-    def _procesar_info_proveedor(self, l_productos_creados_vals=[], d_productos_actualizados={}, proveedor_info=None):
-        registros_procesados = 0
-        total_productos = len(l_productos_creados_vals) + len(d_productos_actualizados)
-        productos_vals = l_productos_creados_vals + list(d_productos_actualizados.values())
-        # Buscar todos los productos por default_code en una sola consulta
-        default_codes = [p['default_code'] for p in productos_vals]
-        productos = self.env['product.template'].search([('default_code', 'in', default_codes)])
-        productos_dict = {p.default_code: p for p in productos}
-
-        # Buscar supplierinfo existentes para este proveedor y estos productos
-        supplierinfos = self.env['product.supplierinfo'].search([
-            ('product_tmpl_id', 'in', productos.ids),
-            ('partner_id', '=', proveedor_info.id)
-        ])
-        supplierinfo_dict = {(s.product_tmpl_id.id, s.partner_id.id): s for s in supplierinfos}
-
-        for producto_vals in productos_vals:
-            try:
-                producto_info = productos_dict.get(producto_vals['default_code'])
-                if not producto_info:
-                    _logger.warning(f'No se encontró el producto recién creado para info de proveedor: {producto_vals["default_code"]}')
-                    continue
+    def _procesar_info_proveedor(self, l_productos_creados=(), d_productos_actualizados=None, proveedor_info=None, ids_creados=None):
+        """Sincronizar product.supplierinfo del proveedor por conjuntos
 
-                key = (producto_info.id, proveedor_info.id)
-                info_existente = supplierinfo_dict.get(key)
+        Calcula en memoria qué tarifas crear, cuáles actualizar y cuáles no
+        cambiaron; crea las nuevas con create por lotes y escribe los precios
+        con un UPDATE por lote.
 
-                precio = round(float(producto_vals['standard_price']), 2)
-                if info_existente and info_existente.price == precio:
-                    registros_procesados += 1
-                    continue  # Si el precio es el mismo, no hacemos nada
+        Args:
+            l_productos_creados: FilaFeed de los productos enviados a crear
+            d_productos_actualizados: Diccionario {product_tmpl_id: FilaFeed} de los productos existentes
+            proveedor_info: Registro res.partner del proveedor
+            ids_creados: Diccionario {default_code: id} llenado por _procesar_batch_creacion;
+                si no se indica se buscan los productos creados por su 'Modelo' 
 
-                datos_tarifa = {
+        Returns:
+            Cantidad de productos con tarifa de proveedor sincronizada
+        """
+        # 1. Resolver (product_tmpl_id -> valores) sin volver a buscar los productos existentes
+        productos_por_id = dict(d_productos_actualizados or {})
+        if l_productos_creados:
+            if ids_creados is None:
+                ids_creados = {
+                    codigo: producto['id']
+                    for codigo, producto in self._buscar_productos_por_modelo([fila.default_code for fila in l_productos_creados]).items()
+                }
+            for fila in l_productos_creados:
+                producto_id = ids_creados.get(fila.default_code)
+                if not producto_id:
+                    _logger.warning(f'No se encontró el producto recién creado para info de proveedor: {fila.default_code}')
+                    continue
+                productos_por_id[producto_id] = fila
+        if not productos_por_id:
+            return 0
+
+        # 2. Cargar las tarifas existentes de este proveedor para estos productos
+        existentes = {}
+        ids = list(productos_por_id)
+        for i in range(0, len(ids), _registros_por_batch):
+            for info in self.env['product.supplierinfo'].search_read([
+                ('product_tmpl_id', 'in', ids[i:i + _registros_por_batch]),
+                ('partner_id', '=', proveedor_info.id)
+            ], ['product_tmpl_id', 'price', 'product_code', 'product_name'], order='id'):
+                existentes.setdefault(info['product_tmpl_id'][0], info)
+
+        # 3. Separar en conjuntos de creación, actualización y sin cambios
+        crear_vals = []
+        precios_actualizar = {}
+        textos_actualizar = {}
+        sin_cambios = 0
+        for producto_id, fila in productos_por_id.items():
+            precio = round(float(fila.standard_price), 2)
+            info = existentes.get(producto_id)
+            if not info:
+                crear_vals.append({
                     'partner_id': proveedor_info.id,
-                    'product_tmpl_id': producto_info.id,
+                    'product_tmpl_id': producto_id,
                     'price': precio,
-                    'product_code': producto_vals['default_code'],
-                    'product_name': producto_vals['name'],
-                }
-
-                if info_existente:
-                    info_existente.write(datos_tarifa)
-                else:
-                    self.env['product.supplierinfo'].create(datos_tarifa)
-                registros_procesados += 1
-                if registros_procesados % 100 == 0 or registros_procesados == total_productos:
-                    porcentaje = (registros_procesados / total_productos * 100) if total_productos > 0 else 0
-                    _logger.info(f'Progreso de info proveedor Porcentaje: {porcentaje:.2f}%')
+                    'product_code': fila.default_code,
+                    'product_name': fila.name,
+                })
+                continue
+            if round(info['price'], 2) == precio:
+                sin_cambios += 1
+                continue  # Si el precio es el mismo, no hacemos nada
+            precios_actualizar[info['id']] = precio
+            textos = (fila.default_code, fila.name)
+            if textos != (info['product_code'], info['product_name']):
+                textos_actualizar.setdefault(textos, []).append(info['id'])
+
+        # 4. Escrituras por conjunto
+        creadas = 0
+        for i in range(0, len(crear_vals), _registros_por_batch):
+            try:
+                creadas += len(self.env['product.supplierinfo'].create(crear_vals[i:i + _registros_por_batch]))
             except Exception as e:
-                _logger.error(f'Error al crear info de proveedor para producto {producto_vals["default_code"]}: {e}')
-        _logger.info(f'Información de proveedor procesada para {registros_procesados} productos.')
-        self.registrar_log(descripcion=f'Información de proveedor procesada para {registros_procesados} productos.', tipo_operacion='Info Proveedor')
+                _logger.error(f'Error al crear info de proveedor en lote (offset {i}): {e}', exc_info=True)
+        self._actualizar_campo_sql('product.supplierinfo', 'price', precios_actualizar)
+        for (codigo, nombre), info_ids in textos_actualizar.items():
+            self.env['product.supplierinfo'].browse(info_ids).write({'product_code': codigo, 'product_name': nombre})
+
+        registros_procesados = creadas + len(precios_actualizar) + sin_cambios
+        _logger.info(f'Información de proveedor procesada para {registros_procesados} productos: '
+                     f'{creadas} creadas, {len(precios_actualizar)} actualizadas, {sin_cambios} sin cambios.')
         return registros_procesados
 
     def _registrar_log_importacion(self, filepath, tipo_cambio_csv, productos_procesados, productos_creados, productos_actualizados):
@@ -744,7 +2174,7 @@ class SyscomConfig(models.Model):
             file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
             categorias_importadas = self.categorias_importar or '----'
             tasa_log = tipo_cambio_csv if tipo_cambio_csv else (getattr(self, 'tasa_cambio', None) or 0.0)
-            self.env['syscom.log'].create({
+            valores_log = {
                 'fecha_descarga': fields.Datetime.now(),
                 'tamano_descarga': f'{file_size / (1024 * 1024):.2f} MB',
                 'ruta_archivo': filepath,
@@ -752,11 +2182,36 @@ class SyscomConfig(models.Model):
                 'categorias_importadas': categorias_importadas,
                 'tipo_accion': 'Procesar CSV',
                 'tasa_cambio': tasa_log,
-            })
+                'filas_procesadas': productos_procesados,
+                'productos_creados': productos_creados,
+                'productos_actualizados': productos_actualizados,
+                'huella_precios': self._huella_precios(),
+            }
+            valores_log.update(self._valores_metricas_log())
+            self.env['syscom.log'].create(valores_log)
             _logger.info(f'Syscom: Tasa de cambio registrada en bitácora: {tasa_log}')
         except Exception:
             _logger.exception('No se pudo registrar la tasa de cambio en la bitácora')
 
+    def _valores_metricas_log(self):
+        """Campos numéricos de syscom.log a partir del MedidorFases de la ejecución"""
+        valores = {'rss_pico_mb': round(rss_pico_bytes() / (1024 * 1024), 2)}
+        medidor = self._medidor()
+        if not medidor:
+            return valores
+        fases = medidor.como_dict()
+        descarga = fases.get('descarga', {})
+        valores['bytes_descarga'] = descarga.get('bytes', 0)
+        valores['segundos_descarga'] = descarga.get('segundos', 0.0)
+        for fase in _fases_bitacora:
+            metricas_fase = fases.get(fase, {})
+            valores[f'segundos_{fase}'] = metricas_fase.get('segundos', 0.0)
+            valores[f'consultas_{fase}'] = metricas_fase.get('consultas', 0)
+            valores[f'filas_{fase}'] = metricas_fase.get('filas', 0)
+        valores['segundos_total'] = medidor.transcurrido()
+        _logger.info(f'Syscom: Métricas por fase: {medidor.resumen()}')
+        return valores
+
     # metodo para modificar los modelos de impuestos en product.template, para asignar el impuesto de iva 16% a los productos importados
     # y el impuesto del 16% de iva en ventas
     def _asignar_impuestos(self, product_template):
@@ -773,45 +2228,195 @@ class SyscomConfig(models.Model):
             _logger.error(f'Error al asignar impuestos: {str(e)}')
             raise UserError(f'Error al asignar impuestos al producto: {str(e)}')
 
-    def _get_or_create_category_from_parts(self, parts_list):
-        """Obtener o crear categoría desde lista de partes ya separadas
+    @staticmethod
+    def _normalizar_ruta_categoria(parts_list):
+        """Convertir una lista de niveles en una tupla sin partes vacías
 
         Args:
             parts_list: Lista de strings con cada nivel ['Nivel1', 'Nivel2', 'Nivel3']
 
         Returns:
-            Registro de product.category o None
+            Tupla con los niveles no vacíos, p.ej. ('Nivel1', 'Nivel3')
         """
         if not parts_list:
-            return None
-
-        # Filtrar partes vacías
-        parts = [p.strip() for p in parts_list if p and p.strip()]
+            return ()
+        return tuple(p.strip() for p in parts_list if p and p.strip())
 
-        if not parts:
-            return None
+    def _cargar_arbol_categorias(self):
+        """Cargar el árbol de product.category completo en una sola consulta
 
-        parent_id = False
-        categoria = None
+        Returns:
+            Diccionario {('Nivel1', 'Nivel2', ...): id}. Si existen categorías
+            duplicadas con el mismo nombre y padre, se conserva la primera.
+        """
+        registros = self.env['product.category'].search_read([], ['name', 'parent_id'], order='id')
+        por_id = {r['id']: (r['name'], r['parent_id'][0] if r['parent_id'] else False) for r in registros}
+        rutas_por_id = {}
+
+        def ruta_de(cat_id):
+            ruta = rutas_por_id.get(cat_id)
+            if ruta is not None:
+                return ruta
+            # Recorrer ancestros de forma iterativa para evitar recursión profunda
+            cadena = []
+            actual = cat_id
+            while actual and actual not in rutas_por_id and actual in por_id:
+                cadena.append(actual)
+                actual = por_id[actual][1]
+            base = rutas_por_id.get(actual, ()) if actual else ()
+            for nodo in reversed(cadena):
+                base = base + (por_id[nodo][0],)
+                rutas_por_id[nodo] = base
+            return rutas_por_id[cat_id]
+
+        mapa_rutas = {}
+        for r in registros:
+            mapa_rutas.setdefault(ruta_de(r['id']), r['id'])
+        return mapa_rutas
+
+    def _resolver_categorias(self, rutas, mapa_rutas=None):
+        """Obtener o crear por lotes todas las categorías de las rutas indicadas
+
+        Carga el árbol existente en memoria y crea los nodos faltantes nivel
+        por nivel con un solo create por nivel.
 
-        for part in parts:
-            categoria = self.env['product.category'].search([
-                ('name', '=', part),
-                ('parent_id', '=', parent_id)
-            ], limit=1)
+        Args:
+            rutas: Iterable de tuplas normalizadas ('Nivel1', 'Nivel2', 'Nivel3')
+            mapa_rutas: Opcional, mapa {ruta: id} ya cargado que se actualiza en sitio
 
-            if not categoria:
-                categoria = self.env['product.category'].create({
-                    'name': part,
-                    'parent_id': parent_id,
-                })
+        Returns:
+            Diccionario {ruta: id de product.category} que incluye todos los prefijos
+        """
+        rutas = {r for r in rutas if r}
+        if mapa_rutas is None:
+            mapa_rutas = self._cargar_arbol_categorias()
+        if not rutas:
+            return mapa_rutas
+
+        profundidad = max(len(r) for r in rutas)
+        creadas = 0
+        for nivel in range(1, profundidad + 1):
+            faltantes = sorted({r[:nivel] for r in rutas if len(r) >= nivel} - mapa_rutas.keys())
+            if not faltantes:
+                continue
+            nuevas = self.env['product.category'].create([{
+                'name': ruta[-1],
+                'parent_id': mapa_rutas.get(ruta[:-1], False),
+            } for ruta in faltantes])
+            mapa_rutas.update(zip(faltantes, nuevas.ids))
+            creadas += len(nuevas)
+        if creadas:
+            _logger.info(f'Syscom: {creadas} categorías creadas en lote para {len(rutas)} rutas distintas')
+        return mapa_rutas
+
+    def _get_or_create_category_from_parts(self, parts_list, mapa_rutas=None):
+        """Obtener o crear categoría desde lista de partes ya separadas
 
-            parent_id = categoria.id
+        Args:
+            parts_list: Lista de strings con cada nivel ['Nivel1', 'Nivel2', 'Nivel3']
+            mapa_rutas: Opcional, mapa {ruta: id} devuelto por _resolver_categorias
 
-        return categoria
+        Returns:
+            Registro de product.category o None
+        """
+        ruta = self._normalizar_ruta_categoria(parts_list)
+        if not ruta:
+            return None
+        if mapa_rutas is None or ruta not in mapa_rutas:
+            mapa_rutas = self._resolver_categorias([ruta], mapa_rutas)
+        return self.env['product.category'].browse(mapa_rutas[ruta])
 
     @api.model
-    def cron_importar_syscom(self):
-        """Método llamado por el cron para importación automática"""
+    def cron_importar_syscom(self, modo=None):
+        """Método llamado por el cron para importación automática
+
+        Con sondear_cambios la ejecución se omite si el feed no cambió desde
+        la última descarga procesada.
+
+        Args:
+            modo: Opcional, 'completa' o 'precios'; si no se indica se usa el de la configuración
+        """
         config = self.get_config()
+        if config.sondear_cambios and not config._sondear_feed():
+            _logger.info('Syscom: El feed no cambió desde la última importación; se omite la ejecución del cron.')
+            return
+        if modo:
+            config = config.with_context(syscom_modo_importacion=modo)
         config.ejecutar_importacion()
+
+    @api.model
+    def cron_sondear_syscom(self):
+        """Cron de intervalo corto: encolar la importación solo si el feed cambió
+
+        No hace nada fuera de la ventana de ejecución ni mientras haya una
+        importación en segundo plano pendiente o en curso.
+        """
+        config = self.get_config()
+        if not config.sondear_cambios or not config._en_ventana_ejecucion():
+            return
+        self.env['syscom.importacion'].cerrar_trabajos_vencidos()
+        if self.env['syscom.importacion'].search_count([('estado', 'in', ('pendiente', 'ejecutando'))]):
+            _logger.info('Syscom: Hay una importación en curso; se omite el sondeo.')
+            return
+        if not config._sondear_feed(espaciar_hash=True):
+            return
+        trabajo = self.env['syscom.importacion'].encolar(config, forzar_descarga=True)
+        config.registrar_log(descripcion=f'Cambio detectado en el feed ({config.resultado_ultimo_sondeo}); importación {trabajo.id} encolada.',
+                             tipo_operacion='Sondeo de Cambios')
+
+    def _en_ventana_ejecucion(self):
+        """Si la hora actual en zona_horaria cae en [ventana_inicio, ventana_fin); la ventana puede cruzar la medianoche"""
+        if self.ventana_inicio == self.ventana_fin:
+            return True
+        ahora = datetime.now(pytz.utc).astimezone(self._zona_horaria())
+        hora = ahora.hour + ahora.minute / 60.0
+        if self.ventana_inicio < self.ventana_fin:
+            return self.ventana_inicio <= hora < self.ventana_fin
+        return hora >= self.ventana_inicio or hora < self.ventana_fin
+
+    def _sondear_feed(self, espaciar_hash=False):
+        """Sondear syscom_url y decidir si hay un feed que aún no se importa
+
+        Compara contra la última descarga registrada en la bitácora: ETag y
+        Last-Modified con un HEAD condicional o, en su defecto, el hash del
+        contenido. Si la última descarga no llegó a procesarse se considera
+        que hay cambios sin consultar al servidor.
+
+        Args:
+            espaciar_hash: Si el último sondeo tuvo que recorrer el contenido, no
+                consultar al servidor hasta que pasen _minutos_entre_sondeos_hash
+
+        Returns:
+            True si hay que importar
+        """
+        self.ensure_one()
+        ultima = self.env['syscom.log'].search([('tipo_accion', '=', 'Descarga CSV')], limit=1, order='fecha_descarga desc')
+        metodo = False
+        if not ultima:
+            cambio, detalle = True, 'sin descargas previas'
+        elif self._configuracion_precios_cambio():
+            cambio, detalle = True, 'cambió la configuración de precios'
+        elif not self.env['syscom.log'].search_count([('tipo_accion', '=', 'Procesar CSV'), ('ruta_archivo', '=', ultima.ruta_archivo)]):
+            cambio, detalle = True, 'la última descarga no se ha procesado'
+        elif espaciar_hash and self.metodo_ultimo_sondeo == 'hash' and self.fecha_ultimo_sondeo and \
+                self.fecha_ultimo_sondeo > fields.Datetime.now() - timedelta(minutes=_minutos_entre_sondeos_hash):
+            return False
+        else:
+            huella = ultima.hash_contenido
+            if not huella and ultima.ruta_archivo and os.path.exists(ultima.ruta_archivo):
+                huella = hash_archivo(ultima.ruta_archivo)
+            try:
+                resultado = sondear_archivo(self.syscom_url, headers=_encabezados_descarga, etag=ultima.etag,
+                                            last_modified=ultima.last_modified, huella=huella, timeout=_tiempo_espera_sondeo)
+            except requests.RequestException as e:
+                _logger.warning(f'Syscom: Falló el sondeo del feed: {e}')
+                self.write({'fecha_ultimo_sondeo': fields.Datetime.now(), 'resultado_ultimo_sondeo': f'Error: {e}'[:200],
+                            'metodo_ultimo_sondeo': False})
+                return False
+            cambio = resultado['cambio']
+            metodo = resultado['metodo']
+            detalle = f'{"cambió" if cambio else "sin cambios"} ({metodo})'
+        _logger.info(f'Syscom: Sondeo del feed: {detalle}')
+        self.write({'fecha_ultimo_sondeo': fields.Datetime.now(), 'resultado_ultimo_sondeo': detalle,
+                    'metodo_ultimo_sondeo': metodo})
+        return cambio
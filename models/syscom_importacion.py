@@ -0,0 +1,211 @@
+# ===========================
+# models/syscom_importacion.py
+# ===========================
+from odoo import models, fields, api
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+_segundos_entre_publicaciones = 2  # Mínimo de segundos entre escrituras de progreso
+_horas_sin_avance = 2  # Un trabajo 'ejecutando' sin avance publicado en este tiempo se da por fallido
+
+
+class SyscomImportacion(models.Model):
+    _name = 'syscom.importacion'
+    _description = 'Importación Syscom en segundo plano'
+    _order = 'create_date desc, id desc'
+    _rec_name = 'create_date'
+
+    config_id = fields.Many2one(
+        'syscom.config',
+        string='Configuración',
+        required=True,
+        ondelete='cascade'
+    )
+    modo_importacion = fields.Selection(
+        [('completa', 'Completa'), ('precios', 'Solo precios'), ('vista_previa', 'Vista previa')],
+        string='Modo',
+        help='Vacío para usar el modo de la configuración.'
+    )
+    estado = fields.Selection(
+        [('pendiente', 'Pendiente'),
+         ('ejecutando', 'Ejecutando'),
+         ('terminado', 'Terminado'),
+         ('error', 'Error')],
+        string='Estado',
+        required=True,
+        default='pendiente'
+    )
+    fase = fields.Char(string='Fase')
+    filas_procesadas = fields.Integer(string='Filas procesadas')
+    filas_estimadas = fields.Integer(
+        string='Filas estimadas',
+        help='Filas de la importación anterior, usadas para estimar el avance.'
+    )
+    porcentaje = fields.Float(string='Avance (%)')
+    filas_por_segundo = fields.Float(string='Filas por segundo')
+    fecha_inicio = fields.Datetime(string='Inicio')
+    fecha_fin = fields.Datetime(string='Fin')
+    fecha_estimada_fin = fields.Datetime(string='Fin estimado')
+    mensaje = fields.Text(string='Mensaje')
+    forzar_descarga = fields.Boolean(
+        string='Forzar descarga',
+        help='Encolada por el sondeo de cambios: descargar el feed aunque la última descarga sea reciente.'
+    )
+    vista_previa_id = fields.Many2one('syscom.vista.previa', string='Vista previa', readonly=True)
+
+    @api.model
+    def encolar(self, config, modo=None, forzar_descarga=False):
+        """Crear un trabajo pendiente y despertar al cron que los ejecuta"""
+        ultimo = self.env['syscom.log'].search([('tipo_accion', '=', 'Procesar CSV'), ('filas_procesadas', '>', 0)], limit=1)
+        trabajo = self.create({
+            'config_id': config.id,
+            'modo_importacion': modo,
+            'forzar_descarga': forzar_descarga,
+            'filas_estimadas': ultimo.filas_procesadas,
+        })
+        self.env.ref(f'{self._module}.ir_cron_syscom_importacion_segundo_plano')._trigger()
+        return trabajo
+
+    @api.model
+    def cerrar_trabajos_vencidos(self):
+        """Marcar como fallidos los trabajos 'ejecutando' que dejaron de publicar avance
+
+        Un proceso que murió a media importación (reinicio del servidor, límite
+        de memoria) nunca registra su estado final; sin esto el trabajo queda
+        'ejecutando' para siempre y el sondeo de cambios no vuelve a encolar.
+        """
+        limite = fields.Datetime.now() - timedelta(hours=_horas_sin_avance)
+        vencidos = self.search([('estado', '=', 'ejecutando'), ('write_date', '<', limite)])
+        if vencidos:
+            _logger.warning(f'Syscom: {len(vencidos)} importaciones sin avance en {_horas_sin_avance} horas se marcan como fallidas')
+            vencidos.write({
+                'estado': 'error',
+                'fecha_fin': fields.Datetime.now(),
+                'mensaje': f'Sin avance durante {_horas_sin_avance} horas; el proceso que la ejecutaba ya no responde.',
+            })
+        return vencidos
+
+    @api.model
+    def cron_ejecutar_pendientes(self):
+        """Ejecutar los trabajos pendientes uno por uno, cada uno reservado con SKIP LOCKED"""
+        self.cerrar_trabajos_vencidos()
+        self.env.cr.commit()
+        while True:
+            self.env.cr.execute(
+                "SELECT id FROM syscom_importacion WHERE estado = 'pendiente' ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED"
+            )
+            fila = self.env.cr.fetchone()
+            if not fila:
+                return
+            trabajo = self.browse(fila[0])
+            trabajo.write({'estado': 'ejecutando', 'fecha_inicio': fields.Datetime.now(), 'fase': 'inicio'})
+            self.env.cr.commit()
+            trabajo._ejecutar()
+
+    def _ejecutar(self):
+        self.ensure_one()
+        progreso = ProgresoImportacion(self.env.registry, self.env.uid, self.id, self.filas_estimadas)
+        config = self.config_id.with_context(syscom_progreso=progreso)
+        if self.modo_importacion:
+            config = config.with_context(syscom_modo_importacion=self.modo_importacion)
+        if self.forzar_descarga:
+            config = config.with_context(syscom_forzar_descarga=True)
+        try:
+            resultado = config.ejecutar_importacion()
+            # Confirmar lo que dejó la ejecución (p.ej. la vista previa) antes de referenciarlo desde otro cursor
+            self.env.cr.commit()
+            valores = {
+                'estado': 'terminado',
+                'fase': 'completado',
+                'porcentaje': 100.0,
+                'fecha_fin': fields.Datetime.now(),
+                'filas_procesadas': progreso.filas,
+                'vista_previa_id': resultado.get('res_id') if resultado.get('res_model') == 'syscom.vista.previa' else False,
+            }
+        except Exception as e:
+            _logger.exception(f'Syscom: Falló la importación en segundo plano {self.id}')
+            self.env.cr.rollback()
+            valores = {'estado': 'error', 'fecha_fin': fields.Datetime.now(), 'mensaje': str(e)}
+        # El avance ya actualizó este registro desde otros cursores; escribir el estado final desde este
+        # cursor chocaría con esas actualizaciones (REPEATABLE READ), así que va por el mismo camino
+        try:
+            progreso.finalizar(valores)
+        except Exception:
+            _logger.exception(f'Syscom: No se pudo registrar el estado final de la importación {self.id}')
+        self.invalidate_recordset()
+
+    def action_actualizar(self):
+        """Recargar el formulario para ver el avance más reciente"""
+        return {'type': 'ir.actions.client', 'tag': 'soft_reload'}
+
+
+class ProgresoImportacion:
+    """
+    Avance de una importación en segundo plano.
+
+    Se comparte entre hilos (importación en paralelo) y publica en el registro
+    syscom.importacion con un cursor propio y breve, para que el avance sea
+    visible aunque el lote en curso aún no se confirme. Las publicaciones se
+    limitan a una cada _segundos_entre_publicaciones.
+    """
+
+    def __init__(self, registry, uid, trabajo_id, filas_estimadas=0):
+        self.registry = registry
+        self.uid = uid
+        self.trabajo_id = trabajo_id
+        self.filas_estimadas = filas_estimadas
+        self.fase = None
+        self.filas = 0
+        self.inicio = time.monotonic()
+        self._ultima_publicacion = 0.0
+        self._terminado = False
+        self._candado = threading.Lock()
+
+    def avanzar(self, fase=None, filas=0):
+        with self._candado:
+            if self._terminado:
+                return
+            if fase is not None:
+                self.fase = fase
+            self.filas += filas
+            ahora = time.monotonic()
+            if ahora - self._ultima_publicacion < _segundos_entre_publicaciones:
+                return
+            self._ultima_publicacion = ahora
+            valores = self._valores(ahora)
+        self._publicar(valores)
+
+    def _valores(self, ahora):
+        transcurrido = ahora - self.inicio
+        velocidad = self.filas / transcurrido if transcurrido > 0 else 0.0
+        valores = {
+            'fase': self.fase,
+            'filas_procesadas': self.filas,
+            'filas_por_segundo': round(velocidad, 1),
+        }
+        if self.filas_estimadas:
+            valores['porcentaje'] = min(99.0, self.filas * 100.0 / self.filas_estimadas)
+            if velocidad > 0:
+                restantes = max(self.filas_estimadas - self.filas, 0) / velocidad
+                valores['fecha_estimada_fin'] = fields.Datetime.to_string(datetime.now() + timedelta(seconds=restantes))
+        return valores
+
+    def finalizar(self, valores):
+        """Publicar el estado final del trabajo; a diferencia del avance, los errores se propagan"""
+        with self._candado:
+            self._terminado = True
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, self.uid, {})
+            env['syscom.importacion'].browse(self.trabajo_id).write(valores)
+
+    def _publicar(self, valores):
+        try:
+            with self.registry.cursor() as cr:
+                env = api.Environment(cr, self.uid, {})
+                env['syscom.importacion'].browse(self.trabajo_id).write(valores)
+        except Exception:
+            # El avance es informativo; un fallo al publicarlo no debe detener la importación
+            _logger.warning('Syscom: No se pudo publicar el avance de la importación', exc_info=True)
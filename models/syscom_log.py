@@ -43,6 +43,124 @@ class SyscomLog(models.Model):
         required=True,
         default='Descarga CSV'
     )
+    etag = fields.Char(
+        string='ETag',
+        help='Validador ETag devuelto por el servidor para la descarga condicional siguiente'
+    )
+    last_modified = fields.Char(
+        string='Last-Modified',
+        help='Validador Last-Modified devuelto por el servidor para la descarga condicional siguiente'
+    )
+    huella_precios = fields.Char(
+        string='Huella de precios',
+        help='Huella de la ganancia, conversión y reglas de precio con que se procesó el archivo'
+    )
+    hash_contenido = fields.Char(
+        string='Hash del contenido',
+        help='SHA-256 del archivo descargado; el sondeo de cambios lo compara si el servidor no envía validadores'
+    )
+
+    # Métricas numéricas de la ejecución (solo en los registros 'Procesar CSV')
+    bytes_descarga = fields.Integer(
+        string='Bytes descargados',
+        aggregator='sum'
+    )
+    segundos_descarga = fields.Float(
+        string='Segundos de descarga',
+        aggregator='avg'
+    )
+    segundos_total = fields.Float(
+        string='Duración total (s)',
+        aggregator='avg'
+    )
+    filas_procesadas = fields.Integer(
+        string='Filas procesadas',
+        aggregator='sum'
+    )
+    productos_creados = fields.Integer(
+        string='Productos creados',
+        aggregator='sum'
+    )
+    productos_actualizados = fields.Integer(
+        string='Productos actualizados',
+        aggregator='sum'
+    )
+    filas_por_segundo = fields.Float(
+        string='Filas por segundo',
+        compute='_compute_filas_por_segundo',
+        store=True,
+        aggregator='avg'
+    )
+    rss_pico_mb = fields.Float(
+        string='Memoria RSS pico (MB)',
+        aggregator='max',
+        help='Pico de memoria residente del proceso al terminar la importación'
+    )
+    segundos_leer = fields.Float(
+        string='Segundos de lectura',
+        aggregator='avg'
+    )
+    consultas_leer = fields.Integer(
+        string='Consultas SQL de lectura',
+        aggregator='avg'
+    )
+    filas_leer = fields.Integer(
+        string='Filas de lectura',
+        aggregator='sum'
+    )
+    segundos_clasificar = fields.Float(
+        string='Segundos de clasificación',
+        aggregator='avg'
+    )
+    consultas_clasificar = fields.Integer(
+        string='Consultas SQL de clasificación',
+        aggregator='avg'
+    )
+    filas_clasificar = fields.Integer(
+        string='Filas de clasificación',
+        aggregator='sum'
+    )
+    segundos_crear = fields.Float(
+        string='Segundos de creación',
+        aggregator='avg'
+    )
+    consultas_crear = fields.Integer(
+        string='Consultas SQL de creación',
+        aggregator='avg'
+    )
+    filas_crear = fields.Integer(
+        string='Filas de creación',
+        aggregator='sum'
+    )
+    segundos_actualizar = fields.Float(
+        string='Segundos de actualización',
+        aggregator='avg'
+    )
+    consultas_actualizar = fields.Integer(
+        string='Consultas SQL de actualización',
+        aggregator='avg'
+    )
+    filas_actualizar = fields.Integer(
+        string='Filas de actualización',
+        aggregator='sum'
+    )
+    segundos_info_proveedor = fields.Float(
+        string='Segundos de info. de proveedor',
+        aggregator='avg'
+    )
+    consultas_info_proveedor = fields.Integer(
+        string='Consultas SQL de info. de proveedor',
+        aggregator='avg'
+    )
+    filas_info_proveedor = fields.Integer(
+        string='Filas de info. de proveedor',
+        aggregator='sum'
+    )
+
+    @api.depends('filas_procesadas', 'segundos_total')
+    def _compute_filas_por_segundo(self):
+        for record in self:
+            record.filas_por_segundo = record.filas_procesadas / record.segundos_total if record.segundos_total else 0.0
 
     @api.model
     def create(self, vals):
@@ -0,0 +1,114 @@
+# ===========================
+# models/syscom_price_rule.py
+# ===========================
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from .precio_utilerias import ReglaPrecio, TablaReglasPrecio
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class SyscomPriceRule(models.Model):
+    _name = 'syscom.price.rule'
+    _description = 'Regla de precio Syscom'
+    _order = 'sequence, id'
+
+    config_id = fields.Many2one(
+        'syscom.config',
+        string='Configuración',
+        required=True,
+        ondelete='cascade'
+    )
+    sequence = fields.Integer(
+        string='Prioridad',
+        default=10,
+        help='Si varias reglas aplican a un producto, gana la de menor prioridad.'
+    )
+    active = fields.Boolean(default=True)
+    categ_id = fields.Many2one(
+        'product.category',
+        string='Categoría',
+        help='La regla aplica a la categoría y a sus subcategorías. Vacío para todas.'
+    )
+    marca = fields.Char(
+        string='Marca',
+        help="Columna 'Marca' del feed, sin distinguir mayúsculas. Vacío para todas."
+    )
+    costo_desde = fields.Float(
+        string='Costo desde',
+        help='Costo mínimo (incluido) del producto, ya convertido a moneda local.'
+    )
+    costo_hasta = fields.Float(
+        string='Costo hasta',
+        help='Costo máximo (excluido) del producto. 0 para no limitar.'
+    )
+    ganancia_porcentaje = fields.Float(
+        string='Ganancia (%)',
+        required=True,
+        help='Porcentaje de ganancia sobre el costo para calcular el precio de venta.'
+    )
+    redondeo = fields.Float(
+        string='Redondeo',
+        help='Redondear el precio de venta al múltiplo más cercano, p.ej. 1.0 o 10.0. 0 para no redondear.'
+    )
+    precio_minimo = fields.Float(
+        string='Precio mínimo',
+        help='Precio de venta mínimo después de aplicar ganancia y redondeo.'
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        reglas = super().create(vals_list)
+        reglas._validar_valores()
+        return reglas
+
+    def write(self, vals):
+        resultado = super().write(vals)
+        self._validar_valores()
+        return resultado
+
+    def _validar_valores(self):
+        for regla in self:
+            if regla.redondeo < 0 or regla.precio_minimo < 0:
+                raise UserError('El redondeo y el precio mínimo de una regla de precio no pueden ser negativos.')
+            if regla.costo_hasta and regla.costo_hasta <= regla.costo_desde:
+                raise UserError(f'En la regla de precio {regla.display_name} el costo hasta debe ser mayor al costo desde.')
+
+    def _compilar(self, ganancia_porcentaje):
+        """Compilar las reglas del recordset en una TablaReglasPrecio para toda la ejecución
+
+        La ruta de cada categoría se arma una sola vez con los mismos nombres
+        que usa el feed ('Menu Nvl 1', 'Menu Nvl 2', ...), de modo que la
+        búsqueda por fila no consulta la base de datos.
+
+        Args:
+            ganancia_porcentaje: Ganancia general para las filas sin regla
+
+        Returns:
+            TablaReglasPrecio o None si no hay reglas
+        """
+        if not self:
+            return None
+        rutas = {}
+        for categoria in self.categ_id:
+            ruta = []
+            nodo = categoria
+            while nodo:
+                ruta.append(nodo.name.strip())
+                nodo = nodo.parent_id
+            rutas[categoria.id] = tuple(reversed(ruta))
+        tabla = TablaReglasPrecio([
+            ReglaPrecio(
+                ruta=rutas.get(regla.categ_id.id, ()),
+                marca=(regla.marca or '').strip() or None,
+                costo_desde=regla.costo_desde,
+                costo_hasta=regla.costo_hasta,
+                ganancia_porcentaje=regla.ganancia_porcentaje,
+                redondeo=regla.redondeo,
+                precio_minimo=regla.precio_minimo,
+            )
+            for regla in self.sorted(lambda r: (r.sequence, r.id))
+        ], ganancia_porcentaje)
+        _logger.info(f'Syscom: {len(tabla)} reglas de precio compiladas')
+        return tabla
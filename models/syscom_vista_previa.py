@@ -0,0 +1,68 @@
+# ===========================
+# models/syscom_vista_previa.py
+# ===========================
+from odoo import models, fields
+
+
+class SyscomVistaPrevia(models.Model):
+    _name = 'syscom.vista.previa'
+    _description = 'Vista previa de importación Syscom'
+    _order = 'create_date desc, id desc'
+    _rec_name = 'create_date'
+
+    config_id = fields.Many2one(
+        'syscom.config',
+        string='Configuración',
+        required=True,
+        ondelete='cascade'
+    )
+    ruta_archivo = fields.Char(string='Archivo')
+    ganancia_porcentaje = fields.Float(
+        string='Ganancia (%)',
+        help='Porcentaje de ganancia de la configuración con el que se calcularon los precios nuevos.'
+    )
+    productos_crear = fields.Integer(string='Por crear')
+    productos_actualizar = fields.Integer(string='Por actualizar')
+    productos_sin_cambios = fields.Integer(string='Sin cambios')
+    productos_archivar = fields.Integer(
+        string='Fuera del feed',
+        help='Productos activos del proveedor que ya no están en el feed.'
+    )
+    archivado_cancelado = fields.Boolean(
+        string='Archivado cancelado',
+        help='Los productos fuera del feed superan el umbral de descontinuados; la importación no los archivaría.'
+    )
+    categorias_nuevas = fields.Integer(string='Categorías nuevas')
+    marcas_nuevas = fields.Integer(string='Marcas nuevas')
+    segundos = fields.Float(string='Duración (s)')
+    resumen = fields.Text(string='Resumen')
+    linea_ids = fields.One2many(
+        'syscom.vista.previa.categoria',
+        'vista_previa_id',
+        string='Cambios por categoría'
+    )
+    archivo_diferencias = fields.Binary(string='Archivo de diferencias', attachment=True)
+    nombre_archivo = fields.Char(string='Nombre del archivo')
+
+
+class SyscomVistaPreviaCategoria(models.Model):
+    _name = 'syscom.vista.previa.categoria'
+    _description = 'Cambios por categoría de una vista previa Syscom'
+    _order = 'categoria'
+
+    vista_previa_id = fields.Many2one(
+        'syscom.vista.previa',
+        string='Vista previa',
+        required=True,
+        ondelete='cascade'
+    )
+    categoria = fields.Char(string='Categoría')
+    productos_crear = fields.Integer(string='Por crear')
+    productos_actualizar = fields.Integer(string='Por actualizar')
+    productos_cambio_precio = fields.Integer(string='Con cambio de precio')
+    delta_promedio = fields.Float(
+        string='Delta promedio',
+        aggregator='avg',
+        help='Diferencia promedio del precio de venta en los productos cuyo precio cambia.'
+    )
+    delta_porcentaje_promedio = fields.Float(string='Delta promedio (%)', aggregator='avg')
@@ -0,0 +1,7 @@
+# ===========================
+# tests/__init__.py
+# ===========================
+from . import test_benchmark_importacion
+from . import test_importacion
+from . import test_precios
+from . import test_descarga
@@ -0,0 +1,55 @@
+# ===========================
+# tests/comun.py
+# ===========================
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase
+
+from ..models import syscom_config as modulo_config
+from ..models.syscom_config import SyscomConfig
+
+
+def confirmar_lote_sin_commit(self):
+    """En pruebas no se confirma la transacción; solo se vacía y libera la caché como en producción"""
+    self.env.flush_all()
+    self.env.invalidate_all()
+
+
+class SyscomCase(TransactionCase):
+    """
+    Base de las pruebas del importador.
+
+    Descargas, bitácora de precios y snapshots van a un directorio temporal
+    propio de la clase, nunca a las rutas reales de producción, y los lotes
+    se vacían sin confirmar la transacción de la prueba.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directorio = tempfile.mkdtemp(prefix='syscom_pruebas_')
+        cls.addClassCleanup(shutil.rmtree, cls.directorio, True)
+        parches = [
+            patch.object(modulo_config, '_ruta_descarga', cls.directorio),
+            patch.object(modulo_config, '_archivo_bitacora_precios', os.path.join(cls.directorio, 'syscom_precios_bitacora.jsonl')),
+            patch.object(modulo_config, '_archivo_snapshot_prefijo', os.path.join(cls.directorio, 'syscom_snapshot_')),
+            patch.object(SyscomConfig, '_confirmar_lote', confirmar_lote_sin_commit),
+        ]
+        for parche in parches:
+            parche.start()
+            cls.addClassCleanup(parche.stop)
+        cls.config = cls.env['syscom.config'].create({
+            'syscom_url': 'https://www.syscom.mx/pruebas.csv',
+            'periodo_segundos': 86400,
+            'hora_ejecucion': 2.0,
+            'ganancia_porcentaje': 30.0,
+            # Cada prueba usa sus propios códigos; no archivar los de las demás
+            'accion_descontinuados': 'ninguna',
+        })
+        cls.ruta_bitacora = modulo_config._archivo_bitacora_precios
+
+    def ruta_feed(self, nombre):
+        return os.path.join(self.directorio, nombre)
@@ -0,0 +1,130 @@
+# ===========================
+# tests/test_benchmark_importacion.py
+# ===========================
+"""
+Benchmark de punta a punta del importador Syscom.
+
+No forma parte de la corrida estándar de pruebas; se ejecuta explícitamente con:
+
+    odoo-bin -d <bd> -i <modulo> --test-tags syscom_benchmark --stop-after-init
+
+Variables de entorno:
+    SYSCOM_BENCHMARK_FILAS: tamaños del feed separados por coma (por omisión 1000)
+    SYSCOM_BENCHMARK_SALIDA: archivo JSON con los resultados (por omisión /tmp/syscom_benchmark.json)
+    SYSCOM_BENCHMARK_REGLAS: reglas de precio para medir el cálculo de precios (por omisión 300)
+"""
+import json
+import logging
+import os
+import time
+
+from odoo.tests import tagged
+
+from ..benchmark.generador_feed import generar_feed
+from ..models.metricas import MedidorFases
+from .comun import SyscomCase
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('-standard', '-at_install', 'post_install', 'syscom_benchmark')
+class TestBenchmarkImportacion(SyscomCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tamanos = [
+            int(valor) for valor in os.environ.get('SYSCOM_BENCHMARK_FILAS', '1000').split(',') if valor.strip()
+        ]
+        cls.salida = os.environ.get('SYSCOM_BENCHMARK_SALIDA', '/tmp/syscom_benchmark.json')
+        cls.reglas = int(os.environ.get('SYSCOM_BENCHMARK_REGLAS', '300'))
+
+    def _corrida(self, ruta, etiqueta, modo_masivo=True):
+        medidor = MedidorFases(medir_memoria=True)
+        self.config.modo_masivo = modo_masivo
+        config = self.config.with_context(syscom_medidor=medidor)
+        inicio = time.perf_counter()
+        ruta, _no_usado = config.csv_limpiar(ruta)
+        config._procesar_csv(ruta)
+        segundos = time.perf_counter() - inicio
+        _logger.info(f'Benchmark Syscom [{etiqueta}] {segundos:.2f}s -> {medidor.resumen()}')
+        return {'segundos': segundos, 'fases': medidor.como_dict()}
+
+    def _lineas_bitacora(self):
+        if not os.path.exists(self.ruta_bitacora):
+            return 0
+        with open(self.ruta_bitacora, encoding='utf-8') as archivo:
+            return sum(1 for _linea in archivo)
+
+    def _lectura(self, ruta, etiqueta):
+        """Solo lectura y cálculo de precios del feed, para aislar el costo de las reglas de precio"""
+        inicio = time.perf_counter()
+        filas = sum(len(lote[0]) for lote in self.config._leer_csv_por_lotes(ruta, []))
+        segundos = time.perf_counter() - inicio
+        _logger.info(f'Benchmark Syscom [{etiqueta}] {filas} filas en {segundos:.2f}s')
+        return {'segundos': segundos, 'filas': filas}
+
+    def _crear_reglas(self, cantidad):
+        categorias = self.env['product.category'].search([('parent_id', '!=', False)], limit=cantidad)
+        marcas = ['HIKVISION', 'DAHUA', 'UBIQUITI', 'TP-LINK', 'APC']
+        return self.env['syscom.price.rule'].create([{
+            'config_id': self.config.id,
+            'sequence': i,
+            'categ_id': categorias[i % len(categorias)].id if categorias else False,
+            'marca': marcas[i % len(marcas)] if i % 3 else False,
+            'costo_desde': (i % 10) * 100.0,
+            'costo_hasta': (i % 10) * 100.0 + 500.0,
+            'ganancia_porcentaje': 10.0 + i % 25,
+            'redondeo': 1.0 if i % 2 else 0.0,
+            'precio_minimo': 50.0,
+        } for i in range(cantidad)])
+
+    def test_benchmark_importacion(self):
+        resultados = []
+        for filas in self.tamanos:
+            ruta_inicial = self.ruta_feed(f'syscom_inicial_{filas}.csv')
+            ruta_variada = self.ruta_feed(f'syscom_variada_{filas}.csv')
+            validas = generar_feed(ruta_inicial, filas, semilla=filas)
+            generar_feed(ruta_variada, filas, semilla=filas, variacion=0.05)
+
+            lineas_antes = self._lineas_bitacora()
+            inicial = self._corrida(ruta_inicial, f'{filas} filas, importación inicial')
+            creados = self.env['product.template'].search_count([('default_code', 'like', 'SYS-%')])
+            self.assertGreaterEqual(creados, validas, 'Cada fila válida del feed debe producir un producto')
+            self.assertTrue(os.path.exists(self.config._ruta_snapshot()), 'La importación debe publicar el snapshot')
+            lineas_inicial = self._lineas_bitacora()
+            self.assertGreater(lineas_inicial, lineas_antes, 'Los productos creados deben quedar en la bitácora de precios')
+
+            variada = self._corrida(ruta_variada, f'{filas} filas, 5% de precios modificados')
+            self.assertGreater(self._lineas_bitacora(), lineas_inicial, 'Los cambios de precio deben quedar en la bitácora de precios')
+            # Costo y precio de venta se escriben por lote; las consultas no deben crecer con cada producto
+            actualizar = variada['fases'].get('actualizar', {})
+            consultas_por_producto = actualizar['consultas'] / actualizar['filas'] if actualizar.get('filas') else None
+            _logger.info(f'Benchmark Syscom [{filas} filas] {consultas_por_producto} consultas por producto actualizado')
+
+            # Misma carga con otros códigos y sin modo masivo, para comparar contra la importación inicial
+            ruta_sin_masivo = self.ruta_feed(f'syscom_sin_masivo_{filas}.csv')
+            generar_feed(ruta_sin_masivo, filas, semilla=filas, prefijo='SYN')
+            sin_masivo = self._corrida(ruta_sin_masivo, f'{filas} filas, importación inicial sin modo masivo', modo_masivo=False)
+
+            # Lectura del feed con y sin reglas de precio; el artefacto ya existe, así que solo cambia el cálculo de precios
+            sin_reglas = self._lectura(ruta_variada, f'{filas} filas, lectura sin reglas de precio')
+            reglas = self._crear_reglas(self.reglas)
+            con_reglas = self._lectura(ruta_variada, f'{filas} filas, lectura con {len(reglas)} reglas de precio')
+            reglas.unlink()
+            resultados.append({
+                'filas': filas,
+                'filas_validas': validas,
+                'inicial': inicial,
+                'precios_variados': variada,
+                'consultas_por_producto_actualizado': consultas_por_producto,
+                'inicial_sin_modo_masivo': sin_masivo,
+                'aceleracion_modo_masivo': sin_masivo['segundos'] / inicial['segundos'] if inicial['segundos'] else None,
+                'lectura_sin_reglas': sin_reglas,
+                'lectura_con_reglas': con_reglas,
+                'reglas_precio': self.reglas,
+            })
+
+        with open(self.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2)
+        _logger.info(f'Resultados del benchmark Syscom escritos en {self.salida}')
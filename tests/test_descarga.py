@@ -0,0 +1,144 @@
+# ===========================
+# tests/test_descarga.py
+# ===========================
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+from ..models.descarga_utilerias import DESCARGADO, NO_MODIFICADO, descargar_archivo, sondear_archivo
+
+_contenido = b'Modelo,Titulo,Su Precio\n' + b''.join(b'SYS-%07d,Producto %d,%d.50\n' % (i, i, i) for i in range(2000))
+
+
+class _ServidorProgramado(BaseHTTPRequestHandler):
+    """
+    Servidor HTTP de prueba: contesta en orden las respuestas programadas y
+    guarda el método y los encabezados de cada petición. La última respuesta
+    se repite para las peticiones que sobren.
+
+    Cada respuesta es una tupla (estado, encabezados, cuerpo, bytes_a_enviar);
+    con menos bytes que el cuerpo la conexión se cierra a la mitad.
+    """
+    respuestas = []
+    peticiones = []
+
+    def _responder(self):
+        self.peticiones.append((self.command, dict(self.headers)))
+        estado, encabezados, cuerpo, enviar = self.respuestas.pop(0) if len(self.respuestas) > 1 else self.respuestas[0]
+        self.send_response(estado)
+        for nombre, valor in encabezados.items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        if self.command != 'HEAD' and cuerpo:
+            self.wfile.write(cuerpo[:enviar])
+
+    do_GET = do_HEAD = _responder
+
+    def log_message(self, *args):
+        pass
+
+
+def _completa(cuerpo=_contenido, etag='"v1"', enviar=None):
+    return 200, {'Content-Type': 'text/csv', 'Content-Length': str(len(cuerpo)), 'ETag': etag}, cuerpo, enviar
+
+
+@tagged('post_install', '-at_install')
+class TestDescarga(BaseCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), _ServidorProgramado)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.servidor.server_close)
+        cls.addClassCleanup(cls.servidor.shutdown)
+        cls.url = f'http://127.0.0.1:{cls.servidor.server_address[1]}/syscom.csv'
+
+    def setUp(self):
+        super().setUp()
+        self.directorio = tempfile.mkdtemp(prefix='syscom_descarga_')
+        self.addCleanup(shutil.rmtree, self.directorio, True)
+        self.destino = os.path.join(self.directorio, 'syscom.csv')
+        _ServidorProgramado.peticiones = []
+
+    def _programar(self, *respuestas):
+        _ServidorProgramado.respuestas = list(respuestas)
+
+    def _descargar(self, **kwargs):
+        # Bloques chicos para que lo recibido antes del corte quede escrito y se reanude desde ahí
+        return descargar_archivo(self.url, self.destino, tamano_bloque=1024, espera_inicial=0, timeout=10, **kwargs)
+
+    def _leer_destino(self):
+        with open(self.destino, 'rb') as archivo:
+            return archivo.read()
+
+    def test_304_no_descarga(self):
+        self._programar((304, {'ETag': '"v1"'}, b'', None))
+        resultado = self._descargar(etag='"v1"')
+        self.assertEqual(resultado['estado'], NO_MODIFICADO)
+        self.assertEqual(_ServidorProgramado.peticiones[0][1].get('If-None-Match'), '"v1"')
+        self.assertFalse(os.path.exists(self.destino))
+
+    def test_reanuda_con_206(self):
+        # Corte justo al final de un bloque, para que todo lo recibido quede escrito
+        mitad = 32 * 1024
+        self._programar(
+            _completa(enviar=mitad),
+            (206, {'Content-Type': 'text/csv', 'Content-Length': str(len(_contenido) - mitad), 'ETag': '"v1"',
+                   'Content-Range': f'bytes {mitad}-{len(_contenido) - 1}/{len(_contenido)}'}, _contenido[mitad:], None),
+        )
+        resultado = self._descargar()
+        self.assertEqual(resultado['estado'], DESCARGADO)
+        self.assertEqual(self._leer_destino(), _contenido)
+        self.assertEqual(resultado['bytes'], len(_contenido))
+        reanudacion = _ServidorProgramado.peticiones[1][1]
+        self.assertEqual(reanudacion.get('Range'), f'bytes={mitad}-')
+        self.assertEqual(reanudacion.get('If-Range'), '"v1"')
+
+    def test_200_a_una_peticion_range_reinicia(self):
+        # El archivo cambió en el servidor: ignora Range y manda el contenido nuevo, comprimido y sin Content-Length
+        nuevo = _contenido[:len(_contenido) // 3]
+        self._programar(
+            _completa(enviar=len(_contenido) // 2),
+            (200, {'Content-Type': 'text/csv', 'Content-Encoding': 'gzip', 'ETag': '"v2"'}, gzip.compress(nuevo), None),
+        )
+        resultado = self._descargar()
+        self.assertIn('Range', _ServidorProgramado.peticiones[1][1])
+        self.assertEqual(resultado['estado'], DESCARGADO)
+        self.assertEqual(self._leer_destino(), nuevo)
+        self.assertEqual(resultado['etag'], '"v2"')
+        self.assertEqual(resultado['total'], 0, 'El total anunciado de la respuesta anterior no aplica al contenido nuevo')
+
+    def test_agota_reintentos(self):
+        self._programar((503, {}, b'', None))
+        with self.assertRaises(requests.ConnectionError):
+            self._descargar(reintentos=2)
+        self.assertEqual(len(_ServidorProgramado.peticiones), 3)
+        self.assertFalse(os.path.exists(self.destino))
+
+    def test_sondeo_head_304(self):
+        self._programar((304, {'ETag': '"v1"'}, b'', None))
+        resultado = sondear_archivo(self.url, etag='"v1"')
+        self.assertFalse(resultado['cambio'])
+        self.assertEqual(resultado['metodo'], 'head')
+        self.assertEqual(_ServidorProgramado.peticiones[0][0], 'HEAD')
+
+    def test_sondeo_por_hash_sin_validadores(self):
+        huella = hashlib.sha256(_contenido).hexdigest()
+        sin_validadores = (200, {'Content-Type': 'text/csv', 'Content-Length': str(len(_contenido))}, _contenido, None)
+        self._programar(sin_validadores)
+        resultado = sondear_archivo(self.url, huella=huella)
+        self.assertFalse(resultado['cambio'])
+        self.assertEqual(resultado['metodo'], 'hash')
+
+        self._programar(sin_validadores)
+        self.assertTrue(sondear_archivo(self.url, huella=hashlib.sha256(b'otro').hexdigest())['cambio'])
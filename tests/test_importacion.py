@@ -0,0 +1,103 @@
+# ===========================
+# tests/test_importacion.py
+# ===========================
+import csv
+import os
+
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from ..benchmark.generador_feed import ENCABEZADOS, generar_feed
+from ..models import syscom_config as modulo_config
+from ..models.fila_feed import FilaFeed
+from .comun import SyscomCase
+
+
+@tagged('post_install', '-at_install')
+class TestSnapshotImportacion(SyscomCase):
+
+    def test_segunda_importacion_omite_filas_sin_cambios(self):
+        ruta = self.ruta_feed('syscom_products_snapshot.csv')
+        validas = generar_feed(ruta, 200, semilla=17, prefijo='SNP')
+
+        primera = self.config._procesar_csv(ruta)
+        self.assertEqual(primera['creados'], validas)
+        self.assertTrue(os.path.exists(self.config._ruta_snapshot()), 'La primera importación debe publicar el snapshot')
+
+        segunda = self.config._procesar_csv(ruta)
+        self.assertEqual(segunda['sin_cambios'], validas, 'Las filas idénticas deben omitirse con el snapshot')
+        self.assertEqual(segunda['creados'], 0)
+        self.assertEqual(segunda['actualizados'], 0)
+
+
+@tagged('post_install', '-at_install')
+class TestDescontinuados(SyscomCase):
+
+    def _escribir_feed(self, nombre, filas):
+        ruta = self.ruta_feed(nombre)
+        with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(ENCABEZADOS)
+            for modelo, titulo, precio in filas:
+                escritor.writerow([modelo, titulo, precio, '18.5000', 'Redes', 'Switches', 'PoE', 'EPCOM', '43222610', ''])
+        return ruta
+
+    def test_filas_invalidas_no_se_archivan(self):
+        self.config.write({'accion_descontinuados': 'archivar', 'umbral_descontinuados': 100.0})
+        self.config._procesar_csv(self._escribir_feed('syscom_products_completo.csv', [
+            ('DSC-1', 'Switch PoE 8 puertos', '100.00'),
+            ('DSC-2', 'Switch PoE 16 puertos', '200.00'),
+            ('DSC-3', 'Switch PoE 24 puertos', '300.00'),
+            ('DSC-4', 'Switch PoE 48 puertos', '400.00'),
+        ]))
+        productos = self.env['product.template'].search([('default_code', 'in', ['DSC-1', 'DSC-2', 'DSC-3'])])
+        descontinuado = self.env['product.template'].search([('default_code', '=', 'DSC-4')])
+        self.assertEqual(len(productos), 3)
+
+        # DSC-2 llega sin precio válido y DSC-3 sin título: siguen en el feed
+        self.config._procesar_csv(self._escribir_feed('syscom_products_invalidas.csv', [
+            ('DSC-1', 'Switch PoE 8 puertos', '100.00'),
+            ('DSC-2', 'Switch PoE 16 puertos', 'N/D'),
+            ('DSC-3', '', '300.00'),
+        ]))
+        self.assertEqual(productos.filtered('active'), productos, 'Las filas inválidas del feed no deben archivarse')
+        self.assertFalse(descontinuado.active, 'El producto que ya no está en el feed sí se archiva')
+
+    def test_reactiva_solo_lo_archivado_por_la_importacion(self):
+        self.config.write({'accion_descontinuados': 'archivar', 'umbral_descontinuados': 100.0})
+        completo = [
+            ('REA-1', 'Switch PoE 8 puertos', '100.00'),
+            ('REA-2', 'Switch PoE 16 puertos', '200.00'),
+            ('REA-3', 'Switch PoE 24 puertos', '300.00'),
+        ]
+        self.config._procesar_csv(self._escribir_feed('syscom_products_reactivar.csv', completo))
+        Producto = self.env['product.template'].with_context(active_test=False)
+        descontinuado = Producto.search([('default_code', '=', 'REA-2')])
+        archivado_a_mano = Producto.search([('default_code', '=', 'REA-3')])
+        archivado_a_mano.active = False
+
+        self.config._procesar_csv(self._escribir_feed('syscom_products_sin_rea2.csv', [completo[0], completo[2]]))
+        self.assertFalse(descontinuado.active)
+        self.assertTrue(descontinuado.syscom_descontinuado)
+
+        self.config._procesar_csv(self._escribir_feed('syscom_products_reactivar.csv', completo))
+        self.assertTrue(descontinuado.active, 'El producto archivado por la importación vuelve con el feed')
+        self.assertFalse(descontinuado.syscom_descontinuado)
+        self.assertFalse(archivado_a_mano.active, 'El producto archivado a mano no se reactiva')
+
+
+@tagged('post_install', '-at_install')
+class TestCreacionProductos(SyscomCase):
+
+    def _fila(self, modelo):
+        fila = FilaFeed(modelo, f'Producto {modelo}', 10.0, 13.0, 'Redes > Switches', '43222610', '', 'EPCOM')
+        fila.categ_id = self.env.ref('product.product_category_all').id
+        return fila
+
+    def test_chunk_con_modelo_repetido_no_aborta_la_transaccion(self):
+        self.env['product.template'].create({'name': 'Existente', 'syscom_modelo': 'DUP-1'})
+        with mute_logger(modulo_config.__name__, 'odoo.sql_db'):
+            self.assertEqual(self.config._procesar_batch_creacion([self._fila('DUP-1')]), 0)
+        # Sin savepoint la siguiente consulta fallaría con InFailedSqlTransaction
+        self.assertEqual(self.config._procesar_batch_creacion([self._fila('DUP-2')]), 1)
+        self.assertTrue(self.env['product.template'].search([('syscom_modelo', '=', 'DUP-2')]))
@@ -0,0 +1,70 @@
+# ===========================
+# tests/test_precios.py
+# ===========================
+import random
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+from ..models import precio_utilerias
+from ..models.precio_utilerias import (
+    ReglaPrecio, TablaReglasPrecio, calcular_precios_lote, redondear, redondear_arreglo, redondear_multiplo,
+    redondear_multiplo_arreglo,
+)
+
+
+@tagged('post_install', '-at_install')
+class TestRedondeoPrecios(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        aleatorio = random.Random(10)
+        self.precios = [round(aleatorio.uniform(0.01, 2500), 2) for _i in range(2000)] + [12.35, 2.675, 1.005, None]
+        self.tasas = [round(aleatorio.uniform(17, 21), 4) for _i in self.precios]
+
+    def _ambas_rutas(self, funcion):
+        """Resultado de funcion() en Python puro y, si numpy está instalado, también con numpy"""
+        with patch.object(precio_utilerias, 'numpy', None):
+            python = funcion()
+        if precio_utilerias.numpy is None:
+            return python, None
+        return python, funcion()
+
+    def test_medios_hacia_arriba(self):
+        standard_prices, list_prices, invalidos = calcular_precios_lote([12.35, 2.675, None], [1.0, 1.0, 1.0], False, 30.0)
+        self.assertEqual(standard_prices, [12.35, 2.68, None])
+        # 12.35 * 1.3 = 16.055; round() daba 16.05
+        self.assertEqual(list_prices[0], 16.06)
+        self.assertEqual(invalidos, [2])
+
+    def test_calcular_precios_lote_igual_con_y_sin_numpy(self):
+        python, con_numpy = self._ambas_rutas(
+            lambda: calcular_precios_lote(self.precios, self.tasas, True, 30.0))
+        if con_numpy is None:
+            self.skipTest('numpy no está instalado')
+        self.assertEqual(python, con_numpy)
+
+    def test_reglas_igual_con_y_sin_numpy(self):
+        tabla = TablaReglasPrecio([
+            ReglaPrecio(costo_hasta=100.0, ganancia_porcentaje=35.0, redondeo=0.05),
+            ReglaPrecio(costo_desde=100.0, costo_hasta=1000.0, ganancia_porcentaje=25.0, redondeo=10.0),
+            ReglaPrecio(costo_desde=1000.0, ganancia_porcentaje=12.5, precio_minimo=1500.0),
+        ], 30.0)
+        python, con_numpy = self._ambas_rutas(lambda: tabla.precios_venta(self.precios))
+        self.assertEqual(python[-4], ReglaPrecio(ganancia_porcentaje=35.0, redondeo=0.05).precio_venta(12.35))
+        if con_numpy is None:
+            self.skipTest('numpy no está instalado')
+        self.assertEqual(python, con_numpy)
+
+    def test_redondeo_vectorial_igual_a_redondear(self):
+        numpy = precio_utilerias.numpy
+        if numpy is None:
+            self.skipTest('numpy no está instalado')
+        # Medios exactos a dos dígitos, más valores con ruido binario del cálculo de precios
+        valores = [k / 1000 for k in range(1, 200000, 5)] + [p * t for p, t in zip(self.precios[:-1], self.tasas)]
+        arreglo = numpy.array(valores, dtype=numpy.float64)
+        self.assertEqual(redondear_arreglo(arreglo, 2).tolist(), [redondear(v, 2) for v in valores])
+        for multiplo in (0.05, 0.5, 1.0, 10.0):
+            self.assertEqual(redondear_multiplo_arreglo(arreglo, multiplo, 2).tolist(),
+                             [redondear_multiplo(v, multiplo, 2) for v in valores])